@@ -20,6 +20,10 @@ def create_app(config_name='default'):
     db.init_app(app)
     migrate.init_app(app)
 
+    # 业务数据写入时递增全局数据版本号（用于响应缓存校验）
+    from app.utils.cache import register_data_version_events
+    register_data_version_events()
+
     # Configure CORS - 完全放开，允许所有来源访问
     CORS(app,
          resources={r"/api/*": {"origins": "*"}},
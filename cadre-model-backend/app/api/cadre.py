@@ -1,17 +1,24 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from marshmallow import ValidationError
 from app.api import cadre_bp
 from app.services.cadre_service import CadreService
+from app.services.search_service import SearchService
+from app.services.cadre_import_service import CadreImportService
+from app.services.cadre_profile_import_service import CadreProfileImportService
+from app.services.export_service import ExportService
 from app.schemas.cadre_schema import (
     CadreSchema,
     CadreCreateSchema,
     CadreUpdateSchema,
     CadreTraitSchema,
+    CadreTraitBatchSchema,
     CadreAbilityScoreSchema,
     CadreDynamicInfoSchema
 )
-from app.utils.helpers import success_response, error_response, paginate_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.helpers import success_response, error_response, paginate_response, cursor_response, export_response
+from app.utils.decorators import token_required, log_operation, cached_response
+from app.utils.constants import CADRE_PROFILE_DETAIL
+from app.utils.spreadsheet import get_file_extension
 
 
 @cadre_bp.route('/cadres', methods=['GET'])
@@ -25,20 +32,147 @@ def get_cadres():
         name = request.args.get('name')
         status = int(request.args.get('status')) if request.args.get('status') else None
         department = request.args.get('department')
+        profile = request.args.get('profile', CADRE_PROFILE_DETAIL)
 
-        result = CadreService.get_cadre_list(page, page_size, name, status, department)
+        # 传入 cursor 参数（首页为空字符串）时使用游标分页
+        if 'cursor' in request.args:
+            result = CadreService.get_cadre_page(
+                page_size, request.args.get('cursor'), name, status, department, profile
+            )
+            return cursor_response(result['items'], result['next_cursor'], page_size, result['total'])
+
+        result = CadreService.get_cadre_list(page, page_size, name, status, department, profile)
         return paginate_response(**result)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/search', methods=['GET'])
+@token_required
+def search_cadres():
+    """
+    按姓名、工号、部门、岗位搜索干部（前缀匹配优先）
+
+    单字关键词（如姓氏）无法使用 ngram 全文索引，按 LIKE '%关键词%' 扫描
+    """
+    try:
+        keyword = request.args.get('keyword', '')
+        limit = min(int(request.args.get('limit', 20)), 50)
+        return success_response(SearchService.search_cadres(keyword, limit))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/export', methods=['GET'])
+@token_required
+@log_operation('cadre', 'export')
+def export_cadres():
+    """导出干部列表（format=xlsx/csv，筛选参数与干部列表一致，流式输出）"""
+    try:
+        extension = ExportService.check_format(request.args.get('format'))
+        status = int(request.args.get('status')) if request.args.get('status') else None
+        chunks = ExportService.export_cadres(
+            extension, request.args.get('name'), status, request.args.get('department')
+        )
+        return export_response(chunks, '干部列表', extension)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/import', methods=['POST'])
+@token_required
+@log_operation('cadre', 'import')
+def import_cadres():
+    """
+    批量导入干部（xlsx/csv，按工号新增或更新）
+
+    表单参数：file-导入文件，dry_run-为 1/true 时仅校验不写入
+    """
+    try:
+        file = _get_import_file()
+        dry_run = request.form.get('dry_run', '').lower() in ('1', 'true')
+        report = CadreImportService.import_cadres(file.stream, file.filename, dry_run=dry_run)
+        return success_response(report, '校验完成' if dry_run else '导入完成')
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/import/abilities', methods=['POST'])
+@token_required
+@log_operation('cadre', 'import')
+def import_cadre_abilities():
+    """批量导入能力评分（xlsx/csv，按干部+能力标签覆盖），导入后标记干部待重新匹配"""
+    try:
+        from flask import g
+        file = _get_import_file()
+        report = CadreProfileImportService.import_ability_scores(
+            file.stream, file.filename, current_user=getattr(g, 'username', None)
+        )
+        return success_response(report, '导入完成')
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/import/traits', methods=['POST'])
+@token_required
+@log_operation('cadre', 'import')
+def import_cadre_traits():
+    """批量导入特质（xlsx/csv，按干部+特质类型覆盖），导入后标记干部待重新匹配"""
+    try:
+        from flask import g
+        file = _get_import_file()
+        report = CadreProfileImportService.import_traits(
+            file.stream, file.filename, current_user=getattr(g, 'username', None)
+        )
+        return success_response(report, '导入完成')
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/import/dynamic-infos', methods=['POST'])
+@token_required
+@log_operation('cadre', 'import')
+def import_cadre_dynamic_infos():
+    """批量导入动态信息（xlsx/csv，追加记录），导入后标记干部待重新匹配"""
+    try:
+        file = _get_import_file()
+        report = CadreProfileImportService.import_dynamic_infos(file.stream, file.filename)
+        return success_response(report, '导入完成')
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(str(e), 500)
 
 
+def _get_import_file():
+    """获取上传的导入文件并校验格式"""
+    file = request.files.get('file')
+    if not file or not file.filename:
+        raise ValueError('请上传导入文件')
+    if get_file_extension(file.filename) not in current_app.config['ALLOWED_EXTENSIONS']:
+        raise ValueError('不支持的文件格式')
+    return file
+
+
 @cadre_bp.route('/cadres/<int:id>', methods=['GET'])
 @token_required
 @log_operation('cadre', 'query')
 def get_cadre(id):
     """获取干部详情"""
     try:
-        cadre = CadreService.get_cadre_by_id(id)
+        cadre = CadreService.get_cadre_by_id(id, eager=True)
         if not cadre:
             return error_response('干部不存在', 404)
         return success_response(cadre.to_dict())
@@ -46,6 +180,28 @@ def get_cadre(id):
         return error_response(str(e), 500)
 
 
+@cadre_bp.route('/cadres/<int:id>/profile', methods=['GET'])
+@token_required
+@log_operation('cadre', 'query')
+@cached_response
+def get_cadre_profile(id):
+    """
+    获取干部档案聚合数据（基本信息、特质、能力评分、动态信息、AI分析、当前岗位匹配结果）
+
+    查询参数：sections-逗号分隔的分区名，为空表示全部；响应带 ETag，支持 If-None-Match
+    """
+    try:
+        sections = [s.strip() for s in request.args.get('sections', '').split(',') if s.strip()]
+        profile = CadreService.get_cadre_profile(id, sections)
+        if profile is None:
+            return error_response('干部不存在', 404)
+        return success_response(profile)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @cadre_bp.route('/cadres', methods=['POST'])
 @token_required
 @log_operation('cadre', 'create')
@@ -117,6 +273,7 @@ def get_cadre_traits(id):
 def update_cadre_traits(id):
     """更新干部特质"""
     try:
+        from flask import g
         schema = CadreTraitSchema(many=True)
         # 将cadre_id注入到每个特质对象中
         traits_data = request.json.get('traits', [])
@@ -124,10 +281,34 @@ def update_cadre_traits(id):
             trait_data['cadre_id'] = id
         data = schema.load(traits_data)
 
-        CadreService.update_cadre_traits(id, data)
-        return success_response(None, '更新成功')
+        changed_types = CadreService.update_cadre_traits(id, data, getattr(g, 'username', None))
+        return success_response({'changed_types': changed_types}, '更新成功')
     except ValidationError as e:
         return error_response('数据验证失败', 400, e.messages)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/traits/batch', methods=['PUT'])
+@token_required
+@log_operation('cadre', 'update')
+def batch_update_cadre_traits():
+    """批量更新多个干部的特质（items: [{cadre_id, traits}]，每个干部的特质列表为其完整特质）"""
+    try:
+        from flask import g
+        data = CadreTraitBatchSchema().load(request.json or {})
+
+        traits_by_cadre = {item['cadre_id']: item['traits'] for item in data['items']}
+        changed = CadreService.batch_update_cadre_traits(traits_by_cadre, getattr(g, 'username', None))
+        return success_response({
+            'changed': [{'cadre_id': cadre_id, 'changed_types': types} for cadre_id, types in changed.items()]
+        }, '更新成功')
+    except ValidationError as e:
+        return error_response('数据验证失败', 400, e.messages)
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -160,8 +341,8 @@ def update_cadre_abilities(id):
 
         # 传递当前登录用户信息
         current_user = getattr(g, 'username', None)
-        CadreService.update_cadre_abilities(id, data, current_user)
-        return success_response(None, '更新成功')
+        changed_dimensions = CadreService.update_cadre_abilities(id, data, current_user)
+        return success_response({'changed_dimensions': changed_dimensions}, '更新成功')
     except ValidationError as e:
         return error_response('数据验证失败', 400, e.messages)
     except Exception as e:
@@ -205,11 +386,46 @@ def add_dynamic_info(id):
 @token_required
 @log_operation('cadre', 'query')
 def get_dynamic_info_list(id):
-    """获取干部动态信息列表"""
+    """
+    获取干部动态信息列表（每条记录只包含本类型字段）
+
+    查询参数：info_type-信息类型；include_text-是否包含长文本字段；
+    传入 cursor 参数（首页为空字符串）时按 info_type 游标分页，默认不包含长文本字段
+    """
     try:
         info_type = int(request.args.get('info_type')) if request.args.get('info_type') else None
-        dynamic_infos = CadreService.get_cadre_dynamic_info(id, info_type)
-        return success_response([info.to_dict() for info in dynamic_infos])
+        include_text = request.args.get('include_text')
+
+        if 'cursor' in request.args:
+            if info_type is None:
+                raise ValueError('分页查询需要指定信息类型')
+            page_size = min(int(request.args.get('page_size', 20)), 200)
+            result = CadreService.get_dynamic_info_page(
+                id, info_type, page_size, request.args.get('cursor'),
+                include_text=include_text in ('1', 'true')
+            )
+            return cursor_response(result['items'], result['next_cursor'], page_size, result['total'])
+
+        dynamic_infos = CadreService.get_cadre_dynamic_info(
+            id, info_type, include_text=include_text not in ('0', 'false')
+        )
+        return success_response(dynamic_infos)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@cadre_bp.route('/cadres/dynamic-info/<int:info_id>', methods=['GET'])
+@token_required
+@log_operation('cadre', 'query')
+def get_dynamic_info(info_id):
+    """获取动态信息详情（包含长文本字段）"""
+    try:
+        info = CadreService.get_dynamic_info_by_id(info_id)
+        if not info:
+            return error_response('动态信息不存在', 404)
+        return success_response(info.to_dict())
     except Exception as e:
         return error_response(str(e), 500)
 
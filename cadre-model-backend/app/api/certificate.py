@@ -3,11 +3,13 @@ from flask import request
 from app.api import certificate_bp
 from app.services.certificate_service import CertificateService
 from app.utils.helpers import success_response, error_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.decorators import token_required, log_operation, cached_response
+from app.utils.cache import DATA_VERSION_CERTIFICATE
 
 
 @certificate_bp.route('/certificate/tree', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_CERTIFICATE)
 def get_certificate_tree():
     """获取证书树"""
     try:
@@ -19,11 +21,11 @@ def get_certificate_tree():
 
 @certificate_bp.route('/certificate', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_CERTIFICATE)
 def get_certificate_list():
     """获取证书列表"""
     try:
-        certificates = CertificateService.get_certificate_list()
-        return success_response([c.to_dict() for c in certificates])
+        return success_response(CertificateService.get_certificate_list())
     except Exception as e:
         return error_response(str(e), 500)
 
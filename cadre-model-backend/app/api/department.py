@@ -3,12 +3,17 @@ from flask import request
 from marshmallow import ValidationError
 from app.api import system_bp
 from app.services.department_service import DepartmentService
+from app.services.department_stat_service import DepartmentStatService
+from app.schemas.system_schema import DepartmentMoveSchema
 from app.utils.helpers import success_response, error_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.decorators import token_required, log_operation, cached_response
+from app.utils.cache import DATA_VERSION_DEPARTMENT
+from app.utils.constants import DEPARTMENT_STAT_SCOPE_SELF, DEPARTMENT_STAT_SCOPE_SUBTREE
 
 
 @system_bp.route('/departments/tree', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_DEPARTMENT)
 def get_department_tree():
     """获取部门树"""
     try:
@@ -20,11 +25,93 @@ def get_department_tree():
 
 @system_bp.route('/departments/list', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_DEPARTMENT)
 def get_department_list():
     """获取部门列表"""
     try:
-        departments = DepartmentService.get_department_list()
-        return success_response([d.to_dict() for d in departments])
+        return success_response(DepartmentService.get_department_list())
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@system_bp.route('/departments/move', methods=['POST'])
+@token_required
+@log_operation('department', 'update')
+def move_departments():
+    """批量调整上级部门（moves: [{id, parent_id}]，一个事务内完成，整体校验循环引用）"""
+    try:
+        data = DepartmentMoveSchema().load(request.get_json() or {})
+        result = DepartmentService.move_departments(data['moves'])
+        return success_response(result, '调整成功')
+    except ValidationError as e:
+        return error_response('数据验证失败', 400, e.messages)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@system_bp.route('/departments/closure/rebuild', methods=['POST'])
+@token_required
+@log_operation('department', 'update')
+def rebuild_department_closure():
+    """按上级部门关系全量重建部门层级闭包表"""
+    try:
+        total = DepartmentService.rebuild_closure()
+        return success_response({'total': total}, '重建成功')
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@system_bp.route('/departments/stats', methods=['GET'])
+@token_required
+@cached_response
+def get_department_stats():
+    """
+    批量获取部门统计（预计算的子树人数、管理层级分布、当前岗位平均匹配分和匹配等级分布）
+
+    参数：department_ids 逗号分隔的部门ID（为空返回全部部门），status 干部状态，scope 统计范围（subtree/self）
+    """
+    try:
+        try:
+            department_ids = [int(i) for i in request.args.get('department_ids', '').split(',') if i.strip()]
+        except ValueError:
+            return error_response('部门ID格式错误', 400)
+        scope = request.args.get('scope', DEPARTMENT_STAT_SCOPE_SUBTREE)
+        if scope not in (DEPARTMENT_STAT_SCOPE_SUBTREE, DEPARTMENT_STAT_SCOPE_SELF):
+            return error_response(f'不支持的统计范围: {scope}', 400)
+        status = request.args.get('status', type=int)
+        return success_response(DepartmentStatService.get_department_stats(department_ids, status, scope))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@system_bp.route('/departments/stats/rebuild', methods=['POST'])
+@token_required
+@log_operation('department', 'update')
+def rebuild_department_stats():
+    """
+    按干部和当前岗位匹配结果全量重建部门统计
+
+    部门统计为增量维护，同一部门被并发修改时可能产生偏差，此接口为修复手段（可在批量导入后或定期调用）
+    """
+    try:
+        total = DepartmentStatService.rebuild_all()
+        return success_response({'total': total}, '重建成功')
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@system_bp.route('/departments/<int:id>/stats', methods=['GET'])
+@token_required
+@cached_response
+def get_department_stat_detail(id):
+    """获取部门统计（含子部门的汇总和本部门直属的汇总）"""
+    try:
+        result = DepartmentStatService.get_department_stat_detail(id, request.args.get('status', type=int))
+        if not result:
+            return error_response('部门不存在', 404)
+        return success_response(result)
     except Exception as e:
         return error_response(str(e), 500)
 
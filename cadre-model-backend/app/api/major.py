@@ -3,11 +3,13 @@ from flask import request
 from app.api import major_bp
 from app.services.major_service import MajorService
 from app.utils.helpers import success_response, error_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.decorators import token_required, log_operation, cached_response
+from app.utils.cache import DATA_VERSION_MAJOR
 
 
 @major_bp.route('/major/tree', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_MAJOR)
 def get_major_tree():
     """获取专业树"""
     try:
@@ -19,11 +21,11 @@ def get_major_tree():
 
 @major_bp.route('/major', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_MAJOR)
 def get_major_list():
     """获取专业列表"""
     try:
-        majors = MajorService.get_major_list()
-        return success_response([m.to_dict() for m in majors])
+        return success_response(MajorService.get_major_list())
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -1,15 +1,19 @@
-from flask import request
+from flask import request, Response, stream_with_context, current_app
+import json
 from marshmallow import ValidationError
 from app.api import match_bp
 from app.services.match_service import MatchService
+from app.services.dashboard_push_service import DashboardPushService
+from app.services.position_risk_service import PositionRiskService
+from app.services.export_service import ExportService
 from app.schemas.match_schema import (
     MatchCalculateSchema,
     BatchMatchCalculateSchema,
     BatchCadreMatchCalculateSchema,
     MatchCompareSchema
 )
-from app.utils.helpers import success_response, error_response, paginate_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.helpers import success_response, error_response, paginate_response, cursor_response, export_response
+from app.utils.decorators import token_required, log_operation, cached_response
 
 
 @match_bp.route('/match/calculate', methods=['POST'])
@@ -87,8 +91,17 @@ def get_match_results():
         cadre_id = int(request.args.get('cadre_id')) if request.args.get('cadre_id') else None
         match_level = request.args.get('match_level')
 
+        # 传入 cursor 参数（首页为空字符串）时使用游标分页
+        if 'cursor' in request.args:
+            result = MatchService.get_match_result_page(
+                position_id, cadre_id, match_level, page_size, request.args.get('cursor')
+            )
+            return cursor_response(result['items'], result['next_cursor'], page_size, result['total'])
+
         result = MatchService.get_match_results(position_id, cadre_id, match_level, page, page_size)
         return paginate_response(**result)
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -110,6 +123,7 @@ def get_match_result(id):
 @match_bp.route('/match/results/current-position', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_current_position_match_results():
     """获取干部当前岗位匹配结果（优化查询）"""
     try:
@@ -119,9 +133,25 @@ def get_current_position_match_results():
         return error_response(str(e), 500)
 
 
+@match_bp.route('/match/results/current-position/export', methods=['GET'])
+@token_required
+@log_operation('match', 'export')
+def export_current_position_match_results():
+    """导出干部当前岗位匹配结果（format=xlsx/csv，流式输出）"""
+    try:
+        extension = ExportService.check_format(request.args.get('format'))
+        chunks = ExportService.export_current_position_match_results(extension)
+        return export_response(chunks, '当前岗位匹配结果', extension)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @match_bp.route('/match/results/current-position/has-data', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def check_current_position_has_data():
     """快速检查是否有当前岗位匹配数据（轻量级查询）"""
     try:
@@ -192,6 +222,7 @@ def get_current_position_progress():
 @match_bp.route('/match/statistics', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_match_statistics():
     """获取匹配度统计数据"""
     try:
@@ -204,6 +235,7 @@ def get_match_statistics():
 @match_bp.route('/match/age-structure', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_age_structure_statistics():
     """获取年龄段统计数据"""
     try:
@@ -216,6 +248,7 @@ def get_age_structure_statistics():
 @match_bp.route('/match/age-structure-details', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_age_structure_details():
     """获取年龄段详情数据（包含人员信息）"""
     try:
@@ -228,6 +261,7 @@ def get_age_structure_details():
 @match_bp.route('/match/position-risk', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_position_risk():
     """获取关键岗位风险数据"""
     try:
@@ -237,9 +271,22 @@ def get_position_risk():
         return error_response(str(e), 500)
 
 
+@match_bp.route('/match/position-risk/rebuild', methods=['POST'])
+@token_required
+@log_operation('match', 'update')
+def rebuild_position_risk():
+    """全量重建岗位风险表（部署后回填历史数据或数据修复）"""
+    try:
+        total = PositionRiskService.rebuild_all()
+        return success_response({'total': total}, '重建成功')
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @match_bp.route('/match/quality-portrait', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_quality_portrait():
     """获取干部质量画像数据"""
     try:
@@ -249,9 +296,79 @@ def get_quality_portrait():
         return error_response(str(e), 500)
 
 
+def _parse_quality_portrait_filters():
+    """解析质量画像筛选参数"""
+    return {
+        'department': request.args.get('department'),
+        'management_level': request.args.get('management_level'),
+        'min_score': float(request.args.get('min_score')) if request.args.get('min_score') else None,
+        'max_score': float(request.args.get('max_score')) if request.args.get('max_score') else None,
+        'quality_type': request.args.get('quality_type')
+    }
+
+
+@match_bp.route('/match/quality-portrait/page', methods=['GET'])
+@token_required
+@log_operation('match', 'query')
+@cached_response
+def get_quality_portrait_page():
+    """分页获取干部质量画像数据（游标分页，支持排序和筛选）"""
+    try:
+        page_size = min(int(request.args.get('page_size', 20)), 200)
+        cursor = request.args.get('cursor')
+        sort_by = request.args.get('sort_by', 'match_score')
+        order = request.args.get('order', 'desc')
+
+        result = MatchService.get_quality_portrait_page(
+            page_size, cursor, sort_by, order, **_parse_quality_portrait_filters()
+        )
+        return cursor_response(**result)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@match_bp.route('/match/quality-portrait/stream', methods=['GET'])
+@token_required
+@log_operation('match', 'query')
+def stream_quality_portrait():
+    """流式导出干部质量画像数据（NDJSON，每行一条记录）"""
+    try:
+        filters = _parse_quality_portrait_filters()
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    def generate():
+        for item in MatchService.iter_quality_portrait(**filters):
+            yield json.dumps(item, ensure_ascii=False) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=quality_portrait.ndjson'}
+    )
+
+
+@match_bp.route('/match/quality-portrait/export', methods=['GET'])
+@token_required
+@log_operation('match', 'export')
+def export_quality_portrait():
+    """导出干部质量画像（format=xlsx/csv，筛选参数与质量画像分页一致，流式输出）"""
+    try:
+        extension = ExportService.check_format(request.args.get('format'))
+        chunks = ExportService.export_quality_portrait(extension, **_parse_quality_portrait_filters())
+        return export_response(chunks, '干部质量画像', extension)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @match_bp.route('/match/source-and-flow', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_source_and_flow_statistics():
     """获取干部来源与流动情况统计数据"""
     try:
@@ -264,6 +381,7 @@ def get_source_and_flow_statistics():
 @match_bp.route('/match/flow-cadres-details', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_flow_cadres_details():
     """获取流动干部详情列表"""
     try:
@@ -276,9 +394,46 @@ def get_flow_cadres_details():
         return error_response(str(e), 500)
 
 
+@match_bp.route('/match/flow-facts/rebuild', methods=['POST'])
+@token_required
+@log_operation('match', 'update')
+def rebuild_flow_facts():
+    """全量重建干部流动事实表"""
+    try:
+        from app.services.cadre_flow_service import CadreFlowService
+        total = CadreFlowService.rebuild_all()
+        return success_response({'total': total}, '重建成功')
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@match_bp.route('/match/rematch-pending', methods=['GET'])
+@token_required
+@log_operation('match', 'query')
+def get_pending_rematch_count():
+    """获取待重新匹配的干部数量（批量导入评分、特质、动态信息后标记）"""
+    try:
+        return success_response({'count': MatchService.get_pending_rematch_count()})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@match_bp.route('/match/rematch-pending', methods=['POST'])
+@token_required
+@log_operation('match', 'create')
+def rematch_pending_cadres():
+    """重新计算已标记干部的当前岗位匹配度"""
+    try:
+        result = MatchService.rematch_pending_cadres()
+        return success_response(result, '计算完成')
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @match_bp.route('/match/dashboard-all', methods=['GET'])
 @token_required
 @log_operation('match', 'query')
+@cached_response
 def get_dashboard_all_data():
     """获取大屏所有数据（合并接口 - 优化性能）"""
     try:
@@ -286,3 +441,40 @@ def get_dashboard_all_data():
         return success_response(data, '获取成功')
     except Exception as e:
         return error_response(str(e), 500)
+
+
+@match_bp.route('/match/dashboard-stream', methods=['GET'])
+@token_required
+def stream_dashboard():
+    """
+    大屏数据推送（SSE）
+
+    连接后先推送 snapshot 事件（完整大屏数据），之后数据变化时推送 update 事件，
+    只包含发生变化的板块：{'replace': 板块数据} 或 {'patch': 列表板块的行级差异}
+
+    认证同其他接口使用 Authorization 请求头（前端以 fetch 读取事件流，不使用 EventSource）。
+    每个连接占用一个工作线程，最长 DASHBOARD_PUSH_MAX_DURATION 秒后结束并由客户端重连；
+    本进程连接数达到 DASHBOARD_PUSH_MAX_CONNECTIONS 时返回 503，客户端稍后重试
+    """
+    config = current_app.config
+    if not DashboardPushService.acquire_connection(config['DASHBOARD_PUSH_MAX_CONNECTIONS']):
+        return error_response('大屏连接数已达上限，请稍后重试', 503)
+
+    try:
+        generator = DashboardPushService.stream(
+            poll_interval=config['DASHBOARD_PUSH_POLL_INTERVAL'],
+            heartbeat_interval=config['DASHBOARD_PUSH_HEARTBEAT_INTERVAL'],
+            max_duration=config['DASHBOARD_PUSH_MAX_DURATION'],
+            snapshot_dir=config['DASHBOARD_SNAPSHOT_DIR']
+        )
+        response = Response(
+            stream_with_context(generator),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception:
+        DashboardPushService.release_connection()
+        raise
+    # 连接关闭（正常结束、超时或客户端断开）时归还名额
+    response.call_on_close(DashboardPushService.release_connection)
+    return response
@@ -2,6 +2,7 @@ from flask import request
 from marshmallow import ValidationError
 from app.api import position_bp
 from app.services.position_service import PositionService
+from app.services.search_service import SearchService
 from app.schemas.position_schema import (
     PositionSchema,
     PositionCreateSchema,
@@ -12,8 +13,10 @@ from app.schemas.position_schema import (
     EDUCATION_OPTIONS,
     OPERATOR_OPTIONS
 )
-from app.utils.helpers import success_response, error_response, paginate_response
-from app.utils.decorators import token_required, log_operation
+from app.utils.helpers import success_response, error_response, paginate_response, cursor_response
+from app.utils.decorators import token_required, log_operation, cached_response
+from app.utils.cache import DATA_VERSION_MAJOR, DATA_VERSION_CERTIFICATE, DATA_VERSION_POSITION_CONFIG
+from app.utils.constants import ID_LIST_INDICATOR_TYPES
 
 
 @position_bp.route('/positions', methods=['GET'])
@@ -28,8 +31,35 @@ def get_positions():
         position_level = request.args.get('position_level')
         status = int(request.args.get('status')) if request.args.get('status') else None
 
+        # 传入 cursor 参数（首页为空字符串）时使用游标分页
+        if 'cursor' in request.args:
+            result = PositionService.get_position_page(
+                page_size, request.args.get('cursor'), position_name, position_level, status
+            )
+            return cursor_response(result['items'], result['next_cursor'], page_size, result['total'])
+
         result = PositionService.get_position_list(page, page_size, position_name, position_level, status)
         return paginate_response(**result)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@position_bp.route('/positions/search', methods=['GET'])
+@token_required
+def search_positions():
+    """
+    按岗位名称、岗位编码搜索岗位（前缀匹配优先）
+
+    单字关键词无法使用 ngram 全文索引，按 LIKE '%关键词%' 扫描
+    """
+    try:
+        keyword = request.args.get('keyword', '')
+        limit = min(int(request.args.get('limit', 20)), 50)
+        return success_response(SearchService.search_positions(keyword, limit))
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -37,19 +67,31 @@ def get_positions():
 @position_bp.route('/positions/all', methods=['GET'])
 @token_required
 @log_operation('position', 'query')
+@cached_response(version_name=DATA_VERSION_POSITION_CONFIG)
 def get_all_positions():
-    """获取所有启用的岗位"""
+    """获取所有启用的岗位（含能力权重和岗位要求，按岗位配置数据版本缓存）"""
+    try:
+        return success_response(PositionService.get_all_positions_with_config())
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@position_bp.route('/positions/by-requirement', methods=['GET'])
+@token_required
+@cached_response(version_name=DATA_VERSION_POSITION_CONFIG)
+def get_positions_by_requirement():
+    """按专业或证书反查要求了它的岗位（indicator_type: major/certificate，value_id，可选 requirement_type）"""
     try:
-        positions = PositionService.get_all_positions()
-        # 返回包含权重信息的岗位数据
-        result = []
-        for p in positions:
-            position_dict = p.to_dict()
-            # 添加权重信息
-            weights = PositionService.get_position_weights(p.id)
-            position_dict['ability_weights'] = [w.to_dict() for w in weights]
-            result.append(position_dict)
-        return success_response(result)
+        indicator_type = request.args.get('indicator_type')
+        if indicator_type not in ID_LIST_INDICATOR_TYPES:
+            return error_response(f'不支持的指标类型: {indicator_type}', 400)
+        value_id = request.args.get('value_id', type=int)
+        if value_id is None:
+            return error_response('请提供专业或证书ID', 400)
+        positions = PositionService.get_requirement_references(
+            indicator_type, {value_id}, request.args.get('requirement_type')
+        )
+        return success_response(positions)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -187,6 +229,7 @@ def update_position_requirements(id):
 
 @position_bp.route('/metadata/majors', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_MAJOR)
 def get_majors():
     """获取专业列表（用于岗位要求配置）"""
     try:
@@ -198,6 +241,7 @@ def get_majors():
 
 @position_bp.route('/metadata/certificates', methods=['GET'])
 @token_required
+@cached_response(version_name=DATA_VERSION_CERTIFICATE)
 def get_certificates():
     """获取证书列表（用于岗位要求配置）"""
     try:
@@ -2,22 +2,27 @@ from app.models.cadre import (
     CadreBasicInfo,
     CadreDynamicInfo,
     CadreTrait,
-    CadreAbilityScore
+    CadreAbilityScore,
+    CadreFlowFact
 )
 from app.models.position import (
     PositionInfo,
     PositionAbilityWeight,
-    PositionRequirement
+    PositionRequirement,
+    PositionRequirementValue,
+    PositionRisk
 )
 from app.models.match import (
     MatchResult,
-    MatchReport
+    MatchReport,
+    MatchPendingCadre
 )
 from app.models.system import (
     OperationLog,
-    User
+    User,
+    DataVersion
 )
-from app.models.department import Department
+from app.models.department import Department, DepartmentClosure, DepartmentStat
 from app.models.major import Major
 from app.models.certificate import Certificate
 from app.models.ai_analysis import AIAnalysis
@@ -29,18 +34,25 @@ __all__ = [
     'CadreDynamicInfo',
     'CadreTrait',
     'CadreAbilityScore',
+    'CadreFlowFact',
     # 岗位模型
     'PositionInfo',
     'PositionAbilityWeight',
     'PositionRequirement',
+    'PositionRequirementValue',
+    'PositionRisk',
     # 匹配模型
     'MatchResult',
     'MatchReport',
+    'MatchPendingCadre',
     # 系统模型
     'OperationLog',
     'User',
+    'DataVersion',
     # 部门模型
     'Department',
+    'DepartmentClosure',
+    'DepartmentStat',
     # 专业模型
     'Major',
     # 证书模型
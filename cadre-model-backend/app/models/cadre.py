@@ -9,6 +9,7 @@ class CadreBasicInfo(db.Model):
         db.Index('idx_status_position', 'status', 'position_id'),
         db.Index('idx_status_department', 'status', 'department_id'),
         db.Index('idx_management_level', 'management_level'),
+        db.Index('ft_cadre_name', 'name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
         {'mysql_engine': 'InnoDB', 'mysql_comment': '干部基础信息表-存储干部的基本信息'}
     )
 
@@ -242,3 +243,33 @@ class CadreAbilityScore(db.Model):
             'update_time': self.update_time.isoformat() if self.update_time else None,
             'update_by': self.update_by
         }
+
+
+class CadreFlowFact(db.Model):
+    """干部流动事实表"""
+    __tablename__ = 'cadre_flow_fact'
+    __table_args__ = (
+        db.Index('idx_flow_year_source', 'flow_year', 'source_type'),
+        db.Index('idx_source_type', 'source_type'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '干部流动事实表-预计算干部来源类型和流动年份，随职务变更记录维护'}
+    )
+
+    cadre_id = db.Column(db.Integer, db.ForeignKey('cadre_basic_info.id', ondelete='CASCADE'), primary_key=True, comment='干部ID')
+    source_type = db.Column(db.String(20), nullable=False, comment='来源类型：internal-内部培养，external-外部引进')
+    flow_year = db.Column(db.Integer, comment='流动年份：内部培养取首次职务变更任期开始年份，外部引进取入职年份')
+    first_appointment_date = db.Column(db.Date, comment='首次职务变更任期开始日期')
+    appointment_count = db.Column(db.Integer, default=0, nullable=False, comment='职务变更记录数')
+    update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    # 关系
+    cadre = db.relationship('CadreBasicInfo', backref=db.backref('flow_fact', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            'cadre_id': self.cadre_id,
+            'source_type': self.source_type,
+            'flow_year': self.flow_year,
+            'first_appointment_date': self.first_appointment_date.isoformat() if self.first_appointment_date else None,
+            'appointment_count': self.appointment_count,
+            'update_time': self.update_time.isoformat() if self.update_time else None
+        }
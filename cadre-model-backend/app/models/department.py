@@ -6,7 +6,10 @@ from app import db
 class Department(db.Model):
     """部门表"""
     __tablename__ = 'department'
-    __table_args__ = {'mysql_engine': 'InnoDB', 'mysql_comment': '部门表-存储组织架构的部门信息，支持树形结构'}
+    __table_args__ = (
+        db.Index('ft_department_name', 'name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '部门表-存储组织架构的部门信息，支持树形结构'}
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False, comment='部门名称')
@@ -53,3 +56,56 @@ class Department(db.Model):
                 children_list.append(child.to_tree_dict(include_children=True))
             result['children'] = children_list
         return result
+
+
+class DepartmentClosure(db.Model):
+    """部门层级闭包表"""
+    __tablename__ = 'department_closure'
+    __table_args__ = (
+        db.Index('idx_descendant_depth', 'descendant_id', 'depth'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '部门层级闭包表-存储每个部门与其所有祖先部门的关系，用于子树和祖先查询'}
+    )
+
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('department.id', ondelete='CASCADE'), primary_key=True, comment='祖先部门ID')
+    descendant_id = db.Column(db.Integer, db.ForeignKey('department.id', ondelete='CASCADE'), primary_key=True, comment='后代部门ID')
+    depth = db.Column(db.Integer, nullable=False, comment='层级距离：0-自身，1-直接子部门，依此类推')
+
+    def to_dict(self):
+        return {
+            'ancestor_id': self.ancestor_id,
+            'descendant_id': self.descendant_id,
+            'depth': self.depth
+        }
+
+
+class DepartmentStat(db.Model):
+    """部门统计汇总表"""
+    __tablename__ = 'department_stat'
+    __table_args__ = {'mysql_engine': 'InnoDB', 'mysql_comment': '部门统计汇总表-按干部状态和管理层级汇总部门（含子部门）人数及当前岗位匹配情况'}
+
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id', ondelete='CASCADE'), primary_key=True, comment='部门ID')
+    scope = db.Column(db.String(10), primary_key=True, comment='统计范围：self-本部门直属，subtree-含所有子部门')
+    status = db.Column(db.Integer, primary_key=True, comment='干部状态：1-在职，2-离职，3-退休')
+    management_level = db.Column(db.String(20), primary_key=True, default='', comment='管理层级（未填写为空字符串）')
+    headcount = db.Column(db.Integer, nullable=False, default=0, comment='干部人数')
+    matched_count = db.Column(db.Integer, nullable=False, default=0, comment='有当前岗位匹配结果的人数')
+    score_sum = db.Column(db.Float(precision=53), nullable=False, default=0, comment='当前岗位匹配得分合计')
+    excellent_count = db.Column(db.Integer, nullable=False, default=0, comment='优质匹配人数')
+    qualified_count = db.Column(db.Integer, nullable=False, default=0, comment='合格匹配人数')
+    unqualified_count = db.Column(db.Integer, nullable=False, default=0, comment='不合格匹配人数')
+    update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    def to_dict(self):
+        return {
+            'department_id': self.department_id,
+            'scope': self.scope,
+            'status': self.status,
+            'management_level': self.management_level,
+            'headcount': self.headcount,
+            'matched_count': self.matched_count,
+            'score_sum': self.score_sum,
+            'excellent_count': self.excellent_count,
+            'qualified_count': self.qualified_count,
+            'unqualified_count': self.unqualified_count,
+            'update_time': self.update_time.isoformat() if self.update_time else None
+        }
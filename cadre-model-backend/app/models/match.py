@@ -10,6 +10,7 @@ class MatchResult(db.Model):
         db.Index('idx_cadre_position', 'cadre_id', 'position_id'),
         db.Index('idx_create_time', 'create_time'),
         db.Index('idx_final_score', 'final_score'),
+        db.Index('idx_position_score', 'position_id', 'final_score'),
         db.Index('idx_match_level', 'match_level'),
         {'mysql_engine': 'InnoDB', 'mysql_comment': '匹配结果表-存储干部与岗位的匹配分析结果'}
     )
@@ -87,3 +88,23 @@ class MatchReport(db.Model):
             'create_time': self.create_time.isoformat() if self.create_time else None,
             'create_by': self.create_by
         }
+
+
+class MatchPendingCadre(db.Model):
+    """待重新匹配干部表"""
+    __tablename__ = 'match_pending_cadre'
+    __table_args__ = (
+        db.Index('idx_mark_time', 'mark_time'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '待重新匹配干部表-批量导入能力评分、特质、动态信息后标记需要重算当前岗位匹配度的干部'}
+    )
+
+    cadre_id = db.Column(db.Integer, db.ForeignKey('cadre_basic_info.id', ondelete='CASCADE'), primary_key=True, comment='干部ID')
+    reason = db.Column(db.String(50), comment='标记原因：abilities-能力评分，traits-特质，dynamic_infos-动态信息')
+    mark_time = db.Column(db.DateTime, default=datetime.now, comment='标记时间')
+
+    def to_dict(self):
+        return {
+            'cadre_id': self.cadre_id,
+            'reason': self.reason,
+            'mark_time': self.mark_time.isoformat() if self.mark_time else None
+        }
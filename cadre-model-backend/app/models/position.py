@@ -5,7 +5,10 @@ from app import db
 class PositionInfo(db.Model):
     """岗位信息表"""
     __tablename__ = 'position_info'
-    __table_args__ = {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位信息表-存储岗位的基本信息、编制、职责等'}
+    __table_args__ = (
+        db.Index('ft_position_name', 'position_name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位信息表-存储岗位的基本信息、编制、职责等'}
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     position_code = db.Column(db.String(50), nullable=False, comment='岗位编码')
@@ -70,7 +73,10 @@ class PositionAbilityWeight(db.Model):
 class PositionRequirement(db.Model):
     """岗位要求配置表"""
     __tablename__ = 'position_requirement'
-    __table_args__ = {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位要求配置表-配置岗位的硬性要求和加分项'}
+    __table_args__ = (
+        db.Index('idx_indicator_type', 'indicator_type'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位要求配置表-配置岗位的硬性要求和加分项'}
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     position_id = db.Column(db.Integer, db.ForeignKey('position_info.id'), nullable=False, comment='岗位ID')
@@ -85,6 +91,9 @@ class PositionRequirement(db.Model):
     update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     update_by = db.Column(db.String(50), comment='更新人')
 
+    # 专业、证书要求的ID明细（与 compare_value 同步维护）
+    value_items = db.relationship('PositionRequirementValue', backref='requirement', cascade='all, delete-orphan')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -100,3 +109,82 @@ class PositionRequirement(db.Model):
             'update_time': self.update_time.isoformat() if self.update_time else None,
             'update_by': self.update_by
         }
+
+
+class PositionRequirementValue(db.Model):
+    """岗位要求比较值明细表"""
+    __tablename__ = 'position_requirement_value'
+    __table_args__ = (
+        db.Index('idx_indicator_value', 'indicator_type', 'value_id'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位要求比较值明细表-把专业、证书要求中JSON格式的ID列表拆分为逐条记录，用于按专业或证书反查岗位'}
+    )
+
+    requirement_id = db.Column(db.Integer, db.ForeignKey('position_requirement.id', ondelete='CASCADE'), primary_key=True, comment='岗位要求ID')
+    value_id = db.Column(db.Integer, primary_key=True, comment='专业或证书ID')
+    indicator_type = db.Column(db.String(50), nullable=False, comment='指标类型：major-专业，certificate-证书')
+
+    def to_dict(self):
+        return {
+            'requirement_id': self.requirement_id,
+            'value_id': self.value_id,
+            'indicator_type': self.indicator_type
+        }
+
+
+class PositionRisk(db.Model):
+    """岗位风险表"""
+    __tablename__ = 'position_risk'
+    __table_args__ = (
+        db.Index('idx_risk_level_count', 'risk_level', 'risk_count'),
+        db.Index('idx_incumbent', 'incumbent_id'),
+        db.Index('idx_department', 'department_id'),
+        {'mysql_engine': 'InnoDB', 'mysql_comment': '岗位风险表-预计算岗位风险因子及其输入数据，在任职者、匹配结果、培训记录或部门人数变化时重算'}
+    )
+
+    position_id = db.Column(db.Integer, db.ForeignKey('position_info.id', ondelete='CASCADE'), primary_key=True, comment='岗位ID')
+    # 风险输入数据
+    incumbent_id = db.Column(db.Integer, comment='任职者干部ID（空缺为NULL）')
+    incumbent_name = db.Column(db.String(100), comment='任职者姓名')
+    birth_date = db.Column(db.Date, comment='任职者出生日期')
+    entry_date = db.Column(db.Date, comment='任职者入职日期')
+    department_id = db.Column(db.Integer, comment='任职者部门ID')
+    department_headcount = db.Column(db.Integer, default=0, comment='任职者部门在职人数')
+    match_score = db.Column(db.Float, comment='任职者当前岗位最新匹配得分')
+    last_training_time = db.Column(db.DateTime, comment='任职者最近一次培训记录时间')
+    # 风险因子
+    low_match = db.Column(db.Boolean, default=False, comment='匹配度低：匹配度 < 70')
+    age_risk = db.Column(db.Boolean, default=False, comment='年龄风险：年龄 > 55')
+    single_point = db.Column(db.Boolean, default=False, comment='单点任职：部门人数 <= 1 或岗位空缺')
+    no_training = db.Column(db.Boolean, default=False, comment='培养缺失：3年无培养记录')
+    long_term = db.Column(db.Boolean, default=False, comment='任期过长：任期 > 6年')
+    risk_count = db.Column(db.Integer, default=0, comment='风险因子数量')
+    risk_level = db.Column(db.String(20), comment='风险等级：high-高，medium-中，low-低')
+    calc_date = db.Column(db.Date, comment='风险因子计算日期（年龄、任期、培训窗口随日期变化）')
+    update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    # 关系
+    position = db.relationship('PositionInfo', backref=db.backref('risk', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            'position_id': self.position_id,
+            'incumbent_id': self.incumbent_id,
+            'incumbent_name': self.incumbent_name,
+            'birth_date': self.birth_date.isoformat() if self.birth_date else None,
+            'entry_date': self.entry_date.isoformat() if self.entry_date else None,
+            'department_id': self.department_id,
+            'department_headcount': self.department_headcount,
+            'match_score': self.match_score,
+            'last_training_time': self.last_training_time.isoformat() if self.last_training_time else None,
+            'risks': {
+                'low_match': self.low_match,
+                'age_risk': self.age_risk,
+                'single_point': self.single_point,
+                'no_training': self.no_training,
+                'long_term': self.long_term
+            },
+            'risk_count': self.risk_count,
+            'risk_level': self.risk_level,
+            'calc_date': self.calc_date.isoformat() if self.calc_date else None,
+            'update_time': self.update_time.isoformat() if self.update_time else None
+        }
@@ -82,3 +82,20 @@ class User(db.Model):
             'last_login_time': self.last_login_time.isoformat() if self.last_login_time else None,
             'last_login_ip': self.last_login_ip
         }
+
+
+class DataVersion(db.Model):
+    """数据版本表"""
+    __tablename__ = 'data_version'
+    __table_args__ = {'mysql_engine': 'InnoDB', 'mysql_comment': '数据版本表-记录业务数据的全局版本号，写入干部、岗位、动态信息、匹配结果时递增，用于校验响应缓存'}
+
+    name = db.Column(db.String(50), primary_key=True, comment='版本名称')
+    version = db.Column(db.BigInteger, nullable=False, default=0, comment='版本号')
+    update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'update_time': self.update_time.isoformat() if self.update_time else None
+        }
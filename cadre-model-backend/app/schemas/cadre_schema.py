@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, validates, ValidationError, EXCLUDE
+from marshmallow import Schema, fields, validate, validates, ValidationError, EXCLUDE, pre_load
 from app.utils.ability_constants import ABILITY_DIMENSION_LIST, get_all_tags, get_tags_by_dimension
 from app.utils.dict_constants import MANAGEMENT_LEVEL_LIST, MANAGEMENT_ATTRIBUTION_LIST, EDUCATION_LIST, POLITICAL_STATUS_LIST
 from app.utils.trait_constants import TRAIT_TYPE_LIST
@@ -70,6 +70,27 @@ class CadreTraitSchema(Schema):
     trait_desc = fields.Str(allow_none=True)
 
 
+class CadreTraitBatchItemSchema(Schema):
+    """单个干部的特质列表Schema（批量更新特质）"""
+    cadre_id = fields.Int(required=True)
+    traits = fields.List(fields.Nested(CadreTraitSchema), required=True)
+
+    @pre_load
+    def inject_cadre_id(self, data, **kwargs):
+        """将cadre_id注入到每个特质对象中"""
+        if isinstance(data, dict) and isinstance(data.get('traits'), list):
+            data = dict(data, traits=[
+                dict(trait, cadre_id=data.get('cadre_id')) if isinstance(trait, dict) else trait
+                for trait in data['traits']
+            ])
+        return data
+
+
+class CadreTraitBatchSchema(Schema):
+    """批量更新干部特质Schema"""
+    items = fields.List(fields.Nested(CadreTraitBatchItemSchema), required=True, validate=validate.Length(min=1))
+
+
 class CadreAbilityScoreSchema(Schema):
     """干部能力评分Schema"""
     id = fields.Int(dump_only=True)
@@ -33,3 +33,14 @@ class UserUpdateSchema(Schema):
     status = fields.Int(allow_none=True, validate=validate.OneOf([0, 1]))
     is_admin = fields.Int(allow_none=True, validate=validate.OneOf([0, 1]))
     password = fields.Str(allow_none=True, validate=validate.Length(min=6))
+
+
+class DepartmentMoveItemSchema(Schema):
+    """单个部门调整上级部门Schema（parent_id 为空表示调整为顶级部门）"""
+    id = fields.Int(required=True)
+    parent_id = fields.Int(allow_none=True, load_default=None)
+
+
+class DepartmentMoveSchema(Schema):
+    """批量调整上级部门Schema"""
+    moves = fields.List(fields.Nested(DepartmentMoveItemSchema), required=True, validate=validate.Length(min=1))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from typing import List, Dict, Optional, Iterable
+from datetime import date
+from app.models.cadre import CadreBasicInfo, CadreDynamicInfo, CadreFlowFact
+from app.utils.constants import INFO_TYPE_POSITION_CHANGE, FLOW_SOURCE_INTERNAL, FLOW_SOURCE_EXTERNAL
+from app.utils.cache import mark_data_version_changed
+from app import db
+
+
+class CadreFlowService:
+    """干部流动事实维护服务类"""
+
+    @staticmethod
+    def derive_flow_fact(entry_date: Optional[date], term_start_dates: List[Optional[date]]) -> Dict:
+        """
+        根据入职日期和职务变更记录推导流动事实
+
+        判断逻辑：
+        - 内部培养：有多次职务变更记录，流动年份取首次职务变更的任期开始年份
+        - 外部引进：职务变更记录不超过一次，流动年份取入职年份
+
+        Args:
+            entry_date: 入职日期
+            term_start_dates: 按创建时间升序排列的职务变更任期开始日期列表
+
+        Returns:
+            流动事实字段字典
+        """
+        appointment_count = len(term_start_dates)
+        first_appointment_date = term_start_dates[0] if term_start_dates else None
+        is_internal = appointment_count > 1
+
+        if is_internal:
+            flow_year = first_appointment_date.year if first_appointment_date else None
+        else:
+            flow_year = entry_date.year if entry_date else None
+
+        return {
+            'source_type': FLOW_SOURCE_INTERNAL if is_internal else FLOW_SOURCE_EXTERNAL,
+            'flow_year': flow_year,
+            'first_appointment_date': first_appointment_date,
+            'appointment_count': appointment_count
+        }
+
+    @staticmethod
+    def refresh_cadre(cadre_id: int) -> Optional[CadreFlowFact]:
+        """
+        重新计算单个干部的流动事实（不提交事务，由调用方统一提交）
+
+        Args:
+            cadre_id: 干部ID
+
+        Returns:
+            流动事实对象，干部不存在时返回 None
+        """
+        cadre = CadreBasicInfo.query.get(cadre_id)
+        if not cadre:
+            return None
+
+        term_start_dates = [r.term_start_date for r in db.session.query(
+            CadreDynamicInfo.term_start_date
+        ).filter(
+            CadreDynamicInfo.cadre_id == cadre_id,
+            CadreDynamicInfo.info_type == INFO_TYPE_POSITION_CHANGE
+        ).order_by(CadreDynamicInfo.create_time.asc(), CadreDynamicInfo.id.asc()).all()]
+
+        fact_data = CadreFlowService.derive_flow_fact(cadre.entry_date, term_start_dates)
+
+        fact = CadreFlowFact.query.get(cadre_id)
+        if not fact:
+            fact = CadreFlowFact(cadre_id=cadre_id)
+            db.session.add(fact)
+
+        for key, value in fact_data.items():
+            setattr(fact, key, value)
+
+        return fact
+
+    @staticmethod
+    def refresh_cadres(cadre_ids: Iterable[int]) -> int:
+        """
+        批量重新计算多个干部的流动事实（不提交事务，用于批量导入）
+
+        Args:
+            cadre_ids: 干部ID列表
+
+        Returns:
+            更新的记录数
+        """
+        cadre_ids = {cid for cid in cadre_ids if cid}
+        if not cadre_ids:
+            return 0
+
+        cadres = db.session.query(CadreBasicInfo.id, CadreBasicInfo.entry_date).filter(
+            CadreBasicInfo.id.in_(cadre_ids)
+        ).all()
+
+        records = db.session.query(
+            CadreDynamicInfo.cadre_id,
+            CadreDynamicInfo.term_start_date
+        ).filter(
+            CadreDynamicInfo.cadre_id.in_(cadre_ids),
+            CadreDynamicInfo.info_type == INFO_TYPE_POSITION_CHANGE
+        ).order_by(CadreDynamicInfo.create_time.asc(), CadreDynamicInfo.id.asc()).all()
+
+        term_dates_dict = {}
+        for record in records:
+            term_dates_dict.setdefault(record.cadre_id, []).append(record.term_start_date)
+
+        facts = {fact.cadre_id: fact for fact in CadreFlowFact.query.filter(
+            CadreFlowFact.cadre_id.in_(cadre_ids)
+        ).all()}
+
+        for cadre in cadres:
+            fact = facts.get(cadre.id)
+            if not fact:
+                fact = CadreFlowFact(cadre_id=cadre.id)
+                db.session.add(fact)
+            fact_data = CadreFlowService.derive_flow_fact(cadre.entry_date, term_dates_dict.get(cadre.id, []))
+            for key, value in fact_data.items():
+                setattr(fact, key, value)
+
+        return len(cadres)
+
+    @staticmethod
+    def rebuild_all() -> int:
+        """
+        全量重建流动事实表（用于初次部署或数据修复）
+
+        Returns:
+            重建的记录数
+        """
+        cadres = db.session.query(CadreBasicInfo.id, CadreBasicInfo.entry_date).all()
+
+        # 一次性获取所有职务变更记录，按干部分组
+        records = db.session.query(
+            CadreDynamicInfo.cadre_id,
+            CadreDynamicInfo.term_start_date
+        ).filter(
+            CadreDynamicInfo.info_type == INFO_TYPE_POSITION_CHANGE
+        ).order_by(CadreDynamicInfo.create_time.asc(), CadreDynamicInfo.id.asc()).all()
+
+        term_dates_dict = {}
+        for record in records:
+            term_dates_dict.setdefault(record.cadre_id, []).append(record.term_start_date)
+
+        CadreFlowFact.query.delete()
+
+        facts = []
+        for cadre in cadres:
+            fact_data = CadreFlowService.derive_flow_fact(cadre.entry_date, term_dates_dict.get(cadre.id, []))
+            fact_data['cadre_id'] = cadre.id
+            facts.append(fact_data)
+
+        if facts:
+            db.session.bulk_insert_mappings(CadreFlowFact, facts)
+        # bulk_insert_mappings 不经过 Session 事件，显式标记以使流动统计相关的缓存失效
+        mark_data_version_changed()
+        db.session.commit()
+
+        return len(facts)
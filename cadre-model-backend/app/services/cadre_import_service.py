@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+from typing import Dict, List, Optional, Set, Tuple
+from marshmallow import ValidationError
+from app.models.cadre import CadreBasicInfo
+from app.models.department import Department
+from app.models.position import PositionInfo
+from app.schemas.cadre_schema import CadreSchema
+from app.services.cadre_flow_service import CadreFlowService
+from app.services.position_risk_service import PositionRiskService
+from app.services.department_stat_service import DepartmentStatService
+from app.utils.spreadsheet import iter_spreadsheet_rows, chunked, normalize_date_text
+from app import db
+
+# 导入模板表头与字段的对应关系
+CADRE_IMPORT_HEADERS = {
+    '工号': 'employee_no',
+    '姓名': 'name',
+    '手机号': 'phone',
+    '部门': 'department_name',
+    '岗位': 'position_name',
+    '岗级': 'job_grade',
+    '管理层级': 'management_level',
+    '管理归属': 'management_attribution',
+    '性别': 'gender',
+    '出生日期': 'birth_date',
+    '毕业院校': 'graduated_school',
+    '学历': 'education',
+    '政治面貌': 'political_status',
+    '入职时间': 'entry_date',
+    '入职日期': 'entry_date',
+    '工作省份': 'work_province',
+    '学生兵级届': 'student_soldier_class',
+    '是否外派': 'is_dispatched',
+    '状态': 'status'
+}
+
+# 需要按字符串处理的字段（表格中的纯数字工号、手机号会被读成数字）
+CADRE_IMPORT_STRING_FIELDS = {'employee_no', 'name', 'phone', 'gender', 'graduated_school', 'work_province'}
+
+CADRE_IMPORT_DATE_FIELDS = {'birth_date', 'entry_date'}
+
+CADRE_STATUS_NAMES = {'在职': 1, '离职': 2, '退休': 3}
+
+BOOLEAN_NAMES = {'是': True, '否': False, 'true': True, 'false': False, '1': True, '0': False}
+
+# 每个事务处理的行数
+IMPORT_CHUNK_SIZE = 500
+
+class CadreImportService:
+    """干部批量导入服务类"""
+
+    @staticmethod
+    def import_cadres(file, filename: str, dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+        """
+        从 xlsx/csv 文件批量导入干部，按工号新增或更新
+
+        文件逐行流式读取，每 chunk_size 行为一批：批量校验、按工号一次查出已有干部、
+        新增或更新后在一个事务内提交，并批量重算流动事实、岗位风险和部门统计。
+
+        Args:
+            file: 二进制文件对象
+            filename: 文件名
+            dry_run: 仅校验不写入
+            chunk_size: 每批行数
+
+        Returns:
+            导入报告：总行数、新增数、更新数、失败数、逐行错误
+        """
+        lookups = CadreImportService._build_lookups()
+        report = {'total': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+        seen_employee_nos = set()
+
+        rows = iter_spreadsheet_rows(file, filename, CADRE_IMPORT_HEADERS)
+        for chunk in chunked(rows, chunk_size):
+            CadreImportService._import_chunk(chunk, lookups, seen_employee_nos, report, dry_run)
+
+        return report
+
+    @staticmethod
+    def _build_lookups() -> Dict:
+        """一次性加载部门、岗位名称到ID的映射"""
+        departments = {}
+        for dept in db.session.query(Department.id, Department.name).all():
+            departments.setdefault(dept.name, []).append(dept.id)
+
+        positions = {}
+        for position in db.session.query(PositionInfo.id, PositionInfo.position_name, PositionInfo.position_code).all():
+            positions.setdefault(position.position_name, []).append(position.id)
+            positions.setdefault(position.position_code, []).append(position.id)
+
+        return {'department': departments, 'position': positions}
+
+    @staticmethod
+    def _resolve_name(lookup: Dict[str, List[int]], name, label: str) -> Tuple[Optional[int], Optional[str]]:
+        ids = set(lookup.get(str(name), []))
+        if not ids:
+            return None, f'{label}“{name}”不存在'
+        if len(ids) > 1:
+            return None, f'{label}“{name}”不唯一'
+        return ids.pop(), None
+
+    @staticmethod
+    def _convert_row(record: Dict, lookups: Dict) -> Tuple[Dict, Dict]:
+        """把表格值转换为 Schema 可接受的格式，返回 (数据, 错误)"""
+        data = {}
+        errors = {}
+        for field, value in record.items():
+            if field == 'department_name':
+                data['department_id'], error = CadreImportService._resolve_name(lookups['department'], value, '部门')
+                if error:
+                    errors['department_id'] = [error]
+            elif field == 'position_name':
+                data['position_id'], error = CadreImportService._resolve_name(lookups['position'], value, '岗位')
+                if error:
+                    errors['position_id'] = [error]
+            elif field == 'status' and str(value) in CADRE_STATUS_NAMES:
+                data[field] = CADRE_STATUS_NAMES[str(value)]
+            elif field == 'is_dispatched' and str(value).lower() in BOOLEAN_NAMES:
+                data[field] = BOOLEAN_NAMES[str(value).lower()]
+            elif field in CADRE_IMPORT_DATE_FIELDS:
+                data[field] = normalize_date_text(value)
+            elif field in CADRE_IMPORT_STRING_FIELDS:
+                data[field] = str(value)
+            else:
+                data[field] = value
+        return data, errors
+
+    @staticmethod
+    def _import_chunk(chunk: List[Tuple[int, Dict]], lookups: Dict, seen_employee_nos: Set[str],
+                      report: Dict, dry_run: bool) -> None:
+        """导入一批数据（一个事务）"""
+        def add_error(row_number, employee_no, errors):
+            report['failed'] += 1
+            report['errors'].append({'row': row_number, 'employee_no': employee_no, 'errors': errors})
+
+        prepared = []
+        for row_number, record in chunk:
+            report['total'] += 1
+            data, errors = CadreImportService._convert_row(record, lookups)
+            if errors:
+                add_error(row_number, data.get('employee_no'), errors)
+            else:
+                prepared.append((row_number, data))
+
+        if not prepared:
+            return
+
+        # 整批校验，错误按下标对应到行
+        try:
+            loaded = CadreSchema(many=True).load([data for _, data in prepared])
+            validation_errors = {}
+        except ValidationError as e:
+            loaded = e.valid_data
+            validation_errors = e.messages
+
+        # 校验通过的行才记录工号：失败行之后同一工号的行按自身数据导入或报错，不算重复
+        valid_rows = []
+        for index, (row_number, data) in enumerate(prepared):
+            employee_no = data.get('employee_no')
+            if index in validation_errors:
+                add_error(row_number, employee_no, validation_errors[index])
+            elif employee_no in seen_employee_nos:
+                add_error(row_number, employee_no, {'employee_no': ['文件中工号重复']})
+            else:
+                seen_employee_nos.add(employee_no)
+                # 只更新表格中提供的字段，避免 Schema 默认值覆盖已有数据
+                valid_rows.append((row_number, {k: v for k, v in loaded[index].items() if k in data}))
+
+        if not valid_rows:
+            return
+
+        existing = {cadre.employee_no: cadre for cadre in CadreBasicInfo.query.filter(
+            CadreBasicInfo.employee_no.in_([data['employee_no'] for _, data in valid_rows])
+        ).all()}
+
+        if dry_run:
+            for _, data in valid_rows:
+                report['updated' if data['employee_no'] in existing else 'created'] += 1
+            return
+
+        created = []
+        flow_cadres = []
+        touched = []
+        risk_before = []
+        try:
+            for _, data in valid_rows:
+                cadre = existing.get(data['employee_no'])
+                if cadre:
+                    risk_before.append(PositionRiskService.snapshot_cadre(cadre))
+                    for key, value in data.items():
+                        setattr(cadre, key, value)
+                    if 'entry_date' in data:
+                        flow_cadres.append(cadre)
+                else:
+                    cadre = CadreBasicInfo(**data)
+                    db.session.add(cadre)
+                    created.append(cadre)
+                    flow_cadres.append(cadre)
+                touched.append(cadre)
+
+            db.session.flush()
+
+            # 批量初始化流动事实，重算受影响的岗位风险和部门统计
+            CadreFlowService.refresh_cadres(cadre.id for cadre in flow_cadres)
+            position_ids = set()
+            department_ids = set()
+            for state in risk_before + [PositionRiskService.snapshot_cadre(cadre) for cadre in touched]:
+                position_ids.add(state['position_id'])
+                department_ids.add(state['department_id'])
+            position_ids.update(PositionRiskService.get_affected_positions(department_ids=department_ids))
+            PositionRiskService.refresh_positions(position_ids)
+            DepartmentStatService.refresh_departments(department_ids)
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for row_number, data in valid_rows:
+                add_error(row_number, data.get('employee_no'), {'_schema': [f'写入失败: {e}']})
+            # 写入失败的工号不占用，后续同一工号的行仍可导入
+            seen_employee_nos.difference_update(data['employee_no'] for _, data in valid_rows)
+            return
+
+        report['created'] += len(created)
+        report['updated'] += len(valid_rows) - len(created)
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+from typing import Dict, List, Tuple, Callable
+from marshmallow import ValidationError
+from sqlalchemy import insert, tuple_
+from app.models.cadre import CadreBasicInfo, CadreAbilityScore, CadreTrait, CadreDynamicInfo
+from app.schemas.cadre_schema import CadreAbilityScoreSchema, CadreTraitSchema, CadreDynamicInfoSchema
+from app.services.cadre_flow_service import CadreFlowService
+from app.services.match_service import MatchService
+from app.services.position_risk_service import PositionRiskService
+from app.utils.ability_constants import ABILITY_DIMENSIONS
+from app.utils.trait_constants import TRAITS_CONFIG, TRAIT_VALUE_DESCRIPTION_MAP
+from app.utils.constants import INFO_TYPE_POSITION_CHANGE, INFO_TYPE_TRAINING
+from app.utils.spreadsheet import iter_spreadsheet_rows, chunked, normalize_date_text
+from app import db
+
+# 每个事务处理的行数
+IMPORT_CHUNK_SIZE = 500
+
+# 能力标签 -> 能力维度
+ABILITY_TAG_DIMENSIONS = {tag: dimension for dimension, tags in ABILITY_DIMENSIONS.items() for tag in tags}
+
+# 特质类型中文名称（宽表每个特质类型一列）
+TRAIT_TYPE_NAMES = tuple(config['name'] for config in TRAITS_CONFIG.values())
+
+# 能力评分导入表头：长表（每行一个标签）或宽表（每个标签一列）
+ABILITY_IMPORT_HEADERS = {
+    '工号': 'employee_no',
+    '能力维度': 'ability_dimension',
+    '能力标签': 'ability_tag',
+    '评分': 'score',
+    '评估人': 'assessor',
+    '评估日期': 'assessment_date',
+    '评估意见': 'comment',
+    **{tag: tag for tag in ABILITY_TAG_DIMENSIONS}
+}
+
+# 特质导入表头：长表（每行一个特质类型）或宽表（每个特质类型一列）
+TRAIT_IMPORT_HEADERS = {
+    '工号': 'employee_no',
+    '特质类型': 'trait_type',
+    '特质值': 'trait_value',
+    '特质描述': 'trait_desc',
+    **{name: name for name in TRAIT_TYPE_NAMES}
+}
+
+DYNAMIC_INFO_TYPE_NAMES = {
+    '培训记录': 1,
+    '项目经历': 2,
+    '绩效数据': 3,
+    '奖惩记录': 4,
+    '职务变更': 5,
+    '工作经历': 6
+}
+
+# 动态信息导入表头取字段注释中“：”之前的部分，如“培训名称”
+DYNAMIC_INFO_IMPORT_HEADERS = {
+    '工号': 'employee_no',
+    **{
+        column.comment.split('：')[0]: column.name
+        for column in CadreDynamicInfo.__table__.columns
+        if column.comment and column.name not in ('id', 'cadre_id', 'create_time', 'update_time')
+    }
+}
+
+DYNAMIC_INFO_DATE_FIELDS = {
+    name for name, field in CadreDynamicInfoSchema().fields.items()
+    if field.__class__.__name__ == 'Date'
+}
+
+DYNAMIC_INFO_STRING_FIELDS = {
+    name for name, field in CadreDynamicInfoSchema().fields.items()
+    if field.__class__.__name__ == 'String'
+}
+
+
+class CadreProfileImportService:
+    """干部能力评分、特质、动态信息批量导入服务类"""
+
+    @staticmethod
+    def import_ability_scores(file, filename: str, current_user: str = None,
+                              chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+        """
+        批量导入能力评分，按 (干部, 能力标签) 覆盖已有评分
+
+        支持两种格式：
+        - 长表：工号、能力标签、评分[、能力维度、评估人、评估日期、评估意见]
+        - 宽表：工号 + 每个能力标签一列（列值为评分）[、评估人、评估日期、评估意见]
+        """
+        today = date.today().isoformat()
+
+        def expand(record: Dict) -> List[Dict]:
+            common = {
+                'assessor': record.get('assessor') or current_user,
+                'assessment_date': normalize_date_text(record.get('assessment_date')) or today,
+                'comment': record.get('comment')
+            }
+            if 'ability_tag' in record:
+                tag = str(record['ability_tag'])
+                entries = [{
+                    'ability_tag': tag,
+                    'ability_dimension': record.get('ability_dimension') or ABILITY_TAG_DIMENSIONS.get(tag, ''),
+                    'score': record.get('score')
+                }]
+            else:
+                entries = [
+                    {'ability_tag': tag, 'ability_dimension': ABILITY_TAG_DIMENSIONS[tag], 'score': record[tag]}
+                    for tag in ABILITY_TAG_DIMENSIONS if tag in record
+                ]
+            for entry in entries:
+                if entry['ability_tag'] in ABILITY_TAG_DIMENSIONS \
+                        and entry['ability_dimension'] != ABILITY_TAG_DIMENSIONS[entry['ability_tag']]:
+                    entry['_error'] = {'ability_dimension': [f'能力标签“{entry["ability_tag"]}”不属于该维度']}
+                entry.update({k: v for k, v in common.items() if v is not None})
+            return entries
+
+        return CadreProfileImportService._import(
+            file, filename, ABILITY_IMPORT_HEADERS, expand, CadreAbilityScoreSchema,
+            CadreAbilityScore, CadreAbilityScore.ability_tag, 'abilities', chunk_size
+        )
+
+    @staticmethod
+    def import_traits(file, filename: str, current_user: str = None, chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+        """
+        批量导入特质，按 (干部, 特质类型) 覆盖已有特质
+
+        支持两种格式：
+        - 长表：工号、特质类型、特质值[、特质描述]
+        - 宽表：工号 + 每个特质类型一列（列值为特质值）
+        """
+        def expand(record: Dict) -> List[Dict]:
+            if 'trait_type' in record:
+                entries = [{
+                    'trait_type': str(record['trait_type']),
+                    'trait_value': record.get('trait_value'),
+                    'trait_desc': record.get('trait_desc')
+                }]
+            else:
+                entries = [
+                    {'trait_type': name, 'trait_value': record[name]}
+                    for name in TRAIT_TYPE_NAMES if name in record
+                ]
+            for entry in entries:
+                # 特质类型可以是英文键或中文名称，特质值及描述统一查 TRAIT_VALUE_DESCRIPTION_MAP
+                trait_type = entry['trait_type']
+                if (trait_type in TRAITS_CONFIG or trait_type in TRAIT_TYPE_NAMES) and entry['trait_value'] is not None:
+                    entry['trait_value'] = str(entry['trait_value'])
+                    description = TRAIT_VALUE_DESCRIPTION_MAP.get((trait_type, entry['trait_value']))
+                    if description is None:
+                        entry['_error'] = {'trait_value': [f'特质值“{entry["trait_value"]}”无效']}
+                    elif not entry.get('trait_desc'):
+                        entry['trait_desc'] = description
+                if entry.get('trait_desc') is None:
+                    entry.pop('trait_desc', None)
+            return entries
+
+        def add_update_by(rows: List[Dict]) -> None:
+            for row in rows:
+                row['update_by'] = current_user
+
+        return CadreProfileImportService._import(
+            file, filename, TRAIT_IMPORT_HEADERS, expand, CadreTraitSchema,
+            CadreTrait, CadreTrait.trait_type, 'traits', chunk_size,
+            before_insert=add_update_by if current_user else None
+        )
+
+    @staticmethod
+    def import_dynamic_infos(file, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict:
+        """
+        批量导入动态信息（追加记录）
+
+        表头：工号、信息类型（培训记录/项目经历/绩效数据/奖惩记录/职务变更/工作经历 或 1-6）
+        以及对应类型的字段，字段表头与动态信息表字段注释一致，如“培训名称”“培训日期”。
+        """
+        def expand(record: Dict) -> List[Dict]:
+            entry = {}
+            for field, value in record.items():
+                if field == 'info_type':
+                    entry[field] = DYNAMIC_INFO_TYPE_NAMES.get(str(value), value)
+                elif field == 'is_core_project':
+                    entry[field] = str(value) in ('是', '1', 'true', 'True')
+                elif field in DYNAMIC_INFO_DATE_FIELDS:
+                    entry[field] = normalize_date_text(value)
+                elif field in DYNAMIC_INFO_STRING_FIELDS:
+                    entry[field] = str(value)
+                elif field != 'employee_no':
+                    entry[field] = value
+            return [entry]
+
+        def after_insert(cadre_ids_by_type: Dict[int, set]) -> None:
+            # 职务变更记录影响流动事实，培训记录影响岗位风险
+            CadreFlowService.refresh_cadres(cadre_ids_by_type.get(INFO_TYPE_POSITION_CHANGE, set()))
+            PositionRiskService.refresh_for_cadres(cadre_ids_by_type.get(INFO_TYPE_TRAINING, set()))
+
+        return CadreProfileImportService._import(
+            file, filename, DYNAMIC_INFO_IMPORT_HEADERS, expand, CadreDynamicInfoSchema,
+            CadreDynamicInfo, None, 'dynamic_infos', chunk_size, after_insert=after_insert
+        )
+
+    @staticmethod
+    def _import(file, filename: str, headers: Dict[str, str], expand: Callable, schema_class, model,
+                key_column, reason: str, chunk_size: int, before_insert: Callable = None,
+                after_insert: Callable = None) -> Dict:
+        """
+        通用导入流程：逐行读取 -> 每批按工号一次查出干部ID -> 批量校验 -> 按键覆盖或追加写入 -> 提交
+
+        Args:
+            headers: 表头映射
+            expand: 把一行记录展开为若干条待写入数据的函数，数据中的 _error 为预校验错误
+            schema_class: 校验 Schema
+            model: 写入的模型
+            key_column: 覆盖写入时与 cadre_id 组成唯一键的列，None 表示只追加
+            reason: 待重新匹配标记原因
+            before_insert: 写入前补充字段的函数
+            after_insert: 写入后按信息类型处理联动数据的函数（仅动态信息）
+
+        Returns:
+            导入报告：总行数、写入记录数、失败行数、涉及干部数、逐行错误
+        """
+        report = {'total': 0, 'imported': 0, 'failed': 0, 'cadres': 0, 'errors': []}
+        affected_cadre_ids = set()
+
+        for chunk in chunked(iter_spreadsheet_rows(file, filename, headers), chunk_size):
+            imported_ids = CadreProfileImportService._import_chunk(
+                chunk, expand, schema_class, model, key_column, report, before_insert, after_insert
+            )
+            affected_cadre_ids.update(imported_ids)
+
+        # 所有批次写入完成后一次性标记待重新匹配的干部
+        if affected_cadre_ids:
+            MatchService.mark_cadres_for_rematch(affected_cadre_ids, reason)
+            db.session.commit()
+
+        report['cadres'] = len(affected_cadre_ids)
+        return report
+
+    @staticmethod
+    def _import_chunk(chunk: List[Tuple[int, Dict]], expand: Callable, schema_class, model, key_column,
+                      report: Dict, before_insert: Callable, after_insert: Callable) -> set:
+        """导入一批数据（一个事务），返回写入成功的干部ID"""
+        failed_rows = {}
+
+        def add_error(row_number, employee_no, errors):
+            if row_number not in failed_rows:
+                report['failed'] += 1
+                failed_rows[row_number] = {'row': row_number, 'employee_no': employee_no, 'errors': {}}
+                report['errors'].append(failed_rows[row_number])
+            failed_rows[row_number]['errors'].update(errors)
+
+        employee_nos = {str(record['employee_no']) for _, record in chunk if record.get('employee_no') is not None}
+        cadre_ids = dict(db.session.query(CadreBasicInfo.employee_no, CadreBasicInfo.id).filter(
+            CadreBasicInfo.employee_no.in_(employee_nos)
+        ).all()) if employee_nos else {}
+
+        prepared = []
+        for row_number, record in chunk:
+            report['total'] += 1
+            employee_no = str(record['employee_no']) if record.get('employee_no') is not None else None
+            cadre_id = cadre_ids.get(employee_no)
+            if cadre_id is None:
+                add_error(row_number, employee_no, {'employee_no': [f'工号“{employee_no}”不存在' if employee_no else '缺少工号']})
+                continue
+            entries = expand(record)
+            if not entries:
+                add_error(row_number, employee_no, {'_schema': ['没有可导入的数据']})
+                continue
+            for entry in entries:
+                error = entry.pop('_error', None)
+                if error:
+                    add_error(row_number, employee_no, error)
+                entry['cadre_id'] = cadre_id
+                prepared.append((row_number, employee_no, entry))
+
+        # 整批校验，错误按下标对应到行
+        try:
+            loaded = schema_class(many=True).load([entry for _, _, entry in prepared])
+            validation_errors = {}
+        except ValidationError as e:
+            loaded = e.valid_data
+            validation_errors = e.messages
+
+        for index, (row_number, employee_no, _) in enumerate(prepared):
+            if index in validation_errors:
+                add_error(row_number, employee_no, validation_errors[index])
+
+        # 同一行有任何错误则整行不导入；覆盖写入时同一键以最后一条为准
+        rows = {}
+        for index, (row_number, _, _) in enumerate(prepared):
+            if row_number in failed_rows:
+                continue
+            data = loaded[index]
+            key = (data['cadre_id'], data[key_column.key]) if key_column is not None else index
+            rows[key] = data
+        rows = list(rows.values())
+        if not rows:
+            return set()
+
+        imported_cadre_ids = {row['cadre_id'] for row in rows}
+        try:
+            if key_column is not None:
+                model.query.filter(
+                    tuple_(model.cadre_id, key_column).in_(
+                        [(row['cadre_id'], row[key_column.key]) for row in rows]
+                    )
+                ).delete(synchronize_session=False)
+            if before_insert:
+                before_insert(rows)
+            # executemany 要求每条数据的字段一致：按字段组合分组写入，未提供的字段使用模型默认值而不是写入 NULL
+            groups = {}
+            for row in rows:
+                groups.setdefault(frozenset(row), []).append(row)
+            for group in groups.values():
+                db.session.execute(insert(model), group)
+
+            if after_insert:
+                cadre_ids_by_type = {}
+                for row in rows:
+                    cadre_ids_by_type.setdefault(row.get('info_type'), set()).add(row['cadre_id'])
+                after_insert(cadre_ids_by_type)
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            rows_in_chunk = {row_number for row_number, _, _ in prepared if row_number not in failed_rows}
+            for row_number, employee_no, _ in prepared:
+                if row_number in rows_in_chunk:
+                    add_error(row_number, employee_no, {'_schema': [f'写入失败: {e}']})
+            return set()
+
+        report['imported'] += len(rows)
+        return imported_cadre_ids
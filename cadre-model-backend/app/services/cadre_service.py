@@ -1,21 +1,80 @@
 from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from datetime import date
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, and_, insert, update, delete
+from datetime import date, datetime
 from app.models.cadre import CadreBasicInfo, CadreDynamicInfo, CadreTrait, CadreAbilityScore
+from app.models.department import Department
+from app.models.position import PositionInfo
+from app.services.cadre_flow_service import CadreFlowService
+from app.services.position_risk_service import PositionRiskService
+from app.services.department_stat_service import DepartmentStatService
+from app.utils.constants import (
+    INFO_TYPE_TRAINING, INFO_TYPE_PROJECT, INFO_TYPE_ASSESSMENT, INFO_TYPE_REWARD,
+    INFO_TYPE_POSITION_CHANGE, INFO_TYPE_WORK_EXPERIENCE,
+    CADRE_PROFILE_LIST, CADRE_PROFILE_DETAIL, CADRE_PROFILES,
+    CADRE_SECTION_BASIC, CADRE_SECTION_TRAITS, CADRE_SECTION_ABILITIES,
+    CADRE_SECTION_DYNAMIC_INFO, CADRE_SECTION_AI_ANALYSIS, CADRE_SECTION_MATCH_RESULT, CADRE_SECTIONS
+)
 from app import db
 
 
 class CadreService:
     """干部业务服务类"""
 
+    # 列表方案查询的干部字段
+    CADRE_LIST_COLUMNS = (
+        CadreBasicInfo.id,
+        CadreBasicInfo.employee_no,
+        CadreBasicInfo.name,
+        CadreBasicInfo.gender,
+        CadreBasicInfo.birth_date,
+        CadreBasicInfo.education,
+        CadreBasicInfo.department_id,
+        CadreBasicInfo.position_id,
+        CadreBasicInfo.job_grade,
+        CadreBasicInfo.management_level,
+        CadreBasicInfo.status
+    )
+
+    # 影响部门统计的干部字段
+    DEPARTMENT_STAT_FIELDS = {'department_id', 'status', 'management_level', 'position_id'}
+
+    # 影响岗位风险的干部字段（任职岗位、部门在职人数及岗位风险表中存储的任职者信息）
+    POSITION_RISK_FIELDS = {'position_id', 'department_id', 'status', 'name', 'birth_date', 'entry_date'}
+
+    # 动态信息各类型共有的字段
+    DYNAMIC_INFO_COMMON_FIELDS = ('id', 'cadre_id', 'info_type', 'create_time', 'remark')
+
+    # 动态信息各类型自有的字段
+    DYNAMIC_INFO_TYPE_FIELDS = {
+        INFO_TYPE_TRAINING: ('training_name', 'training_date', 'training_content', 'training_result'),
+        INFO_TYPE_PROJECT: (
+            'project_no', 'project_name', 'project_role', 'project_start_date', 'project_end_date',
+            'project_result', 'project_rating', 'is_core_project'
+        ),
+        INFO_TYPE_ASSESSMENT: ('assessment_cycle', 'assessment_dimension', 'assessment_grade', 'assessment_comment'),
+        INFO_TYPE_REWARD: ('reward_type', 'reward_reason', 'reward_date'),
+        INFO_TYPE_POSITION_CHANGE: (
+            'position_name', 'responsibility', 'appointment_type', 'term_start_date', 'term_end_date',
+            'approval_record'
+        ),
+        INFO_TYPE_WORK_EXPERIENCE: ('work_start_date', 'work_end_date', 'work_company', 'work_position')
+    }
+
+    # 动态信息中的长文本字段，列表可不加载，查看详情时再获取
+    DYNAMIC_INFO_TEXT_FIELDS = {
+        'training_content', 'project_result', 'assessment_comment',
+        'reward_reason', 'responsibility', 'approval_record'
+    }
+
     @staticmethod
     def get_cadre_list(
         page: int = 1,
         page_size: int = 20,
         name: Optional[str] = None,
         status: Optional[int] = None,
-        department: Optional[str] = None
+        department: Optional[str] = None,
+        profile: str = CADRE_PROFILE_DETAIL
     ) -> Dict:
         """
         获取干部列表
@@ -26,15 +85,121 @@ class CadreService:
             name: 姓名筛选
             status: 状态筛选
             department: 部门ID筛选（包含子部门）
+            profile: 序列化方案，list-列表字段（单条联表查询），detail-完整字段（预加载部门和岗位）
 
         Returns:
             分页结果
         """
-        query = CadreBasicInfo.query
+        if profile not in CADRE_PROFILES:
+            raise ValueError(f'无效的序列化方案: {profile}')
+
+        query = CadreService._filter_cadre_query(CadreBasicInfo.query, name, status, department)
+
+        # 总数
+        total = query.count()
 
-        # 筛选条件
+        # 分页查询
+        rows = CadreService._cadre_profile_query(query, profile).order_by(
+            CadreBasicInfo.id
+        ).offset((page - 1) * page_size).limit(page_size).all()
+        items = CadreService._cadre_profile_items(rows, profile)
+
+        return {
+            'items': items,
+            'total': total,
+            'page': page,
+            'page_size': page_size
+        }
+
+    @staticmethod
+    def get_cadre_page(
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        name: Optional[str] = None,
+        status: Optional[int] = None,
+        department: Optional[str] = None,
+        profile: str = CADRE_PROFILE_DETAIL
+    ) -> Dict:
+        """
+        游标分页获取干部列表（按ID升序）
+
+        Args:
+            page_size: 每页数量
+            cursor: 上一页返回的游标，首页为空
+            其余参数同 get_cadre_list
+
+        Returns:
+            {'items': [...], 'next_cursor': str|None, 'total': int}
+        """
+        from app.utils.helpers import build_cursor_pagination_query
+
+        if profile not in CADRE_PROFILES:
+            raise ValueError(f'无效的序列化方案: {profile}')
+
+        query = CadreService._filter_cadre_query(CadreBasicInfo.query, name, status, department)
+
+        # 总数只统计干部表，不包含联表
+        rows, next_cursor, total = build_cursor_pagination_query(
+            CadreService._cadre_profile_query(query, profile),
+            CadreBasicInfo.id, CadreBasicInfo.id, page_size, cursor=cursor,
+            cursor_key=lambda row: [row.id, row.id], count_query=query
+        )
+
+        return {
+            'items': CadreService._cadre_profile_items(rows, profile),
+            'next_cursor': next_cursor,
+            'total': total
+        }
+
+    @staticmethod
+    def iter_cadre_list(
+        name: Optional[str] = None,
+        status: Optional[int] = None,
+        department: Optional[str] = None,
+        batch_size: int = 1000
+    ):
+        """
+        逐行迭代干部列表（列表方案字段，用于流式导出，按批次从数据库读取）
+
+        Yields:
+            干部字典（与列表方案一致）
+        """
+        query = CadreService._filter_cadre_query(CadreBasicInfo.query, name, status, department)
+        query = CadreService._cadre_profile_query(query, CADRE_PROFILE_LIST).order_by(CadreBasicInfo.id)
+        for row in query.yield_per(batch_size):
+            yield CadreService._cadre_list_row_to_dict(row)
+
+    @staticmethod
+    def _cadre_profile_query(query, profile: str):
+        """按序列化方案构造查询：list 为单条联表投影查询，detail 预加载部门和岗位"""
+        if profile == CADRE_PROFILE_LIST:
+            return query.outerjoin(
+                Department, CadreBasicInfo.department_id == Department.id
+            ).outerjoin(
+                PositionInfo, CadreBasicInfo.position_id == PositionInfo.id
+            ).with_entities(
+                *CadreService.CADRE_LIST_COLUMNS,
+                Department.name.label('department_name'),
+                PositionInfo.position_name
+            )
+        return query.options(
+            joinedload(CadreBasicInfo.department),
+            joinedload(CadreBasicInfo.position)
+        )
+
+    @staticmethod
+    def _cadre_profile_items(rows, profile: str) -> List[Dict]:
+        """按序列化方案转换查询结果"""
+        if profile == CADRE_PROFILE_LIST:
+            return [CadreService._cadre_list_row_to_dict(row) for row in rows]
+        return [cadre.to_dict() for cadre in rows]
+
+    @staticmethod
+    def _filter_cadre_query(query, name: Optional[str], status: Optional[int], department: Optional[str]):
+        """应用干部列表筛选条件"""
         if name:
-            query = query.filter(CadreBasicInfo.name.like(f'%{name}%'))
+            from app.services.search_service import SearchService
+            query = SearchService.filter_cadre_name(query, name)
         if status is not None:
             query = query.filter(CadreBasicInfo.status == status)
 
@@ -43,31 +208,103 @@ class CadreService:
             from app.services.department_service import DepartmentService
             try:
                 dept_id = int(department)
-                # 获取该部门及所有子部门ID
-                child_ids = DepartmentService._get_all_child_department_ids(dept_id)
-                all_dept_ids = {dept_id} | child_ids
-                query = query.filter(CadreBasicInfo.department_id.in_(all_dept_ids))
+                query = query.filter(DepartmentService.subtree_filter(CadreBasicInfo.department_id, dept_id))
             except (ValueError, TypeError):
                 pass
 
-        # 总数
-        total = query.count()
-
-        # 分页查询
-        items = query.offset((page - 1) * page_size).limit(page_size).all()
+        return query
 
+    @staticmethod
+    def _cadre_list_row_to_dict(row) -> Dict:
+        """列表方案查询行转换为字典（字段名与 CadreBasicInfo.to_dict 一致）"""
         return {
-            'items': [item.to_dict() for item in items],
-            'total': total,
-            'page': page,
-            'page_size': page_size
+            'id': row.id,
+            'employee_no': row.employee_no,
+            'name': row.name,
+            'gender': row.gender,
+            'birth_date': row.birth_date.isoformat() if row.birth_date else None,
+            'education': row.education,
+            'department_id': row.department_id,
+            'department': {'id': row.department_id, 'name': row.department_name} if row.department_id else None,
+            'position_id': row.position_id,
+            'position': {'id': row.position_id, 'position_name': row.position_name} if row.position_id else None,
+            'job_grade': row.job_grade,
+            'management_level': row.management_level,
+            'status': row.status
         }
 
     @staticmethod
-    def get_cadre_by_id(cadre_id: int) -> Optional[CadreBasicInfo]:
-        """根据ID获取干部"""
+    def get_cadre_by_id(cadre_id: int, eager: bool = False) -> Optional[CadreBasicInfo]:
+        """根据ID获取干部（eager 为 True 时同时加载部门和岗位）"""
+        if eager:
+            return CadreBasicInfo.query.options(
+                joinedload(CadreBasicInfo.department),
+                joinedload(CadreBasicInfo.position)
+            ).filter(CadreBasicInfo.id == cadre_id).first()
         return CadreBasicInfo.query.get(cadre_id)
 
+    @staticmethod
+    def get_cadre_profile(cadre_id: int, sections: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        获取干部档案聚合数据（详情页一次请求获取所有分区）
+
+        干部（含部门、岗位）一次联表查询，其余每个分区一条查询，查询数不随记录数增长。
+
+        Args:
+            cadre_id: 干部ID
+            sections: 需要的分区列表，为空表示全部分区
+
+        Returns:
+            {分区名: 数据}，干部不存在时返回 None
+
+        Raises:
+            ValueError: 分区名无效
+        """
+        sections = sections or CADRE_SECTIONS
+        invalid = [section for section in sections if section not in CADRE_SECTIONS]
+        if invalid:
+            raise ValueError(f'无效的分区: {", ".join(invalid)}')
+
+        # 干部本身总要查询（判断是否存在、匹配结果需要当前岗位）
+        cadre = CadreService.get_cadre_by_id(cadre_id, eager=True)
+        if not cadre:
+            return None
+
+        profile = {}
+        if CADRE_SECTION_BASIC in sections:
+            profile[CADRE_SECTION_BASIC] = cadre.to_dict()
+        if CADRE_SECTION_TRAITS in sections:
+            profile[CADRE_SECTION_TRAITS] = [t.to_dict() for t in CadreService.get_cadre_traits(cadre_id)]
+        if CADRE_SECTION_ABILITIES in sections:
+            profile[CADRE_SECTION_ABILITIES] = [a.to_dict() for a in CadreService.get_cadre_abilities(cadre_id)]
+        if CADRE_SECTION_DYNAMIC_INFO in sections:
+            profile[CADRE_SECTION_DYNAMIC_INFO] = CadreService.get_cadre_dynamic_info(cadre_id)
+        if CADRE_SECTION_AI_ANALYSIS in sections:
+            from app.models.ai_analysis import AIAnalysis
+            analysis = AIAnalysis.query.filter_by(cadre_id=cadre_id).order_by(
+                AIAnalysis.created_at.desc()
+            ).first()
+            profile[CADRE_SECTION_AI_ANALYSIS] = analysis.to_dict() if analysis else None
+        if CADRE_SECTION_MATCH_RESULT in sections:
+            profile[CADRE_SECTION_MATCH_RESULT] = CadreService._get_current_match_result(cadre)
+
+        return profile
+
+    @staticmethod
+    def _get_current_match_result(cadre: CadreBasicInfo) -> Optional[Dict]:
+        """获取干部当前岗位的匹配结果（干部和岗位已在会话中，序列化时不再查询）"""
+        from app.models.match import MatchResult
+
+        if not cadre.position_id:
+            return None
+        result = MatchResult.query.options(
+            joinedload(MatchResult.best_match_position)
+        ).filter(
+            MatchResult.cadre_id == cadre.id,
+            MatchResult.position_id == cadre.position_id
+        ).order_by(MatchResult.final_score.desc()).first()
+        return result.to_dict() if result else None
+
     @staticmethod
     def create_cadre(data: Dict) -> CadreBasicInfo:
         """
@@ -85,6 +322,13 @@ class CadreService:
 
         cadre = CadreBasicInfo(**data)
         db.session.add(cadre)
+        db.session.flush()
+
+        # 初始化流动事实，重算受影响的岗位风险和部门统计
+        CadreFlowService.refresh_cadre(cadre.id)
+        PositionRiskService.refresh_after_cadre_change(cadre)
+        DepartmentStatService.refresh_departments({cadre.department_id})
+
         db.session.commit()
         db.session.refresh(cadre)
         return cadre
@@ -110,10 +354,24 @@ class CadreService:
             if CadreBasicInfo.query.filter_by(employee_no=data['employee_no']).first():
                 raise ValueError(f'工号 {data["employee_no"]} 已存在')
 
+        risk_before = PositionRiskService.snapshot_cadre(cadre)
+
         for key, value in data.items():
             if hasattr(cadre, key):
                 setattr(cadre, key, value)
 
+        # 任职者、部门人数或任职者信息变化会影响岗位风险
+        if CadreService.POSITION_RISK_FIELDS & set(data):
+            PositionRiskService.refresh_after_cadre_change(cadre, risk_before)
+
+        # 部门、状态、管理层级或岗位（当前岗位匹配结果）变化会影响部门统计
+        if CadreService.DEPARTMENT_STAT_FIELDS & set(data):
+            DepartmentStatService.refresh_departments({risk_before['department_id'], cadre.department_id})
+
+        # 入职日期影响外部引进干部的流动年份
+        if 'entry_date' in data:
+            CadreFlowService.refresh_cadre(cadre_id)
+
         db.session.commit()
         db.session.refresh(cadre)
         return cadre
@@ -133,7 +391,10 @@ class CadreService:
         if not cadre:
             return False
 
+        risk_before = PositionRiskService.snapshot_cadre(cadre)
         db.session.delete(cadre)
+        PositionRiskService.refresh_after_cadre_change(None, risk_before)
+        DepartmentStatService.refresh_departments({risk_before['department_id']})
         db.session.commit()
         return True
 
@@ -143,35 +404,107 @@ class CadreService:
         return CadreTrait.query.filter_by(cadre_id=cadre_id).all()
 
     @staticmethod
-    def update_cadre_traits(cadre_id: int, traits: List[Dict]) -> bool:
+    def update_cadre_traits(cadre_id: int, traits: List[Dict], current_user: str = None) -> List[str]:
         """
-        更新干部特质
+        更新干部特质（按特质类型比对，只写入有变化的记录）
 
         Args:
             cadre_id: 干部ID
             traits: 特质列表
+            current_user: 当前登录用户名
 
         Returns:
-            是否更新成功
+            发生变化的特质类型列表
+        """
+        return CadreService.batch_update_cadre_traits({cadre_id: traits}, current_user).get(cadre_id, [])
+
+    @staticmethod
+    def batch_update_cadre_traits(traits_by_cadre: Dict[int, List[Dict]], current_user: str = None) -> Dict[int, List[str]]:
         """
-        from app.utils.trait_constants import get_trait_value_description
+        批量更新多个干部的特质（一次查询已有特质，一个事务内批量写入）
 
-        # 删除原有特质
-        CadreTrait.query.filter_by(cadre_id=cadre_id).delete()
+        每个干部提交的特质列表即为该干部的完整特质：特质值或描述变化的类型原地更新，
+        新类型插入，不再提交的类型删除，未变化的记录保持不动。
 
-        # 添加新特质 (trait_data已包含cadre_id)
-        for trait_data in traits:
-            # 如果没有提供 trait_desc，自动填充
-            if 'trait_desc' not in trait_data or not trait_data['trait_desc']:
-                trait_type = trait_data.get('trait_type')
-                trait_value = trait_data.get('trait_value')
-                trait_data['trait_desc'] = get_trait_value_description(trait_type, trait_value)
+        Args:
+            traits_by_cadre: {干部ID: 特质列表}
+            current_user: 当前登录用户名
 
-            trait = CadreTrait(**trait_data)
-            db.session.add(trait)
+        Returns:
+            {干部ID: 发生变化的特质类型列表}，没有变化的干部不包含在内
 
+        Raises:
+            ValueError: 干部不存在
+        """
+        from app.utils.trait_constants import TRAIT_VALUE_DESCRIPTION_MAP
+
+        if not traits_by_cadre:
+            return {}
+
+        found_ids = {row.id for row in db.session.query(CadreBasicInfo.id).filter(
+            CadreBasicInfo.id.in_(list(traits_by_cadre))
+        ).all()}
+        missing_ids = sorted(set(traits_by_cadre) - found_ids)
+        if missing_ids:
+            raise ValueError(f'干部不存在: {", ".join(str(cadre_id) for cadre_id in missing_ids)}')
+
+        existing = {}
+        for row in db.session.query(
+            CadreTrait.id,
+            CadreTrait.cadre_id,
+            CadreTrait.trait_type,
+            CadreTrait.trait_value,
+            CadreTrait.trait_desc
+        ).filter(CadreTrait.cadre_id.in_(list(traits_by_cadre))).all():
+            existing.setdefault(row.cadre_id, {})[row.trait_type] = row
+
+        now = datetime.now()
+        changed = {}
+        inserts = []
+        updates = []
+        delete_ids = []
+        for cadre_id, traits in traits_by_cadre.items():
+            current = existing.get(cadre_id, {})
+            # 同一类型提交多次时以最后一条为准
+            incoming = {trait_data['trait_type']: trait_data for trait_data in traits}
+            changed_types = []
+
+            for trait_type, trait_data in incoming.items():
+                trait_value = trait_data['trait_value']
+                # 没有提供描述时按特质值自动填充
+                trait_desc = trait_data.get('trait_desc') or TRAIT_VALUE_DESCRIPTION_MAP.get((trait_type, trait_value), '')
+                row = current.get(trait_type)
+                if row is None:
+                    inserts.append({
+                        'cadre_id': cadre_id,
+                        'trait_type': trait_type,
+                        'trait_value': trait_value,
+                        'trait_desc': trait_desc,
+                        'update_by': current_user
+                    })
+                elif row.trait_value != trait_value or row.trait_desc != trait_desc:
+                    updates.append({
+                        'id': row.id,
+                        'trait_value': trait_value,
+                        'trait_desc': trait_desc,
+                        'update_time': now,
+                        'update_by': current_user
+                    })
+                else:
+                    continue
+                changed_types.append(trait_type)
+
+            for trait_type, row in current.items():
+                if trait_type not in incoming:
+                    delete_ids.append(row.id)
+                    changed_types.append(trait_type)
+
+            if changed_types:
+                changed[cadre_id] = changed_types
+
+        CadreService._apply_row_diff(CadreTrait, inserts, updates, delete_ids)
         db.session.commit()
-        return True
+        return changed
 
     @staticmethod
     def get_cadre_abilities(cadre_id: int) -> List[CadreAbilityScore]:
@@ -179,18 +512,114 @@ class CadreService:
         return CadreAbilityScore.query.filter_by(cadre_id=cadre_id).all()
 
     @staticmethod
-    def get_cadre_dynamic_info(cadre_id: int, info_type: int = None) -> List[CadreDynamicInfo]:
-        """获取干部动态信息列表"""
-        query = CadreDynamicInfo.query.filter_by(cadre_id=cadre_id)
+    def get_cadre_dynamic_info(cadre_id: int, info_type: int = None, include_text: bool = True) -> List[Dict]:
+        """
+        获取干部动态信息列表（按类型投影，每条记录只包含通用字段和本类型字段）
+
+        Args:
+            cadre_id: 干部ID
+            info_type: 信息类型，为空表示全部类型
+            include_text: 是否包含长文本字段
+
+        Returns:
+            动态信息字典列表，按创建时间降序
+        """
+        query = db.session.query(
+            *CadreService._dynamic_info_columns(info_type, include_text)
+        ).filter(CadreDynamicInfo.cadre_id == cadre_id)
         if info_type is not None:
-            query = query.filter_by(info_type=info_type)
+            query = query.filter(CadreDynamicInfo.info_type == info_type)
         # 按创建时间降序排序
-        return query.order_by(CadreDynamicInfo.create_time.desc()).all()
+        rows = query.order_by(CadreDynamicInfo.create_time.desc(), CadreDynamicInfo.id.desc()).all()
+        return [CadreService._dynamic_info_row_to_dict(row, include_text) for row in rows]
+
+    @staticmethod
+    def get_dynamic_info_page(
+        cadre_id: int,
+        info_type: int,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_text: bool = False
+    ) -> Dict:
+        """
+        游标分页获取干部某一类型的动态信息（按创建时间降序）
+
+        按 (cadre_id, info_type, create_time) 索引定位，记录很多的干部深翻页也不需要扫描前面的数据。
+
+        Args:
+            cadre_id: 干部ID
+            info_type: 信息类型
+            page_size: 每页数量
+            cursor: 上一页返回的游标，首页为空
+            include_text: 是否包含长文本字段，默认不包含，查看详情时通过 get_dynamic_info_by_id 获取
+
+        Returns:
+            {'items': [...], 'next_cursor': str|None, 'total': int}
+
+        Raises:
+            ValueError: 信息类型无效
+        """
+        from app.utils.helpers import build_cursor_pagination_query
+
+        if info_type not in CadreService.DYNAMIC_INFO_TYPE_FIELDS:
+            raise ValueError(f'无效的信息类型: {info_type}')
+
+        query = db.session.query(
+            *CadreService._dynamic_info_columns(info_type, include_text)
+        ).filter(
+            CadreDynamicInfo.cadre_id == cadre_id,
+            CadreDynamicInfo.info_type == info_type
+        )
+        rows, next_cursor, total = build_cursor_pagination_query(
+            query, CadreDynamicInfo.create_time, CadreDynamicInfo.id, page_size,
+            cursor=cursor, descending=True,
+            cursor_key=lambda row: [row.create_time, row.id]
+        )
+
+        return {
+            'items': [CadreService._dynamic_info_row_to_dict(row, include_text) for row in rows],
+            'next_cursor': next_cursor,
+            'total': total
+        }
+
+    @staticmethod
+    def get_dynamic_info_by_id(info_id: int) -> Optional[CadreDynamicInfo]:
+        """根据ID获取动态信息（完整字段，用于详情查看）"""
+        return CadreDynamicInfo.query.get(info_id)
+
+    @staticmethod
+    def _dynamic_info_columns(info_type: Optional[int], include_text: bool) -> List:
+        """动态信息投影查询的列：指定类型时只查询该类型字段，否则查询所有类型字段"""
+        if info_type is not None:
+            type_fields = CadreService.DYNAMIC_INFO_TYPE_FIELDS.get(info_type, ())
+        else:
+            type_fields = [field for fields in CadreService.DYNAMIC_INFO_TYPE_FIELDS.values() for field in fields]
+        return [
+            getattr(CadreDynamicInfo, field)
+            for field in CadreService.DYNAMIC_INFO_COMMON_FIELDS + tuple(type_fields)
+            if include_text or field not in CadreService.DYNAMIC_INFO_TEXT_FIELDS
+        ]
+
+    @staticmethod
+    def _dynamic_info_row_to_dict(row, include_text: bool) -> Dict:
+        """动态信息投影查询行转换为字典（只包含通用字段和本类型字段，字段格式与 to_dict 一致）"""
+        mapping = row._mapping
+        fields = CadreService.DYNAMIC_INFO_COMMON_FIELDS + CadreService.DYNAMIC_INFO_TYPE_FIELDS.get(row.info_type, ())
+        result = {}
+        for field in fields:
+            if not include_text and field in CadreService.DYNAMIC_INFO_TEXT_FIELDS:
+                continue
+            value = mapping.get(field)
+            result[field] = value.isoformat() if isinstance(value, (date, datetime)) else value
+        return result
 
     @staticmethod
-    def update_cadre_abilities(cadre_id: int, abilities: List[Dict], current_user: str = None) -> bool:
+    def update_cadre_abilities(cadre_id: int, abilities: List[Dict], current_user: str = None) -> List[str]:
         """
-        更新干部能力评分
+        更新干部能力评分（按能力标签比对，只写入有变化的记录）
+
+        与已有评分逐个标签比对：评分、维度或评估意见变化的记录原地更新，新标签插入，
+        不再提交的标签删除，未变化的记录保持不动（ID、创建时间不变）。
 
         Args:
             cadre_id: 干部ID
@@ -198,24 +627,75 @@ class CadreService:
             current_user: 当前登录用户名
 
         Returns:
-            是否更新成功
+            评分发生变化的能力维度列表（用于按维度重算匹配）
         """
-        # 删除原有评分
-        CadreAbilityScore.query.filter_by(cadre_id=cadre_id).delete()
+        existing = {row.ability_tag: row for row in db.session.query(
+            CadreAbilityScore.id,
+            CadreAbilityScore.ability_tag,
+            CadreAbilityScore.ability_dimension,
+            CadreAbilityScore.score,
+            CadreAbilityScore.comment
+        ).filter(CadreAbilityScore.cadre_id == cadre_id).all()}
 
-        # 添加新评分 (ability_data已包含cadre_id)
-        today = date.today()
-        for ability_data in abilities:
-            # 自动设置评估人和评估日期
-            if current_user and 'assessor' not in ability_data:
-                ability_data['assessor'] = current_user
-            if 'assessment_date' not in ability_data or not ability_data['assessment_date']:
-                ability_data['assessment_date'] = today
-            ability = CadreAbilityScore(**ability_data)
-            db.session.add(ability)
+        # 同一标签提交多次时以最后一条为准
+        incoming = {ability_data['ability_tag']: ability_data for ability_data in abilities}
 
+        today = date.today()
+        now = datetime.now()
+        changed_dimensions = set()
+        inserts = []
+        updates = []
+        for tag, ability_data in incoming.items():
+            row = existing.get(tag)
+            if row is None:
+                data = dict(ability_data, cadre_id=cadre_id, update_by=current_user)
+                # 自动设置评估人和评估日期
+                if current_user and not data.get('assessor'):
+                    data['assessor'] = current_user
+                if not data.get('assessment_date'):
+                    data['assessment_date'] = today
+                inserts.append(data)
+                changed_dimensions.add(data['ability_dimension'])
+                continue
+
+            score_changed = (row.score != ability_data['score']
+                             or row.ability_dimension != ability_data['ability_dimension'])
+            comment = ability_data.get('comment')
+            if not score_changed and ('comment' not in ability_data or row.comment == comment):
+                continue
+
+            data = {'id': row.id, 'update_time': now, 'update_by': current_user}
+            if 'comment' in ability_data:
+                data['comment'] = comment
+            if score_changed:
+                data['score'] = ability_data['score']
+                data['ability_dimension'] = ability_data['ability_dimension']
+                data['assessor'] = ability_data.get('assessor') or current_user
+                data['assessment_date'] = ability_data.get('assessment_date') or today
+                changed_dimensions.update((row.ability_dimension, ability_data['ability_dimension']))
+            updates.append(data)
+
+        removed = [row for tag, row in existing.items() if tag not in incoming]
+        changed_dimensions.update(row.ability_dimension for row in removed)
+
+        CadreService._apply_row_diff(CadreAbilityScore, inserts, updates, [row.id for row in removed])
         db.session.commit()
-        return True
+        return sorted(changed_dimensions)
+
+    @staticmethod
+    def _apply_row_diff(model, inserts: List[Dict], updates: List[Dict], delete_ids: List[int]) -> None:
+        """按比对结果批量写入：按主键批量更新、批量插入、按ID批量删除（不提交事务）"""
+        if updates:
+            # 每种字段组合执行一次 executemany
+            groups = {}
+            for data in updates:
+                groups.setdefault(tuple(sorted(data)), []).append(data)
+            for group in groups.values():
+                db.session.execute(update(model), group)
+        if inserts:
+            db.session.execute(insert(model), inserts)
+        if delete_ids:
+            db.session.execute(delete(model).where(model.id.in_(delete_ids)))
 
     @staticmethod
     def add_dynamic_info(cadre_id: int, info_data: Dict) -> CadreDynamicInfo:
@@ -232,6 +712,14 @@ class CadreService:
         # info_data已包含cadre_id，直接使用避免重复传递
         info = CadreDynamicInfo(**info_data)
         db.session.add(info)
+
+        # 职务变更记录影响流动事实
+        if info.info_type == INFO_TYPE_POSITION_CHANGE:
+            CadreFlowService.refresh_cadre(info.cadre_id)
+        # 培训记录影响岗位风险
+        elif info.info_type == INFO_TYPE_TRAINING:
+            PositionRiskService.refresh_for_cadres({info.cadre_id})
+
         db.session.commit()
         db.session.refresh(info)
         return info
@@ -243,10 +731,22 @@ class CadreService:
         if not info:
             return None
 
+        old_cadre_id, old_info_type = info.cadre_id, info.info_type
+
         for key, value in data.items():
             if hasattr(info, key):
                 setattr(info, key, value)
 
+        # 职务变更记录影响流动事实（包括类型或所属干部被修改的情况）
+        if old_info_type == INFO_TYPE_POSITION_CHANGE:
+            CadreFlowService.refresh_cadre(old_cadre_id)
+        if info.info_type == INFO_TYPE_POSITION_CHANGE and (
+            old_info_type != INFO_TYPE_POSITION_CHANGE or info.cadre_id != old_cadre_id
+        ):
+            CadreFlowService.refresh_cadre(info.cadre_id)
+        if INFO_TYPE_TRAINING in (old_info_type, info.info_type):
+            PositionRiskService.refresh_for_cadres({old_cadre_id, info.cadre_id})
+
         db.session.commit()
         db.session.refresh(info)
         return info
@@ -259,5 +759,13 @@ class CadreService:
             return False
 
         db.session.delete(info)
+
+        if info.info_type == INFO_TYPE_POSITION_CHANGE:
+            db.session.flush()
+            CadreFlowService.refresh_cadre(info.cadre_id)
+        elif info.info_type == INFO_TYPE_TRAINING:
+            db.session.flush()
+            PositionRiskService.refresh_for_cadres({info.cadre_id})
+
         db.session.commit()
         return True
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from typing import List, Dict, Optional, Set
+from sqlalchemy import update, delete
 from app.models.certificate import Certificate
+from app.services.taxonomy_service import TaxonomyService
+from app.services.position_service import PositionService
 from app import db
 
 
@@ -10,61 +13,22 @@ class CertificateService:
     @staticmethod
     def get_certificate_tree() -> List[Dict]:
         """
-        获取证书树形结构（两层结构：第一层证书类型，第二层证书名）
+        获取证书树形结构（两层结构：第一层证书类型，第二层证书名；读取共享的证书分类缓存）
 
         Returns:
             证书树列表
         """
-        # 查询所有启用的证书类型（parent_id为NULL）
-        certificate_types = Certificate.query.filter_by(parent_id=None, status=1).order_by(
-            Certificate.sort_order
-        ).all()
-
-        # 构建树形结构
-        result = []
-        for cert_type in certificate_types:
-            cert_type_dict = {
-                'id': cert_type.id,
-                'name': cert_type.name,
-                'parent_id': cert_type.parent_id,
-                'sort_order': cert_type.sort_order,
-                'status': cert_type.status,
-                'description': cert_type.description,
-                'children': []
-            }
-
-            # 查询该证书类型下的所有证书名
-            certificates = Certificate.query.filter_by(parent_id=cert_type.id, status=1).order_by(
-                Certificate.sort_order
-            ).all()
-
-            for cert in certificates:
-                cert_dict = {
-                    'id': cert.id,
-                    'name': cert.name,
-                    'parent_id': cert.parent_id,
-                    'sort_order': cert.sort_order,
-                    'status': cert.status,
-                    'description': cert.description,
-                    'children': []  # 固定两层，证书名下不再有子节点
-                }
-                cert_type_dict['children'].append(cert_dict)
-
-            result.append(cert_type_dict)
-
-        return result
+        return TaxonomyService.get_certificate_taxonomy().tree
 
     @staticmethod
-    def get_certificate_list() -> List[Certificate]:
+    def get_certificate_list() -> List[Dict]:
         """
-        获取证书列表（扁平）
+        获取证书列表（扁平，启用的证书，按排序号；读取共享的证书分类缓存）
 
         Returns:
-            证书列表
+            证书字典列表
         """
-        return Certificate.query.filter_by(status=1).order_by(
-            Certificate.sort_order
-        ).all()
+        return TaxonomyService.get_certificate_taxonomy().enabled_list
 
     @staticmethod
     def get_certificate_by_id(certificate_id: int) -> Optional[Certificate]:
@@ -148,7 +112,7 @@ class CertificateService:
     @staticmethod
     def _get_all_child_certificate_ids(certificate_id: int) -> Set[int]:
         """
-        递归获取所有子证书ID
+        获取所有子证书ID（不含自身，含停用的子证书；读取共享的证书分类缓存中预先建立的层级关系）
 
         Args:
             certificate_id: 证书ID
@@ -156,25 +120,7 @@ class CertificateService:
         Returns:
             所有子证书ID集合
         """
-        # 一次性查询所有启用的证书
-        all_certificates = Certificate.query.filter_by(status=1).all()
-
-        # 构建 id -> 证书的映射
-        certificate_map = {c.id: c for c in all_certificates}
-
-        # 使用 BFS 遍历获取所有子证书ID（内存操作）
-        child_ids = set()
-        queue = [certificate_id]
-
-        while queue:
-            current_id = queue.pop(0)
-            # 查找当前证书的所有子证书
-            for cert in all_certificates:
-                if cert.parent_id == current_id and cert.id not in child_ids:
-                    child_ids.add(cert.id)
-                    queue.append(cert.id)
-
-        return child_ids
+        return set(TaxonomyService.get_certificate_taxonomy().subtree_ids(certificate_id)) - {certificate_id}
 
     @staticmethod
     def delete_certificate(certificate_id: int) -> Dict:
@@ -195,14 +141,24 @@ class CertificateService:
         child_ids = CertificateService._get_all_child_certificate_ids(certificate_id)
         all_certificate_ids = {certificate_id} | child_ids
 
-        # 级联删除所有子证书
-        for child_id in child_ids:
-            child_certificate = Certificate.query.get(child_id)
-            if child_certificate:
-                db.session.delete(child_certificate)
+        # 一次查询检查岗位要求是否仍引用这些证书
+        referenced = PositionService.get_requirement_references('certificate', all_certificate_ids)
+        if referenced:
+            names = '、'.join(p['position_name'] for p in referenced)
+            return {
+                'success': False,
+                'message': f'该证书或其子证书已被岗位要求引用（{names}），无法删除',
+                'referenced_positions': referenced
+            }
 
-        # 删除当前证书
-        db.session.delete(certificate)
+        # 先断开子树内的上下级关系，再整体删除（避免自引用外键按行检查时先删到父节点）
+        db.session.execute(
+            update(Certificate).where(Certificate.id.in_(all_certificate_ids)).values(parent_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(Certificate).where(Certificate.id.in_(all_certificate_ids)).execution_options(synchronize_session=False)
+        )
         db.session.commit()
 
         child_count = len(child_ids)
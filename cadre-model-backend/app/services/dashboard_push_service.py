@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+大屏数据推送服务
+
+大屏通过 SSE 订阅一次，服务端轮询全局数据版本号（见 app.utils.cache），版本变化时
+重新计算大屏数据，只把发生变化的板块以差异形式推送给各个连接。
+
+- 进程内：同一版本只计算一次，所有连接共享计算结果和差异
+- 同一主机的多个 worker 进程：计算结果以 JSON 文件写入共享目录，其他进程直接读取，
+  通过文件锁保证同一版本只有一个进程执行计算
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境没有 fcntl，退化为各进程独立计算
+    fcntl = None
+
+# 快照文件名：dashboard_{日期}_v{数据版本}.json
+SNAPSHOT_FILE_PATTERN = re.compile(r'^dashboard_(\d{4}-\d{2}-\d{2})_v(\d+)\.json$')
+
+# 列表型板块的主键字段，按行比较差异；其余板块整体替换
+LIST_SECTION_KEYS = {
+    'position_risk': 'position_id',
+    'quality_portrait': 'id'
+}
+
+
+def _section_hash(data) -> str:
+    return hashlib.sha1(
+        json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+
+
+def _diff_list_section(old_rows, new_rows, key):
+    """按主键比较列表型板块，返回新增/变化的行、删除的主键以及新的顺序"""
+    old_index = {row[key]: row for row in old_rows}
+    new_keys = [row[key] for row in new_rows]
+    changed = [row for row in new_rows if old_index.get(row[key]) != row]
+    removed = [k for k in old_index if k not in set(new_keys)]
+    patch = {'key': key, 'changed': changed, 'removed': removed}
+    if [row[key] for row in old_rows] != new_keys:
+        patch['order'] = new_keys
+    return patch
+
+
+class DashboardSnapshot:
+    """某一数据版本的大屏数据快照"""
+
+    def __init__(self, version: int, day: str, sections: Dict):
+        self.version = version
+        self.day = day
+        self.sections = sections
+        self.hashes = {name: _section_hash(data) for name, data in sections.items()}
+
+    @property
+    def ident(self) -> Tuple[int, str]:
+        # 年龄、任期等统计随日期变化，快照标识包含日期
+        return self.version, self.day
+
+    def diff_from(self, previous: Optional['DashboardSnapshot']) -> Dict:
+        """计算相对上一快照的差异，只包含发生变化的板块"""
+        sections = {}
+        for name, data in self.sections.items():
+            if previous is not None and previous.hashes.get(name) == self.hashes[name]:
+                continue
+            key = LIST_SECTION_KEYS.get(name)
+            if previous is not None and key and isinstance(data, list) and isinstance(previous.sections.get(name), list):
+                sections[name] = {'patch': _diff_list_section(previous.sections[name], data, key)}
+            else:
+                sections[name] = {'replace': data}
+        return sections
+
+
+class DashboardHub:
+    """进程内的大屏快照中心，所有 SSE 连接共享同一份快照和差异"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._diff_cache = {}
+
+    def get_snapshot(self, version: int, snapshot_dir: str) -> DashboardSnapshot:
+        """
+        获取指定版本的快照，不存在时（跨进程协调后）计算
+
+        计算在锁外进行，锁只用于替换当前快照，计算期间其他连接的差异读取不被阻塞；
+        同一版本的重复计算由快照文件和文件锁去重。
+        """
+        day = date.today().isoformat()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.ident == (version, day):
+            return snapshot
+
+        snapshot = DashboardSnapshot(version, day, self._load_or_compute(version, day, snapshot_dir))
+        with self._lock:
+            current = self._snapshot
+            # 只替换为更新的快照，较慢的旧版本计算不会覆盖已替换的新版本
+            if current is None or (snapshot.day, snapshot.version) > (current.day, current.version):
+                self._snapshot = snapshot
+                self._diff_cache = {}
+            elif current.ident == snapshot.ident:
+                snapshot = current
+        return snapshot
+
+    def get_diff(self, previous: DashboardSnapshot, current: DashboardSnapshot) -> Dict:
+        """获取两个快照之间的差异（同一对快照只保留一份，差异在锁外计算）"""
+        cache_key = (previous.ident, current.ident)
+        with self._lock:
+            diff = self._diff_cache.get(cache_key)
+        if diff is None:
+            diff = current.diff_from(previous)
+            with self._lock:
+                diff = self._diff_cache.setdefault(cache_key, diff)
+        return diff
+
+    @staticmethod
+    def _load_or_compute(version: int, day: str, snapshot_dir: str) -> Dict:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        path = os.path.join(snapshot_dir, f'dashboard_{day}_v{version}.json')
+
+        sections = DashboardHub._read_snapshot_file(path)
+        if sections is not None:
+            return sections
+
+        lock_file = open(os.path.join(snapshot_dir, 'dashboard.lock'), 'a')
+        try:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # 等待锁期间其他进程可能已经算好
+            sections = DashboardHub._read_snapshot_file(path)
+            if sections is not None:
+                return sections
+
+            from app.services.match_service import MatchService
+            sections = MatchService.get_dashboard_all_data()
+
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(sections, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            if fcntl:
+                # 只在持有文件锁时清理，其他进程不会在清理期间写入快照
+                DashboardHub._cleanup_snapshot_files(snapshot_dir, day, version)
+            return sections
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    @staticmethod
+    def _read_snapshot_file(path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _cleanup_snapshot_files(snapshot_dir: str, day: str, version: int) -> None:
+        """删除早于当前日期、版本的快照文件（其他进程可能刚写入更新版本的文件，不能删除）"""
+        for name in os.listdir(snapshot_dir):
+            match = SNAPSHOT_FILE_PATTERN.match(name)
+            if not match or (match.group(1), int(match.group(2))) >= (day, version):
+                continue
+            try:
+                os.remove(os.path.join(snapshot_dir, name))
+            except OSError:
+                pass
+
+
+dashboard_hub = DashboardHub()
+
+
+class DashboardPushService:
+    """大屏 SSE 推送服务类"""
+
+    # 本进程当前的推送连接数（每个连接占用一个工作线程）
+    _connection_lock = threading.Lock()
+    _connection_count = 0
+
+    @staticmethod
+    def acquire_connection(max_connections: int) -> bool:
+        """占用一个推送连接名额，本进程连接数已达上限时返回 False"""
+        with DashboardPushService._connection_lock:
+            if DashboardPushService._connection_count >= max_connections:
+                return False
+            DashboardPushService._connection_count += 1
+            return True
+
+    @staticmethod
+    def release_connection() -> None:
+        """连接结束后归还名额"""
+        with DashboardPushService._connection_lock:
+            DashboardPushService._connection_count = max(0, DashboardPushService._connection_count - 1)
+
+    @staticmethod
+    def format_event(event: str, data: Dict) -> str:
+        """格式化 SSE 事件"""
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    @staticmethod
+    def stream(poll_interval: float, heartbeat_interval: float, max_duration: float, snapshot_dir: str):
+        """
+        SSE 事件生成器
+
+        首先推送完整快照（snapshot 事件），之后每隔 poll_interval 秒检查数据版本，
+        变化时推送差异（update 事件）；空闲时发送心跳注释保持连接。
+        连接超过 max_duration 秒后主动结束，由客户端按 retry 间隔重连。
+        每轮读取后释放数据库会话，等待期间不占用连接池中的连接。
+        """
+        from app import db
+        from app.utils.cache import get_data_version
+
+        def current_snapshot():
+            try:
+                return dashboard_hub.get_snapshot(get_data_version(), snapshot_dir)
+            finally:
+                # 归还连接并结束事务，下一轮重新取连接，读取到其他进程提交的最新数据
+                db.session.remove()
+
+        sent = current_snapshot()
+        yield 'retry: 3000\n\n'
+        yield DashboardPushService.format_event('snapshot', {
+            'version': sent.version,
+            'sections': sent.sections
+        })
+
+        started = last_sent = time.time()
+        while time.time() - started < max_duration:
+            time.sleep(poll_interval)
+            snapshot = current_snapshot()
+
+            if snapshot.ident != sent.ident:
+                sections = dashboard_hub.get_diff(sent, snapshot)
+                sent = snapshot
+                if sections:
+                    yield DashboardPushService.format_event('update', {
+                        'version': snapshot.version,
+                        'sections': sections
+                    })
+                    last_sent = time.time()
+                    continue
+
+            if time.time() - last_sent >= heartbeat_interval:
+                yield ': ping\n\n'
+                last_sent = time.time()
+
@@ -1,72 +1,138 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Optional, Set
-from app.models.department import Department
+import threading
+from typing import List, Dict, Optional, Set, FrozenSet
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, literal
+from app.models.department import Department, DepartmentClosure, DepartmentStat
 from app.models.cadre import CadreBasicInfo
+from app.services.department_stat_service import DepartmentStatService
 from app import db
 
 
+class DepartmentGraph:
+    """
+    部门层级内存图（只读）
+
+    一次查询全部部门后构建：id -> 部门字典、父部门 -> 子部门邻接表、每个部门的子树ID集合（全部部门/只沿启用子部门），
+    以及启用部门的树形结构和扁平列表。由 DepartmentService.get_graph 按部门数据版本在进程内共享。
+    """
+
+    def __init__(self, departments: List[Department]):
+        self.nodes = {dept.id: dept.to_dict() for dept in departments}
+
+        # 父部门 -> 子部门ID（按排序号）
+        self.children = {}
+        for dept in sorted(departments, key=lambda d: (d.sort_order or 0, d.id)):
+            self.children.setdefault(dept.parent_id, []).append(dept.id)
+
+        # 自底向上计算子树ID集合（迭代遍历，层级很深时也不会递归溢出）
+        # 启用子树只沿启用的子部门展开，停用子部门及其下级不计入（根部门本身不论状态均包含）
+        self.subtrees = {}
+        self.enabled_subtrees = {}
+        for dept_id in self._post_order():
+            subtree = {dept_id}
+            enabled_subtree = {dept_id}
+            for child_id in self.children.get(dept_id, []):
+                subtree |= self.subtrees[child_id]
+                if self.nodes[child_id]['status'] == 1:
+                    enabled_subtree |= self.enabled_subtrees[child_id]
+            self.subtrees[dept_id] = frozenset(subtree)
+            self.enabled_subtrees[dept_id] = frozenset(enabled_subtree)
+
+        # 启用部门的扁平列表与树（停用部门及其下级不出现在树中）
+        enabled = [dept for dept in departments if dept.status == 1]
+        self.enabled_list = [self.nodes[dept.id] for dept in sorted(enabled, key=lambda d: d.sort_order or 0)]
+        self.tree = self._build_tree()
+
+    def _post_order(self) -> List[int]:
+        order = []
+        visited = set()
+        for root_id in self.nodes:
+            if root_id in visited:
+                continue
+            stack = [(root_id, False)]
+            while stack:
+                dept_id, expanded = stack.pop()
+                if expanded:
+                    order.append(dept_id)
+                    continue
+                if dept_id in visited:
+                    continue
+                visited.add(dept_id)
+                stack.append((dept_id, True))
+                stack.extend((child_id, False) for child_id in self.children.get(dept_id, []) if child_id not in visited)
+        return order
+
+    def _build_tree(self) -> List[Dict]:
+        tree_fields = ('id', 'name', 'parent_id', 'sort_order', 'status', 'description', 'employee_count')
+        enabled_children = {}
+        for dept in self.enabled_list:
+            enabled_children.setdefault(dept['parent_id'], []).append(dept['id'])
+
+        def build(parent_id):
+            result = []
+            for dept_id in enabled_children.get(parent_id, []):
+                node = {field: self.nodes[dept_id][field] for field in tree_fields}
+                node['children'] = build(dept_id)
+                result.append(node)
+            return result
+
+        return build(None)
+
+    def subtree_ids(self, dept_id: int, enabled_only: bool = False) -> FrozenSet[int]:
+        """部门及其所有子部门ID（enabled_only 时只沿启用的子部门展开），部门不存在时为空集"""
+        subtrees = self.enabled_subtrees if enabled_only else self.subtrees
+        return subtrees.get(dept_id, frozenset())
+
+
 class DepartmentService:
     """部门业务服务类"""
 
+    # 进程内共享的部门层级图：(部门数据版本, DepartmentGraph)
+    _graph = None
+    _graph_lock = threading.Lock()
+
     @staticmethod
-    def get_department_tree() -> List[Dict]:
+    def get_graph() -> DepartmentGraph:
         """
-        获取部门树形结构（性能优化版本）
+        获取部门层级内存图（按部门数据版本缓存，部门新增、修改、删除后自动重建）
 
-        Returns:
-            部门树列表
+        只用于读取；写入部门的事务内请使用闭包表查询，避免缓存未提交的数据。
         """
-        # 一次性查询所有启用的部门，避免 N+1 查询问题
-        all_departments = Department.query.filter_by(status=1).order_by(
-            Department.sort_order
-        ).all()
+        from app.utils.cache import get_data_version, DATA_VERSION_DEPARTMENT
 
-        # 将所有部门转换为字典，并按 parent_id 分组
-        dept_map = {}
-        dept_children_map = {}
-
-        for dept in all_departments:
-            dept_dict = {
-                'id': dept.id,
-                'name': dept.name,
-                'parent_id': dept.parent_id,
-                'sort_order': dept.sort_order,
-                'status': dept.status,
-                'description': dept.description,
-                'employee_count': dept.employee_count,
-            }
-            dept_map[dept.id] = dept_dict
+        version = get_data_version(DATA_VERSION_DEPARTMENT)
+        entry = DepartmentService._graph
+        if entry is not None and entry[0] == version:
+            return entry[1]
 
-            # 按 parent_id 分组
-            parent_id = dept.parent_id or 'root'
-            if parent_id not in dept_children_map:
-                dept_children_map[parent_id] = []
-            dept_children_map[parent_id].append(dept_dict)
+        with DepartmentService._graph_lock:
+            entry = DepartmentService._graph
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            graph = DepartmentGraph(Department.query.all())
+            DepartmentService._graph = (version, graph)
+            return graph
 
-        # 递归构建树形结构（内存操作，不再查询数据库）
-        def build_tree(parent_id=None):
-            children = []
-            parent_key = parent_id or 'root'
-            if parent_key in dept_children_map:
-                for child_dict in dept_children_map[parent_key]:
-                    # 递归获取子部门
-                    child_dict['children'] = build_tree(child_dict['id'])
-                    children.append(child_dict)
-            return children
+    @staticmethod
+    def get_department_tree() -> List[Dict]:
+        """
+        获取部门树形结构（启用的部门，按排序号）
 
-        return build_tree()
+        Returns:
+            部门树列表
+        """
+        return DepartmentService.get_graph().tree
 
     @staticmethod
-    def get_department_list() -> List[Department]:
+    def get_department_list() -> List[Dict]:
         """
-        获取部门列表（扁平）
+        获取部门列表（扁平，启用的部门，按排序号）
 
         Returns:
-            部门列表
+            部门字典列表
         """
-        return Department.query.filter_by(status=1).order_by(
-            Department.sort_order
-        ).all()
+        return DepartmentService.get_graph().enabled_list
 
     @staticmethod
     def get_department_by_id(dept_id: int) -> Optional[Department]:
@@ -92,6 +158,8 @@ class DepartmentService:
 
         department = Department(**data)
         db.session.add(department)
+        db.session.flush()
+        DepartmentService._add_closure(department.id, department.parent_id)
         db.session.commit()
         db.session.refresh(department)
         return department
@@ -121,25 +189,135 @@ class DepartmentService:
             parent = Department.query.get(data['parent_id'])
             if not parent:
                 raise ValueError('父部门不存在')
-            # 检查是否会形成循环引用
-            current = parent
-            while current.parent_id:
-                if current.parent_id == dept_id:
-                    raise ValueError('不能将部门设为自己的子部门')
-                current = Department.query.get(current.parent_id)
+            # 检查是否会形成循环引用（新的父部门不能在自己的子树中）
+            if data['parent_id'] in DepartmentService._query_subtree_ids(dept_id):
+                raise ValueError('不能将部门设为自己的子部门')
 
+        old_parent_id = department.parent_id
         for key, value in data.items():
             if hasattr(department, key):
                 setattr(department, key, value)
 
+        if 'parent_id' in data and department.parent_id != old_parent_id:
+            db.session.flush()
+            old_ancestor_ids = DepartmentService._query_ancestor_ids(dept_id)
+            DepartmentService._move_closure(dept_id, department.parent_id)
+            # 原上级链和新上级链上的部门子树成员变化，重算其子树统计
+            DepartmentStatService.rebuild_subtrees(
+                set(old_ancestor_ids) | set(DepartmentService._query_ancestor_ids(dept_id))
+            )
+
         db.session.commit()
         db.session.refresh(department)
         return department
 
+    @staticmethod
+    def move_departments(moves: List[Dict]) -> Dict:
+        """
+        批量调整上级部门（一个事务）
+
+        一次查询全部部门的上级关系作为快照，在快照上应用所有调整后统一校验循环引用
+        （包括多个调整共同形成的循环），校验通过后批量更新上级部门，
+        并只重建受影响子树的闭包关系，重算原上级链和新上级链上各部门的子树统计。
+
+        Args:
+            moves: [{'id': 部门ID, 'parent_id': 新上级部门ID或None}]
+
+        Returns:
+            {'moved': 实际调整的部门数}
+
+        Raises:
+            ValueError: 部门不存在、重复调整、上级部门不存在或形成循环引用
+        """
+        parent_map = dict(db.session.query(Department.id, Department.parent_id).all())
+
+        errors = []
+        new_parents = {}
+        for move in moves:
+            dept_id = move.get('id')
+            parent_id = move.get('parent_id')
+            if dept_id not in parent_map:
+                errors.append(f'部门{dept_id}不存在')
+            elif dept_id in new_parents:
+                errors.append(f'部门{dept_id}重复调整')
+            elif parent_id is not None and parent_id not in parent_map:
+                errors.append(f'部门{dept_id}的上级部门{parent_id}不存在')
+            elif parent_id == dept_id:
+                errors.append(f'部门{dept_id}不能将自己设为父部门')
+            else:
+                new_parents[dept_id] = parent_id
+        if errors:
+            raise ValueError('；'.join(errors))
+
+        changed = {dept_id: parent_id for dept_id, parent_id in new_parents.items() if parent_map[dept_id] != parent_id}
+        if not changed:
+            return {'moved': 0}
+
+        snapshot = dict(parent_map)
+        snapshot.update(changed)
+
+        # 沿调整后的上级链向上，回到起点即形成循环
+        cycle_ids = set()
+        for dept_id in changed:
+            visited = {dept_id}
+            current = snapshot[dept_id]
+            while current is not None:
+                if current in visited:
+                    cycle_ids.add(dept_id)
+                    break
+                visited.add(current)
+                current = snapshot.get(current)
+        if cycle_ids:
+            raise ValueError(f'调整后形成循环引用的部门: {", ".join(str(i) for i in sorted(cycle_ids))}')
+
+        # 受影响的部门：调整的部门在新结构中的整个子树
+        children = {}
+        for dept_id, parent_id in snapshot.items():
+            children.setdefault(parent_id, []).append(dept_id)
+        affected = set()
+        stack = list(changed)
+        while stack:
+            dept_id = stack.pop()
+            if dept_id not in affected:
+                affected.add(dept_id)
+                stack.extend(children.get(dept_id, []))
+
+        # 原上级链和新上级链上的部门子树成员变化，需要重算子树统计
+        stat_dept_ids = set()
+        for dept_id in changed:
+            for parents in (parent_map, snapshot):
+                current = parents[dept_id]
+                while current is not None and current not in stat_dept_ids:
+                    stat_dept_ids.add(current)
+                    current = parents.get(current)
+
+        closure_rows = []
+        for dept_id in affected:
+            current, depth = dept_id, 0
+            while current is not None:
+                closure_rows.append({'ancestor_id': current, 'descendant_id': dept_id, 'depth': depth})
+                current, depth = snapshot[current], depth + 1
+
+        now = datetime.now()
+        try:
+            db.session.execute(update(Department), [
+                {'id': dept_id, 'parent_id': parent_id, 'update_time': now}
+                for dept_id, parent_id in changed.items()
+            ])
+            db.session.execute(delete(DepartmentClosure).where(DepartmentClosure.descendant_id.in_(affected)))
+            db.session.execute(insert(DepartmentClosure), closure_rows)
+            DepartmentStatService.rebuild_subtrees(stat_dept_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'moved': len(changed)}
+
     @staticmethod
     def _get_all_child_department_ids(dept_id: int) -> Set[int]:
         """
-        递归获取所有子部门ID（性能优化版本）
+        获取所有子部门ID（不含自身，按层级闭包表一次索引查询，可在写入事务内使用）
 
         Args:
             dept_id: 部门ID
@@ -147,25 +325,121 @@ class DepartmentService:
         Returns:
             所有子部门ID集合
         """
-        # 一次性查询所有启用的部门
-        all_departments = Department.query.filter_by(status=1).all()
+        return DepartmentService._query_subtree_ids(dept_id) - {dept_id}
 
-        # 构建 id -> 部门的映射
-        dept_map = {d.id: d for d in all_departments}
+    @staticmethod
+    def _query_subtree_ids(dept_id: int) -> Set[int]:
+        """按闭包表查询部门及其所有子部门ID"""
+        return {row[0] for row in db.session.query(DepartmentClosure.descendant_id).filter(
+            DepartmentClosure.ancestor_id == dept_id
+        ).all()}
 
-        # 使用 BFS 遍历获取所有子部门ID（内存操作）
-        child_ids = set()
-        queue = [dept_id]
+    @staticmethod
+    def _query_ancestor_ids(dept_id: int) -> List[int]:
+        """按闭包表查询部门的所有上级部门ID（由近到远）"""
+        return [row[0] for row in db.session.query(DepartmentClosure.ancestor_id).filter(
+            DepartmentClosure.descendant_id == dept_id,
+            DepartmentClosure.depth > 0
+        ).order_by(DepartmentClosure.depth).all()]
 
-        while queue:
-            current_id = queue.pop(0)
-            # 查找当前部门的所有子部门
-            for dept in all_departments:
-                if dept.parent_id == current_id and dept.id not in child_ids:
-                    child_ids.add(dept.id)
-                    queue.append(dept.id)
+    @staticmethod
+    def get_subtree_ids(dept_id: int, enabled_only: bool = False) -> Set[int]:
+        """获取部门及其所有子部门ID（读取内存层级图，只用于读取；enabled_only 时不含停用的子部门及其下级）"""
+        return set(DepartmentService.get_graph().subtree_ids(dept_id, enabled_only))
+
+    @staticmethod
+    def subtree_filter(column, dept_id: int):
+        """
+        构造“属于某部门子树”的筛选条件（列表查询用）
+
+        子树ID取自内存层级图中预计算的集合，不再为每次列表查询联表闭包表；
+        与部门树一致只沿启用的子部门展开，停用子部门及其下级的干部不计入。
+        写入事务内请使用 _closure_subtree_filter。
+
+        Args:
+            column: 部门ID列，如 CadreBasicInfo.department_id
+            dept_id: 子树根部门ID
+        """
+        return column.in_(DepartmentService.get_subtree_ids(dept_id, enabled_only=True))
+
+    @staticmethod
+    def _closure_subtree_filter(column, dept_id: int):
+        """构造“属于某部门子树”的筛选条件（部门ID列 IN 闭包表子查询，可在写入事务内使用）"""
+        return column.in_(
+            select(DepartmentClosure.descendant_id).where(DepartmentClosure.ancestor_id == dept_id)
+        )
 
-        return child_ids
+    @staticmethod
+    def _add_closure(dept_id: int, parent_id: Optional[int]) -> None:
+        """新增部门后写入闭包关系：自身一条，加上父部门的每个祖先各一条（不提交事务）"""
+        db.session.add(DepartmentClosure(ancestor_id=dept_id, descendant_id=dept_id, depth=0))
+        if parent_id:
+            db.session.execute(insert(DepartmentClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(
+                    DepartmentClosure.ancestor_id,
+                    literal(dept_id),
+                    DepartmentClosure.depth + 1
+                ).where(DepartmentClosure.descendant_id == parent_id)
+            ))
+
+    @staticmethod
+    def _move_closure(dept_id: int, new_parent_id: Optional[int]) -> None:
+        """
+        调整上级部门后更新闭包关系（不提交事务）
+
+        删除子树内部门与原祖先之间的关系，再写入新祖先与子树内部门的关系，子树内部关系不变。
+        """
+        subtree = db.session.query(DepartmentClosure.descendant_id, DepartmentClosure.depth).filter(
+            DepartmentClosure.ancestor_id == dept_id
+        ).all()
+        subtree_ids = [row.descendant_id for row in subtree]
+        old_ancestor_ids = DepartmentService._query_ancestor_ids(dept_id)
+
+        if old_ancestor_ids:
+            db.session.execute(delete(DepartmentClosure).where(
+                DepartmentClosure.descendant_id.in_(subtree_ids),
+                DepartmentClosure.ancestor_id.in_(old_ancestor_ids)
+            ))
+
+        if new_parent_id:
+            new_ancestors = db.session.query(DepartmentClosure.ancestor_id, DepartmentClosure.depth).filter(
+                DepartmentClosure.descendant_id == new_parent_id
+            ).all()
+            db.session.execute(insert(DepartmentClosure), [
+                {
+                    'ancestor_id': ancestor.ancestor_id,
+                    'descendant_id': node.descendant_id,
+                    'depth': ancestor.depth + node.depth + 1
+                }
+                for ancestor in new_ancestors for node in subtree
+            ])
+
+    @staticmethod
+    def rebuild_closure() -> int:
+        """
+        按 parent_id 全量重建部门层级闭包表，并据此重算部门子树统计（用于初次部署或数据修复）
+
+        Returns:
+            写入的关系数
+        """
+        parent_map = dict(db.session.query(Department.id, Department.parent_id).all())
+
+        rows = []
+        for dept_id in parent_map:
+            current, depth, visited = dept_id, 0, set()
+            # 沿父链向上，遇到不存在的父部门或循环时停止
+            while current is not None and current in parent_map and current not in visited:
+                visited.add(current)
+                rows.append({'ancestor_id': current, 'descendant_id': dept_id, 'depth': depth})
+                current, depth = parent_map[current], depth + 1
+
+        db.session.execute(delete(DepartmentClosure))
+        if rows:
+            db.session.execute(insert(DepartmentClosure), rows)
+        DepartmentStatService.rebuild_subtrees(parent_map)
+        db.session.commit()
+        return len(rows)
 
     @staticmethod
     def _check_department_has_cadres(dept_id: int) -> bool:
@@ -178,14 +452,9 @@ class DepartmentService:
         Returns:
             是否有干部
         """
-        all_dept_ids = {dept_id}
-        all_dept_ids.update(DepartmentService._get_all_child_department_ids(dept_id))
-
-        cadre_count = CadreBasicInfo.query.filter(
-            CadreBasicInfo.department_id.in_(all_dept_ids)
-        ).count()
-
-        return cadre_count > 0
+        return db.session.query(CadreBasicInfo.id).filter(
+            DepartmentService._closure_subtree_filter(CadreBasicInfo.department_id, dept_id)
+        ).first() is not None
 
     @staticmethod
     def delete_department(dept_id: int) -> Dict:
@@ -215,10 +484,17 @@ class DepartmentService:
                 'has_cadres': True
             }
 
+        # 删除子树内部门的闭包关系和统计
+        db.session.execute(delete(DepartmentClosure).where(
+            DepartmentClosure.descendant_id.in_(all_dept_ids)
+        ))
+        db.session.execute(delete(DepartmentStat).where(
+            DepartmentStat.department_id.in_(all_dept_ids)
+        ))
+
         # 级联删除所有子部门
-        for child_id in child_ids:
-            child_dept = Department.query.get(child_id)
-            if child_dept:
+        if child_ids:
+            for child_dept in Department.query.filter(Department.id.in_(child_ids)).all():
                 db.session.delete(child_dept)
 
         # 删除当前部门
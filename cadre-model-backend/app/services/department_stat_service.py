@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+from typing import List, Dict, Optional, Iterable, Tuple
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, func, literal, bindparam
+from app.models.department import Department, DepartmentClosure, DepartmentStat
+from app.models.cadre import CadreBasicInfo
+from app.models.match import MatchResult
+from app.utils.constants import (
+    DEPARTMENT_STAT_SCOPE_SELF, DEPARTMENT_STAT_SCOPE_SUBTREE, CADRE_STATUS_ACTIVE,
+    MATCH_LEVEL_EXCELLENT, MATCH_LEVEL_QUALIFIED, MATCH_LEVEL_UNQUALIFIED
+)
+from app import db
+
+# 累加字段
+STAT_FIELDS = ('headcount', 'matched_count', 'score_sum', 'excellent_count', 'qualified_count', 'unqualified_count')
+
+# 匹配等级 -> 人数字段
+MATCH_LEVEL_FIELDS = {
+    MATCH_LEVEL_EXCELLENT: 'excellent_count',
+    MATCH_LEVEL_QUALIFIED: 'qualified_count',
+    MATCH_LEVEL_UNQUALIFIED: 'unqualified_count'
+}
+
+# 统计键：(部门ID, 干部状态, 管理层级)
+StatKey = Tuple[int, int, str]
+
+
+class DepartmentStatService:
+    """
+    部门统计汇总维护服务类
+
+    每个部门按（干部状态, 管理层级）存两种范围的汇总行：self 为本部门直属干部，subtree 为本部门及所有子部门干部。
+    干部或当前岗位匹配结果变化时，只重算所在部门的直属汇总，把前后差值累加到该部门及其所有上级部门的子树汇总；
+    部门调整上级时，按闭包表用直属汇总重算受影响部门的子树汇总。
+
+    增量差值按“本事务读到的直属干部 - 已存储的直属汇总”计算，同一部门的干部被并发修改时，
+    两个事务可能基于不同的快照计算差值，汇总会与实际数据产生偏差。偏差不会自行消除，
+    需调用 POST /api/departments/stats/rebuild（rebuild_all）全量重建修复，可在批量导入后或定期执行。
+    统计表写入会递增全局数据版本，重建后部门统计接口的缓存随之失效。
+    """
+
+    @staticmethod
+    def _empty_values() -> Dict:
+        return {field: 0 for field in STAT_FIELDS}
+
+    @staticmethod
+    def _aggregate_members(department_ids: Optional[Iterable[int]] = None) -> Dict[StatKey, Dict]:
+        """
+        按干部明细汇总部门直属统计
+
+        当前岗位匹配结果与干部档案一致：取干部当前岗位得分最高的一条。
+
+        Args:
+            department_ids: 部门ID集合，为 None 时汇总全部部门
+
+        Returns:
+            {(部门ID, 干部状态, 管理层级): 统计值}
+        """
+        cadre_query = db.session.query(
+            CadreBasicInfo.id,
+            CadreBasicInfo.department_id,
+            CadreBasicInfo.status,
+            CadreBasicInfo.management_level
+        ).filter(CadreBasicInfo.department_id.isnot(None))
+        match_query = db.session.query(
+            MatchResult.cadre_id,
+            MatchResult.final_score,
+            MatchResult.match_level
+        ).join(
+            CadreBasicInfo, MatchResult.cadre_id == CadreBasicInfo.id
+        ).filter(
+            CadreBasicInfo.department_id.isnot(None),
+            MatchResult.position_id == CadreBasicInfo.position_id
+        )
+        if department_ids is not None:
+            cadre_query = cadre_query.filter(CadreBasicInfo.department_id.in_(department_ids))
+            match_query = match_query.filter(CadreBasicInfo.department_id.in_(department_ids))
+
+        # 按得分升序覆盖，保留每个干部得分最高的结果
+        matches = {}
+        for row in match_query.order_by(MatchResult.final_score.asc()).all():
+            matches[row.cadre_id] = row
+
+        stats = {}
+        for cadre in cadre_query.all():
+            key = (cadre.department_id, cadre.status, cadre.management_level or '')
+            values = stats.get(key)
+            if values is None:
+                values = stats[key] = DepartmentStatService._empty_values()
+            values['headcount'] += 1
+
+            match = matches.get(cadre.id)
+            if match and match.final_score is not None:
+                values['matched_count'] += 1
+                values['score_sum'] += match.final_score
+                level_field = MATCH_LEVEL_FIELDS.get(match.match_level)
+                if level_field:
+                    values[level_field] += 1
+
+        return stats
+
+    @staticmethod
+    def _apply_deltas(scope: str, deltas: Dict[StatKey, Dict]) -> None:
+        """
+        把差值累加到指定范围的汇总行（不提交事务）
+
+        已有行用 `字段 = 字段 + 差值` 批量更新，缺少的行批量插入，人数归零的行删除。
+        """
+        if not deltas:
+            return
+
+        department_ids = {key[0] for key in deltas}
+        existing = {(row.department_id, row.status, row.management_level) for row in db.session.query(
+            DepartmentStat.department_id, DepartmentStat.status, DepartmentStat.management_level
+        ).filter(
+            DepartmentStat.scope == scope,
+            DepartmentStat.department_id.in_(department_ids)
+        ).all()}
+
+        now = datetime.now()
+        updates = []
+        inserts = []
+        for key, delta in deltas.items():
+            department_id, status, management_level = key
+            if key in existing:
+                params = {f'd_{field}': delta[field] for field in STAT_FIELDS}
+                params.update({
+                    'b_department_id': department_id,
+                    'b_status': status,
+                    'b_management_level': management_level,
+                    'b_update_time': now
+                })
+                updates.append(params)
+            else:
+                row = dict(delta)
+                row.update({
+                    'department_id': department_id,
+                    'scope': scope,
+                    'status': status,
+                    'management_level': management_level,
+                    'update_time': now
+                })
+                inserts.append(row)
+
+        if updates:
+            # 使用表级 UPDATE 执行 executemany（ORM 批量更新只支持按主键整行赋值，不支持自增表达式）
+            table = DepartmentStat.__table__
+            values = {field: table.c[field] + bindparam(f'd_{field}') for field in STAT_FIELDS}
+            values['update_time'] = bindparam('b_update_time')
+            db.session.execute(
+                update(table).where(
+                    table.c.department_id == bindparam('b_department_id'),
+                    table.c.scope == scope,
+                    table.c.status == bindparam('b_status'),
+                    table.c.management_level == bindparam('b_management_level')
+                ).values(**values),
+                updates
+            )
+        if inserts:
+            db.session.execute(insert(DepartmentStat), inserts)
+
+        db.session.execute(delete(DepartmentStat).where(
+            DepartmentStat.scope == scope,
+            DepartmentStat.department_id.in_(department_ids),
+            DepartmentStat.headcount <= 0
+        ))
+
+    @staticmethod
+    def refresh_departments(department_ids: Iterable[int]) -> int:
+        """
+        干部新增、修改、删除或当前岗位匹配结果变化后，增量更新部门统计（不提交事务，由调用方统一提交）
+
+        只重新汇总这些部门的直属干部，与已存储的直属汇总比较得到差值，
+        再把差值累加到这些部门及其所有上级部门的子树汇总。
+        并发修改同一部门时汇总可能偏差，修复方式见类说明（rebuild_all）。
+
+        Args:
+            department_ids: 干部变更前后所在的部门ID
+
+        Returns:
+            发生变化的统计键数量
+        """
+        department_ids = {did for did in department_ids if did}
+        if not department_ids:
+            return 0
+
+        db.session.flush()
+
+        current = DepartmentStatService._aggregate_members(department_ids)
+        # 按列查询，避免会话中缓存的汇总对象在表级累加更新后过期
+        stored = {}
+        for row in db.session.query(
+            DepartmentStat.department_id,
+            DepartmentStat.status,
+            DepartmentStat.management_level,
+            *[getattr(DepartmentStat, field) for field in STAT_FIELDS]
+        ).filter(
+            DepartmentStat.scope == DEPARTMENT_STAT_SCOPE_SELF,
+            DepartmentStat.department_id.in_(department_ids)
+        ).all():
+            stored[(row.department_id, row.status, row.management_level)] = {
+                field: getattr(row, field) for field in STAT_FIELDS
+            }
+
+        deltas = {}
+        for key in set(current) | set(stored):
+            after = current.get(key) or DepartmentStatService._empty_values()
+            before = stored.get(key) or DepartmentStatService._empty_values()
+            delta = {field: after[field] - before[field] for field in STAT_FIELDS}
+            if any(delta.values()):
+                deltas[key] = delta
+        if not deltas:
+            return 0
+
+        DepartmentStatService._apply_deltas(DEPARTMENT_STAT_SCOPE_SELF, deltas)
+
+        # 差值累加到部门自身及所有上级部门的子树汇总
+        ancestors = {}
+        for row in db.session.query(DepartmentClosure.descendant_id, DepartmentClosure.ancestor_id).filter(
+            DepartmentClosure.descendant_id.in_({key[0] for key in deltas})
+        ).all():
+            ancestors.setdefault(row.descendant_id, []).append(row.ancestor_id)
+
+        subtree_deltas = {}
+        for (department_id, status, management_level), delta in deltas.items():
+            for ancestor_id in ancestors.get(department_id, []):
+                target = subtree_deltas.setdefault(
+                    (ancestor_id, status, management_level), DepartmentStatService._empty_values()
+                )
+                for field in STAT_FIELDS:
+                    target[field] += delta[field]
+        DepartmentStatService._apply_deltas(DEPARTMENT_STAT_SCOPE_SUBTREE, subtree_deltas)
+
+        return len(deltas)
+
+    @staticmethod
+    def refresh_for_cadres(cadre_ids: Iterable[int]) -> int:
+        """干部的当前岗位匹配结果变化后，增量更新其所在部门的统计（不提交事务）"""
+        cadre_ids = {cid for cid in cadre_ids if cid}
+        if not cadre_ids:
+            return 0
+        department_ids = {row[0] for row in db.session.query(CadreBasicInfo.department_id).filter(
+            CadreBasicInfo.id.in_(cadre_ids)
+        ).distinct().all()}
+        return DepartmentStatService.refresh_departments(department_ids)
+
+    @staticmethod
+    def rebuild_subtrees(department_ids: Iterable[int]) -> None:
+        """
+        按闭包表用直属汇总重算指定部门的子树汇总（不提交事务）
+
+        用于部门调整上级后，重算原上级链和新上级链上各部门的子树汇总。
+        """
+        department_ids = {did for did in department_ids if did}
+        if not department_ids:
+            return
+
+        db.session.execute(delete(DepartmentStat).where(
+            DepartmentStat.scope == DEPARTMENT_STAT_SCOPE_SUBTREE,
+            DepartmentStat.department_id.in_(department_ids)
+        ))
+        db.session.execute(insert(DepartmentStat).from_select(
+            ['department_id', 'scope', 'status', 'management_level', *STAT_FIELDS, 'update_time'],
+            select(
+                DepartmentClosure.ancestor_id,
+                literal(DEPARTMENT_STAT_SCOPE_SUBTREE),
+                DepartmentStat.status,
+                DepartmentStat.management_level,
+                *[func.sum(getattr(DepartmentStat, field)) for field in STAT_FIELDS],
+                literal(datetime.now())
+            ).join(
+                DepartmentStat, DepartmentStat.department_id == DepartmentClosure.descendant_id
+            ).where(
+                DepartmentStat.scope == DEPARTMENT_STAT_SCOPE_SELF,
+                DepartmentClosure.ancestor_id.in_(department_ids)
+            ).group_by(
+                DepartmentClosure.ancestor_id, DepartmentStat.status, DepartmentStat.management_level
+            )
+        ))
+
+    @staticmethod
+    def refresh_all() -> int:
+        """
+        全量重算部门统计（不提交事务，用于全量重算当前岗位匹配后）
+
+        Returns:
+            直属汇总行数
+        """
+        db.session.flush()
+        stats = DepartmentStatService._aggregate_members()
+
+        db.session.execute(delete(DepartmentStat))
+        now = datetime.now()
+        rows = []
+        for (department_id, status, management_level), values in stats.items():
+            row = dict(values)
+            row.update({
+                'department_id': department_id,
+                'scope': DEPARTMENT_STAT_SCOPE_SELF,
+                'status': status,
+                'management_level': management_level,
+                'update_time': now
+            })
+            rows.append(row)
+        if rows:
+            db.session.execute(insert(DepartmentStat), rows)
+
+        DepartmentStatService.rebuild_subtrees(row[0] for row in db.session.query(Department.id).all())
+        return len(rows)
+
+    @staticmethod
+    def rebuild_all() -> int:
+        """
+        全量重建部门统计表（用于初次部署或数据修复）
+
+        增量维护在并发写入下产生的偏差以此修复，重建结果只依赖干部和匹配结果表，可随时重复执行。
+        """
+        total = DepartmentStatService.refresh_all()
+        db.session.commit()
+        return total
+
+    @staticmethod
+    def _summarize(rows: List[DepartmentStat], status: Optional[int] = None) -> Dict:
+        """
+        把一个部门某一范围的汇总行合并为统计结果
+
+        人数和管理层级分布按 status 筛选（为空时不限状态）；
+        当前岗位匹配统计与匹配结果列表一致，只统计在职干部。
+        """
+        by_status = {}
+        by_management_level = {}
+        headcount = 0
+        match_values = DepartmentStatService._empty_values()
+        for row in rows:
+            by_status[row.status] = by_status.get(row.status, 0) + row.headcount
+            if status is None or row.status == status:
+                headcount += row.headcount
+                by_management_level[row.management_level] = (
+                    by_management_level.get(row.management_level, 0) + row.headcount
+                )
+            if row.status == CADRE_STATUS_ACTIVE:
+                for field in STAT_FIELDS:
+                    match_values[field] += getattr(row, field)
+
+        matched_count = match_values['matched_count']
+        return {
+            'headcount': headcount,
+            'by_status': by_status,
+            'by_management_level': by_management_level,
+            'match': {
+                'matched_count': matched_count,
+                'avg_score': round(match_values['score_sum'] / matched_count, 2) if matched_count else None,
+                'level_distribution': {
+                    level: match_values[field] for level, field in MATCH_LEVEL_FIELDS.items()
+                }
+            }
+        }
+
+    @staticmethod
+    def get_department_stats(department_ids: Optional[List[int]] = None, status: Optional[int] = None,
+                             scope: str = DEPARTMENT_STAT_SCOPE_SUBTREE) -> List[Dict]:
+        """
+        批量读取部门统计（读取预计算的汇总行，不查询干部明细）
+
+        Args:
+            department_ids: 部门ID列表，为空时返回全部部门
+            status: 干部状态筛选
+            scope: 统计范围（subtree/self）
+
+        Returns:
+            按部门ID排序的统计列表，没有干部的部门各项为 0
+        """
+        query = DepartmentStat.query.filter(DepartmentStat.scope == scope)
+        if department_ids:
+            query = query.filter(DepartmentStat.department_id.in_(department_ids))
+
+        rows_by_department = {}
+        for row in query.all():
+            rows_by_department.setdefault(row.department_id, []).append(row)
+
+        if not department_ids:
+            department_ids = [row[0] for row in db.session.query(Department.id).all()]
+
+        results = []
+        for department_id in sorted(set(department_ids)):
+            summary = DepartmentStatService._summarize(rows_by_department.get(department_id, []), status)
+            summary['department_id'] = department_id
+            results.append(summary)
+        return results
+
+    @staticmethod
+    def get_department_stat_detail(department_id: int, status: Optional[int] = None) -> Optional[Dict]:
+        """
+        读取单个部门的直属统计和子树统计
+
+        Returns:
+            {'department_id', 'subtree', 'self'}，部门不存在时返回 None
+        """
+        if not Department.query.get(department_id):
+            return None
+
+        rows = {DEPARTMENT_STAT_SCOPE_SELF: [], DEPARTMENT_STAT_SCOPE_SUBTREE: []}
+        for row in DepartmentStat.query.filter(DepartmentStat.department_id == department_id).all():
+            rows.setdefault(row.scope, []).append(row)
+
+        return {
+            'department_id': department_id,
+            'subtree': DepartmentStatService._summarize(rows[DEPARTMENT_STAT_SCOPE_SUBTREE], status),
+            'self': DepartmentStatService._summarize(rows[DEPARTMENT_STAT_SCOPE_SELF], status)
+        }
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from typing import Dict, Iterator, Optional
+from app.services.cadre_service import CadreService
+from app.services.match_service import MatchService
+from app.utils.spreadsheet import iter_spreadsheet_export, EXPORT_FORMATS
+
+CADRE_STATUS_LABELS = {1: '在职', 2: '离职', 3: '退休'}
+
+MATCH_LEVEL_LABELS = {'excellent': '优质匹配', 'qualified': '合格匹配', 'unqualified': '不合格匹配'}
+
+QUALITY_TYPE_LABELS = {'star': '明星干部', 'potential': '潜力干部', 'stable': '稳健干部', 'adjust': '需调整'}
+
+# 干部列表导出列（表头与导入模板一致，导出文件可直接修改后重新导入）
+CADRE_EXPORT_COLUMNS = (
+    ('工号', 'employee_no'),
+    ('姓名', 'name'),
+    ('性别', 'gender'),
+    ('出生日期', 'birth_date'),
+    ('学历', 'education'),
+    ('部门', lambda item: item['department']['name'] if item['department'] else None),
+    ('岗位', lambda item: item['position']['position_name'] if item['position'] else None),
+    ('岗级', 'job_grade'),
+    ('管理层级', 'management_level'),
+    ('状态', lambda item: CADRE_STATUS_LABELS.get(item['status'], item['status']))
+)
+
+# 当前岗位匹配结果导出列
+CURRENT_POSITION_MATCH_EXPORT_COLUMNS = (
+    ('工号', lambda item: item['cadre']['employee_no']),
+    ('姓名', lambda item: item['cadre']['name']),
+    ('部门', lambda item: item['cadre']['department']['name'] if item['cadre']['department'] else None),
+    ('当前岗位', lambda item: item['position']['position_name']),
+    ('基础分', 'base_score'),
+    ('扣分', 'deduction_score'),
+    ('最终得分', 'final_score'),
+    ('匹配等级', lambda item: MATCH_LEVEL_LABELS.get(item['match_level'], item['match_level'])),
+    ('最佳匹配岗位', lambda item: item['best_match_position']['position_name'] if item['best_match_position'] else None),
+    ('最佳匹配得分', 'best_match_score')
+)
+
+# 质量画像导出列
+QUALITY_PORTRAIT_EXPORT_COLUMNS = (
+    ('工号', 'employee_no'),
+    ('姓名', 'name'),
+    ('部门', 'department'),
+    ('岗位', 'position'),
+    ('匹配度', 'match_score'),
+    ('绩效得分', 'performance_score'),
+    ('核心项目数', 'core_project_count'),
+    ('质量类型', lambda item: QUALITY_TYPE_LABELS.get(item['quality_type'], item['quality_type']))
+)
+
+
+class ExportService:
+    """表格导出服务类（xlsx/csv 流式导出）"""
+
+    @staticmethod
+    def check_format(extension: Optional[str]) -> str:
+        """校验导出格式，默认 xlsx"""
+        extension = (extension or 'xlsx').lower()
+        if extension not in EXPORT_FORMATS:
+            raise ValueError(f'不支持的导出格式: {extension}')
+        return extension
+
+    @staticmethod
+    def export_cadres(extension: str, name: Optional[str] = None, status: Optional[int] = None,
+                      department: Optional[str] = None) -> Iterator[bytes]:
+        """
+        导出干部列表（筛选条件与干部列表一致，部门筛选包含子部门）
+
+        Returns:
+            文件内容字节块迭代器
+        """
+        records = CadreService.iter_cadre_list(name=name, status=status, department=department)
+        return iter_spreadsheet_export(CADRE_EXPORT_COLUMNS, records, extension, '干部列表')
+
+    @staticmethod
+    def export_current_position_match_results(extension: str) -> Iterator[bytes]:
+        """
+        导出干部当前岗位匹配结果
+
+        Returns:
+            文件内容字节块迭代器
+        """
+        records = MatchService.iter_current_position_match_results()
+        return iter_spreadsheet_export(CURRENT_POSITION_MATCH_EXPORT_COLUMNS, records, extension, '当前岗位匹配')
+
+    @staticmethod
+    def export_quality_portrait(extension: str, **filters: Dict) -> Iterator[bytes]:
+        """
+        导出干部质量画像（筛选条件与质量画像分页一致）
+
+        Returns:
+            文件内容字节块迭代器
+        """
+        records = MatchService.iter_quality_portrait(**filters)
+        return iter_spreadsheet_export(QUALITY_PORTRAIT_EXPORT_COLUMNS, records, extension, '质量画像')
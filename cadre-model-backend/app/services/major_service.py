@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from typing import List, Dict, Optional, Set
+from sqlalchemy import update, delete
 from app.models.major import Major
+from app.services.taxonomy_service import TaxonomyService
+from app.services.position_service import PositionService
 from app import db
 
 
@@ -10,61 +13,22 @@ class MajorService:
     @staticmethod
     def get_major_tree() -> List[Dict]:
         """
-        获取专业树形结构（两层结构：第一层岗位类型，第二层专业类型）
+        获取专业树形结构（两层结构：第一层岗位类型，第二层专业类型；读取共享的专业分类缓存）
 
         Returns:
             专业树列表
         """
-        # 查询所有启用的岗位类型（parent_id为NULL）
-        position_types = Major.query.filter_by(parent_id=None, status=1).order_by(
-            Major.sort_order
-        ).all()
-
-        # 构建树形结构
-        result = []
-        for position_type in position_types:
-            position_dict = {
-                'id': position_type.id,
-                'name': position_type.name,
-                'parent_id': position_type.parent_id,
-                'sort_order': position_type.sort_order,
-                'status': position_type.status,
-                'description': position_type.description,
-                'children': []
-            }
-
-            # 查询该岗位类型下的所有专业类型
-            major_types = Major.query.filter_by(parent_id=position_type.id, status=1).order_by(
-                Major.sort_order
-            ).all()
-
-            for major_type in major_types:
-                major_dict = {
-                    'id': major_type.id,
-                    'name': major_type.name,
-                    'parent_id': major_type.parent_id,
-                    'sort_order': major_type.sort_order,
-                    'status': major_type.status,
-                    'description': major_type.description,
-                    'children': []  # 固定两层，专业类型下不再有子节点
-                }
-                position_dict['children'].append(major_dict)
-
-            result.append(position_dict)
-
-        return result
+        return TaxonomyService.get_major_taxonomy().tree
 
     @staticmethod
-    def get_major_list() -> List[Major]:
+    def get_major_list() -> List[Dict]:
         """
-        获取专业列表（扁平）
+        获取专业列表（扁平，启用的专业，按排序号；读取共享的专业分类缓存）
 
         Returns:
-            专业列表
+            专业字典列表
         """
-        return Major.query.filter_by(status=1).order_by(
-            Major.sort_order
-        ).all()
+        return TaxonomyService.get_major_taxonomy().enabled_list
 
     @staticmethod
     def get_major_by_id(major_id: int) -> Optional[Major]:
@@ -148,7 +112,7 @@ class MajorService:
     @staticmethod
     def _get_all_child_major_ids(major_id: int) -> Set[int]:
         """
-        递归获取所有子专业ID
+        获取所有子专业ID（不含自身，含停用的子专业；读取共享的专业分类缓存中预先建立的层级关系）
 
         Args:
             major_id: 专业ID
@@ -156,25 +120,7 @@ class MajorService:
         Returns:
             所有子专业ID集合
         """
-        # 一次性查询所有启用的专业
-        all_majors = Major.query.filter_by(status=1).all()
-
-        # 构建 id -> 专业的映射
-        major_map = {m.id: m for m in all_majors}
-
-        # 使用 BFS 遍历获取所有子专业ID（内存操作）
-        child_ids = set()
-        queue = [major_id]
-
-        while queue:
-            current_id = queue.pop(0)
-            # 查找当前专业的所有子专业
-            for major in all_majors:
-                if major.parent_id == current_id and major.id not in child_ids:
-                    child_ids.add(major.id)
-                    queue.append(major.id)
-
-        return child_ids
+        return set(TaxonomyService.get_major_taxonomy().subtree_ids(major_id)) - {major_id}
 
     @staticmethod
     def delete_major(major_id: int) -> Dict:
@@ -195,14 +141,24 @@ class MajorService:
         child_ids = MajorService._get_all_child_major_ids(major_id)
         all_major_ids = {major_id} | child_ids
 
-        # 级联删除所有子专业
-        for child_id in child_ids:
-            child_major = Major.query.get(child_id)
-            if child_major:
-                db.session.delete(child_major)
+        # 一次查询检查岗位要求是否仍引用这些专业
+        referenced = PositionService.get_requirement_references('major', all_major_ids)
+        if referenced:
+            names = '、'.join(p['position_name'] for p in referenced)
+            return {
+                'success': False,
+                'message': f'该专业或其子专业已被岗位要求引用（{names}），无法删除',
+                'referenced_positions': referenced
+            }
 
-        # 删除当前专业
-        db.session.delete(major)
+        # 先断开子树内的上下级关系，再整体删除（避免自引用外键按行检查时先删到父节点）
+        db.session.execute(
+            update(Major).where(Major.id.in_(all_major_ids)).values(parent_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(Major).where(Major.id.in_(all_major_ids)).execution_options(synchronize_session=False)
+        )
         db.session.commit()
 
         child_count = len(child_ids)
@@ -1,11 +1,14 @@
 from typing import List, Dict, Tuple
 from datetime import datetime, date
 import json
-from sqlalchemy import func
+from sqlalchemy import func, insert, extract, case, inspect
 from app.models.cadre import CadreBasicInfo, CadreAbilityScore
 from app.models.position import PositionInfo, PositionAbilityWeight, PositionRequirement
-from app.models.match import MatchResult, MatchReport
+from app.models.match import MatchResult, MatchReport, MatchPendingCadre
 from app.models.department import Department
+from app.utils.ability_registry import ABILITY_REGISTRY
+from app.utils import loader
+from app.utils.helpers import years_ago
 from app import db
 
 
@@ -13,7 +16,7 @@ class MatchService:
     """匹配计算服务类"""
 
     @staticmethod
-    def calculate(cadre_id: int, position_id: int, save_to_db: bool = True) -> MatchResult:
+    def calculate(cadre_id: int, position_id: int, save_to_db: bool = True, refresh_risk: bool = True) -> MatchResult:
         """
         计算干部与岗位的匹配度
 
@@ -21,18 +24,21 @@ class MatchService:
             cadre_id: 干部ID
             position_id: 岗位ID
             save_to_db: 是否保存到数据库，默认为True
+            refresh_risk: 保存后是否重算岗位风险（批量计算时由调用方统一重算）
 
         Returns:
             匹配结果对象
         """
-        # 1. 获取干部能力评分
-        cadre_scores = MatchService._get_cadre_ability_scores(cadre_id)
+        # 1. 获取干部能力评分，按维度编号聚合
+        dimension_scores = MatchService._aggregate_dimension_scores(
+            MatchService._get_cadre_ability_scores(cadre_id)
+        )
 
         # 2. 获取岗位能力权重
-        position_weights = MatchService._get_position_weights(position_id)
+        weight_vector = MatchService._build_weight_vector(MatchService._get_position_weights(position_id))
 
         # 3. 计算基础得分
-        base_score = MatchService._calculate_base_score(cadre_scores, position_weights)
+        base_score = MatchService._calculate_base_score(dimension_scores, weight_vector)
 
         # 4. 检查硬性要求
         meet_mandatory, mandatory_details = MatchService._check_mandatory_requirements(cadre_id, position_id)
@@ -53,7 +59,7 @@ class MatchService:
         # 9. 构建匹配详情
         match_detail = {
             'base_score': base_score,
-            'base_score_details': MatchService._build_base_score_details(cadre_scores, position_weights),
+            'base_score_details': MatchService._build_base_score_details(dimension_scores, weight_vector),
             'mandatory_check': {
                 'is_meet': meet_mandatory,
                 'details': mandatory_details
@@ -80,12 +86,20 @@ class MatchService:
             db.session.add(match_result)
             db.session.commit()
             db.session.refresh(match_result)
+
+            # 任职者当前岗位的匹配结果变化会影响岗位风险和部门统计
+            if refresh_risk:
+                cadre = loader.load(CadreBasicInfo, cadre_id)
+                if cadre and cadre.position_id == position_id:
+                    from app.services.position_risk_service import PositionRiskService
+                    from app.services.department_stat_service import DepartmentStatService
+                    PositionRiskService.refresh_positions({position_id})
+                    DepartmentStatService.refresh_departments({cadre.department_id})
+                    db.session.commit()
         else:
-            # 不保存到数据库时，手动加载关联数据并附加到对象上
-            from app.models.cadre import CadreBasicInfo
-            from app.models.position import PositionInfo
-            cadre = CadreBasicInfo.query.get(cadre_id)
-            position = PositionInfo.query.get(position_id)
+            # 不保存到数据库时，手动加载关联数据并附加到对象上（同一请求内复用已加载的干部、岗位）
+            cadre = loader.load(CadreBasicInfo, cadre_id)
+            position = loader.load(PositionInfo, position_id)
             # 将关联数据附加到对象上，供 to_dict 使用
             match_result._cached_cadre = cadre
             match_result._cached_position = position
@@ -105,19 +119,30 @@ class MatchService:
         """
         # 获取所有在职干部
         cadres = CadreBasicInfo.query.filter_by(status=1).all()
+        loader.add(CadreBasicInfo, cadres)
 
         results = []
         for cadre in cadres:
             try:
-                result = MatchService.calculate(cadre.id, position_id)
+                result = MatchService.calculate(cadre.id, position_id, refresh_risk=False)
                 results.append(result)
             except Exception as e:
                 # 记录错误但继续处理其他干部
                 db.session.rollback()
                 continue
 
+        # 统一重算该岗位的风险，以及该岗位任职者所在部门的统计
+        from app.services.position_risk_service import PositionRiskService
+        from app.services.department_stat_service import DepartmentStatService
+        PositionRiskService.refresh_positions({position_id})
+        DepartmentStatService.refresh_departments(row[0] for row in db.session.query(
+            CadreBasicInfo.department_id
+        ).filter(CadreBasicInfo.position_id == position_id).distinct().all())
+        db.session.commit()
+
         # 按最终得分降序排序
         results.sort(key=lambda x: x.final_score or 0, reverse=True)
+        MatchService._preload_result_relations(results)
 
         return results
 
@@ -141,8 +166,9 @@ class MatchService:
             CadreBasicInfo.status == 1
         ).all()
 
-        # 构建 cadre 字典 {id: cadre_obj}
+        # 构建 cadre 字典 {id: cadre_obj}，并登记到请求级加载缓存供逐个计算时复用
         cadre_dict = {c.id: c for c in cadres}
+        loader.add(CadreBasicInfo, cadres)
 
         results = []
         for cadre_id in cadre_ids:
@@ -198,14 +224,7 @@ class MatchService:
         page_size: int = 20
     ) -> Dict:
         """获取匹配结果列表"""
-        query = MatchResult.query
-
-        if position_id:
-            query = query.filter_by(position_id=position_id)
-        if cadre_id:
-            query = query.filter_by(cadre_id=cadre_id)
-        if match_level:
-            query = query.filter_by(match_level=match_level)
+        query = MatchService._filter_match_result_query(position_id, cadre_id, match_level)
 
         # 总数
         total = query.count()
@@ -215,6 +234,7 @@ class MatchService:
             .offset((page - 1) * page_size) \
             .limit(page_size) \
             .all()
+        MatchService._preload_result_relations(items)
 
         return {
             'items': [item.to_dict() for item in items],
@@ -223,6 +243,79 @@ class MatchService:
             'page_size': page_size
         }
 
+    @staticmethod
+    def get_match_result_page(
+        position_id: int = None,
+        cadre_id: int = None,
+        match_level: str = None,
+        page_size: int = 20,
+        cursor: str = None
+    ) -> Dict:
+        """
+        游标分页获取匹配结果列表
+
+        按 (final_score, id) 降序定位，定位条件和排序直接使用 final_score 列（可走 idx_final_score/idx_position_score），
+        深翻页不再随 OFFSET 线性变慢；总数按数据版本缓存。游标中保存分数的双精度精确值，同分记录在页边界不会遗漏或重复；
+        未计算出分数的记录在最后按 id 分页。
+
+        Returns:
+            {'items': [...], 'next_cursor': str|None, 'total': int}
+        """
+        from app.utils.helpers import build_cursor_pagination_query, exact_float_column
+
+        query = MatchService._filter_match_result_query(position_id, cadre_id, match_level)
+        rows, next_cursor, total = build_cursor_pagination_query(
+            query.add_columns(exact_float_column(MatchResult.final_score).label('cursor_score')),
+            MatchResult.final_score, MatchResult.id, page_size,
+            cursor=cursor, descending=True, nullable=True, count_query=query,
+            cursor_key=lambda row: [row.cursor_score, row.MatchResult.id]
+        )
+        MatchService._preload_result_relations([row.MatchResult for row in rows])
+
+        return {
+            'items': [row.MatchResult.to_dict() for row in rows],
+            'next_cursor': next_cursor,
+            'total': total
+        }
+
+    @staticmethod
+    def _preload_result_relations(results: List[MatchResult]) -> None:
+        """
+        序列化匹配结果列表前批量加载关联的干部、岗位和部门
+
+        先 prime 登记全部主键，每个模型在首次 load 时合并为一次 IN 查询；加载出的对象进入会话标识映射，
+        to_dict 中的多对一关联（最高匹配岗位、干部所在部门和岗位）直接从标识映射取得，不再逐条查询。
+        提交后已过期的匹配结果也先用一次 IN 查询统一刷新。
+        """
+        loader.load_many(MatchResult, [
+            inspect(r).identity[0] for r in results if inspect(r).identity and inspect(r).expired
+        ])
+        loader.prime(CadreBasicInfo, (r.cadre_id for r in results))
+        for r in results:
+            r._cached_cadre = loader.load(CadreBasicInfo, r.cadre_id)
+
+        cadres = [r._cached_cadre for r in results if r._cached_cadre]
+        position_ids = {r.position_id for r in results} | {r.best_match_position_id for r in results} \
+            | {c.position_id for c in cadres}
+        loader.prime(PositionInfo, position_ids)
+        for r in results:
+            r._cached_position = loader.load(PositionInfo, r.position_id)
+        loader.load_many(Department, {c.department_id for c in cadres})
+
+    @staticmethod
+    def _filter_match_result_query(position_id: int = None, cadre_id: int = None, match_level: str = None):
+        """构造带筛选条件的匹配结果查询"""
+        query = MatchResult.query
+
+        if position_id:
+            query = query.filter_by(position_id=position_id)
+        if cadre_id:
+            query = query.filter_by(cadre_id=cadre_id)
+        if match_level:
+            query = query.filter_by(match_level=match_level)
+
+        return query
+
     @staticmethod
     def get_match_result_by_id(result_id: int) -> MatchResult:
         """获取匹配结果详情"""
@@ -269,6 +362,24 @@ class MatchService:
         Returns:
             匹配结果字典列表（只包含必要字段）
         """
+        query = MatchService._build_current_position_match_query()
+        return [MatchService._current_position_match_row_to_dict(row) for row in query.all()]
+
+    @staticmethod
+    def iter_current_position_match_results(batch_size: int = 1000):
+        """
+        逐行迭代干部当前岗位匹配结果（用于流式导出，按批次从数据库读取）
+
+        Yields:
+            匹配结果字典（与 get_current_position_match_results 一致）
+        """
+        query = MatchService._build_current_position_match_query()
+        for row in query.yield_per(batch_size):
+            yield MatchService._current_position_match_row_to_dict(row)
+
+    @staticmethod
+    def _build_current_position_match_query():
+        """构造干部当前岗位匹配结果查询（联表获取干部、岗位、最高匹配岗位、部门）"""
         from sqlalchemy.orm import joinedload, aliased
 
         # 为最高匹配岗位创建别名
@@ -276,7 +387,7 @@ class MatchService:
 
         # 查询干部当前岗位的匹配结果，只选择必要字段
         # 使用 join 来一次性获取关联数据
-        query = db.session.query(
+        return db.session.query(
             MatchResult.id,
             MatchResult.cadre_id,
             MatchResult.position_id,
@@ -312,46 +423,44 @@ class MatchService:
             MatchResult.position_id == CadreBasicInfo.position_id
         ).order_by(
             MatchResult.final_score.desc()
-        ).all()
+        )
 
-        # 构建结果字典
-        results = []
-        for row in query:
-            results.append({
-                'id': row.id,
-                'cadre_id': row.cadre_id,
-                'position_id': row.position_id,
-                'base_score': row.base_score,
-                'deduction_score': row.deduction_score,
-                'final_score': row.final_score,
-                'match_level': row.match_level,
-                'best_match_position_id': row.best_match_position_id,
-                'best_match_score': row.best_match_score,
-                'cadre': {
-                    'id': row.cadre_info_id,
-                    'employee_no': row.employee_no,
-                    'name': row.name,
-                    'position_id': row.cadre_position_id,
-                    'position': {
-                        'id': row.position_info_id,
-                        'position_name': row.position_name
-                    } if row.position_info_id else None,
-                    'department': {
-                        'id': row.department_id,
-                        'name': row.department_name
-                    } if row.department_id else None
-                },
+    @staticmethod
+    def _current_position_match_row_to_dict(row) -> Dict:
+        """当前岗位匹配结果查询行转换为字典"""
+        return {
+            'id': row.id,
+            'cadre_id': row.cadre_id,
+            'position_id': row.position_id,
+            'base_score': row.base_score,
+            'deduction_score': row.deduction_score,
+            'final_score': row.final_score,
+            'match_level': row.match_level,
+            'best_match_position_id': row.best_match_position_id,
+            'best_match_score': row.best_match_score,
+            'cadre': {
+                'id': row.cadre_info_id,
+                'employee_no': row.employee_no,
+                'name': row.name,
+                'position_id': row.cadre_position_id,
                 'position': {
                     'id': row.position_info_id,
                     'position_name': row.position_name
-                },
-                'best_match_position': {
-                    'id': row.best_position_id,
-                    'position_name': row.best_position_name
-                } if row.best_position_id else None
-            })
-
-        return results
+                } if row.position_info_id else None,
+                'department': {
+                    'id': row.department_id,
+                    'name': row.department_name
+                } if row.department_id else None
+            },
+            'position': {
+                'id': row.position_info_id,
+                'position_name': row.position_name
+            },
+            'best_match_position': {
+                'id': row.best_position_id,
+                'position_name': row.best_position_name
+            } if row.best_position_id else None
+        }
 
     @staticmethod
     def generate_report(result_id: int) -> MatchReport:
@@ -451,10 +560,29 @@ class MatchService:
         """获取岗位能力权重"""
         return PositionAbilityWeight.query.filter_by(position_id=position_id).all()
 
+    @staticmethod
+    def _aggregate_dimension_scores(cadre_scores: List[CadreAbilityScore]) -> List[List[float]]:
+        """
+        按维度编号聚合干部能力评分
+
+        Returns:
+            下标为维度编号、值为该维度下各标签分数的数组（没有评分的维度为空列表）
+        """
+        dimension_ids = [ABILITY_REGISTRY.dimension_id(score.ability_dimension) for score in cadre_scores]
+        dimension_scores = [[] for _ in range(ABILITY_REGISTRY.dimension_count)]
+        for dimension_id, score in zip(dimension_ids, cadre_scores):
+            dimension_scores[dimension_id].append(score.score)
+        return dimension_scores
+
+    @staticmethod
+    def _build_weight_vector(position_weights: List[PositionAbilityWeight]) -> List[Tuple[int, float]]:
+        """把岗位能力权重转换为 (维度编号, 权重) 列表，保持权重配置顺序"""
+        return [(ABILITY_REGISTRY.dimension_id(weight.ability_dimension), weight.weight) for weight in position_weights]
+
     @staticmethod
     def _calculate_base_score(
-        cadre_scores: List[CadreAbilityScore],
-        position_weights: List[PositionAbilityWeight]
+        dimension_scores: List[List[float]],
+        weight_vector: List[Tuple[int, float]]
     ) -> float:
         """
         计算基础得分
@@ -465,70 +593,52 @@ class MatchService:
         3. 将维度总分换算成百分制：维度总分 / 维度满分 × 100
         4. 按维度权重计算原始匹配分：所有维度的（百分制分数 × 权重%）相加
         5. 四舍五入保留两位小数
-        """
-        # 按维度聚合干部能力评分
-        from collections import defaultdict
-        dimension_scores = defaultdict(list)
-        for score in cadre_scores:
-            dimension_scores[score.ability_dimension].append(score.score)
 
-        # 计算原始匹配分
+        Args:
+            dimension_scores: 按维度编号索引的干部评分（_aggregate_dimension_scores）
+            weight_vector: (维度编号, 权重) 列表（_build_weight_vector）
+        """
         final_score = 0.0
-        for weight in position_weights:
-            dimension = weight.ability_dimension
-            scores = dimension_scores.get(dimension, [])
-
-            if len(scores) == 0:
+        for dimension_id, weight in weight_vector:
+            scores = dimension_scores[dimension_id] if dimension_id < len(dimension_scores) else None
+            if not scores:
                 continue
 
-            # 维度总分 = 该维度下所有标签分数相加
-            dimension_total_score = sum(scores)
-
-            # 维度满分 = 该维度下标签数量 × 5分
-            dimension_max_score = len(scores) * 5
-
-            # 换算成百分制
-            dimension_percentage = (dimension_total_score / dimension_max_score) * 100
+            # 维度总分 = 该维度下所有标签分数相加，维度满分 = 该维度下标签数量 × 5分，换算成百分制
+            dimension_percentage = (sum(scores) / (len(scores) * 5)) * 100
 
             # 按权重计算该维度对最终分数的贡献
-            final_score += dimension_percentage * (weight.weight / 100)
+            final_score += dimension_percentage * (weight / 100)
 
         # 四舍五入保留两位小数
         return round(final_score, 2)
 
     @staticmethod
     def _build_base_score_details(
-        cadre_scores: List[CadreAbilityScore],
-        position_weights: List[PositionAbilityWeight]
+        dimension_scores: List[List[float]],
+        weight_vector: List[Tuple[int, float]]
     ) -> List[Dict]:
-        """构建基础得分详情"""
-        # 按维度聚合干部能力评分
-        from collections import defaultdict
-        dimension_scores = defaultdict(list)
-        for score in cadre_scores:
-            dimension_scores[score.ability_dimension].append(score.score)
-
-        # 计算每个维度的详情
-        dimension_details = {}
-        for weight in position_weights:
-            dimension = weight.ability_dimension
-            scores = dimension_scores.get(dimension, [])
-
-            if len(scores) == 0:
+        """
+        构建基础得分详情（存储格式不变，维度以名称输出）
+
+        同一维度配置了多条权重时与原实现一致：详情保留该维度首次出现的位置，权重和加权贡献取最后一条。
+        """
+        details = {}
+        for dimension_id, weight in weight_vector:
+            scores = dimension_scores[dimension_id] if dimension_id < len(dimension_scores) else None
+            if not scores:
                 continue
 
-            # 维度总分
+            # 维度总分、维度满分、百分制分数
             total_score = sum(scores)
-            # 维度满分
             max_score = len(scores) * 5
-            # 百分制分数
             percentage_score = (total_score / max_score) * 100
             # 加权后的分数贡献
-            weighted_contribution = percentage_score * (weight.weight / 100)
+            weighted_contribution = percentage_score * (weight / 100)
 
-            dimension_details[dimension] = {
-                'dimension': dimension,
-                'weight': weight.weight,
+            details[dimension_id] = {
+                'ability_dimension': ABILITY_REGISTRY.dimension_name(dimension_id),
+                'weight': weight,
                 'scores': scores,
                 'total_score': total_score,
                 'max_score': max_score,
@@ -536,25 +646,12 @@ class MatchService:
                 'weighted_contribution': round(weighted_contribution, 2)
             }
 
-        # 构建详情列表
-        details = []
-        for dimension, detail in dimension_details.items():
-            details.append({
-                'ability_dimension': detail['dimension'],
-                'weight': detail['weight'],
-                'scores': detail['scores'],
-                'total_score': detail['total_score'],
-                'max_score': detail['max_score'],
-                'percentage_score': detail['percentage_score'],
-                'weighted_contribution': detail['weighted_contribution']
-            })
-
-        return details
+        return list(details.values())
 
     @staticmethod
     def _check_mandatory_requirements(cadre_id: int, position_id: int) -> tuple:
         """检查硬性要求"""
-        cadre = CadreBasicInfo.query.get(cadre_id)
+        cadre = loader.load(CadreBasicInfo, cadre_id)
         if not cadre:
             return False, []
 
@@ -588,7 +685,7 @@ class MatchService:
     @staticmethod
     def _calculate_deduction(cadre_id: int, position_id: int) -> tuple:
         """计算建议要求扣分"""
-        cadre = CadreBasicInfo.query.get(cadre_id)
+        cadre = loader.load(CadreBasicInfo, cadre_id)
         if not cadre:
             return 0, []
 
@@ -730,10 +827,11 @@ class MatchService:
             old_results = MatchResult.query.filter(
                 MatchResult.cadre_id.in_(cadre_ids)
             ).all()
+            cadre_dict = loader.load_many(CadreBasicInfo, {old_result.cadre_id for old_result in old_results})
 
             for old_result in old_results:
                 # 检查是否是当前岗位的匹配结果
-                cadre = CadreBasicInfo.query.get(old_result.cadre_id)
+                cadre = cadre_dict.get(old_result.cadre_id)
                 if cadre and cadre.position_id == old_result.position_id:
                     # 删除关联的报告
                     MatchReport.query.filter_by(match_result_id=old_result.id).delete()
@@ -749,51 +847,191 @@ class MatchService:
             CadreBasicInfo.status == 1,
             CadreBasicInfo.position_id.isnot(None)
         ).all()
+        loader.add(PositionInfo, all_positions)
+        loader.add(CadreBasicInfo, cadres)
 
         results = []
         for cadre in cadres:
             try:
-                # 计算当前岗位的匹配度并保存到数据库
-                result = MatchService.calculate(cadre.id, cadre.position_id, save_to_db=True)
-
-                # 计算该干部与所有岗位的匹配度，找出最高分
-                best_position_id = None
-                best_score = 0.0
-
-                for position in all_positions:
-                    # 跳过当前岗位（已经计算过了）
-                    if position.id == cadre.position_id:
-                        continue
-
-                    try:
-                        # 计算匹配度，不保存到数据库
-                        match_result = MatchService.calculate(cadre.id, position.id, save_to_db=False)
-                        score = match_result.final_score or 0
-
-                        # 更新最高分
-                        if score > best_score:
-                            best_score = score
-                            best_position_id = position.id
-                    except Exception:
-                        # 单个岗位计算失败不影响其他岗位
-                        continue
-
-                # 更新当前岗位匹配结果中的最高匹配信息
-                result.best_match_position_id = best_position_id
-                result.best_match_score = best_score if best_position_id else None
-                db.session.commit()
-
-                results.append(result)
+                results.append(MatchService._calculate_current_position_with_best(cadre, all_positions))
             except Exception as e:
                 # 记录错误但继续处理其他干部
                 db.session.rollback()
                 continue
 
+        # 全部干部已重算，清空待重新匹配标记
+        MatchPendingCadre.query.delete()
+
+        # 当前岗位匹配结果全部更新，统一重算所有岗位风险和部门统计
+        from app.services.position_risk_service import PositionRiskService
+        from app.services.department_stat_service import DepartmentStatService
+        PositionRiskService.refresh_all()
+        DepartmentStatService.refresh_all()
+        db.session.commit()
+
         # 按最终得分降序排序
         results.sort(key=lambda x: x.final_score or 0, reverse=True)
+        MatchService._preload_result_relations(results)
 
         return results
 
+    @staticmethod
+    def _calculate_current_position_with_best(cadre: CadreBasicInfo, all_positions: List[PositionInfo]) -> MatchResult:
+        """
+        计算干部当前岗位的匹配度并保存，同时计算与其他岗位的匹配度找出最高匹配岗位（提交事务）
+
+        Args:
+            cadre: 干部对象（需有当前岗位）
+            all_positions: 所有启用的岗位
+
+        Returns:
+            当前岗位的匹配结果
+        """
+        result = MatchService._build_current_position_result(cadre, all_positions)
+        db.session.add(result)
+        db.session.commit()
+        return result
+
+    @staticmethod
+    def _build_current_position_result(cadre: CadreBasicInfo, all_positions: List[PositionInfo]) -> MatchResult:
+        """
+        计算干部当前岗位的匹配结果及最高匹配岗位（不保存，由调用方写入并提交）
+
+        Args:
+            cadre: 干部对象（需有当前岗位）
+            all_positions: 所有启用的岗位
+
+        Returns:
+            未保存的当前岗位匹配结果
+        """
+        result = MatchService.calculate(cadre.id, cadre.position_id, save_to_db=False)
+
+        # 计算该干部与所有岗位的匹配度，找出最高分
+        best_position_id = None
+        best_score = 0.0
+
+        for position in all_positions:
+            # 跳过当前岗位（已经计算过了）
+            if position.id == cadre.position_id:
+                continue
+
+            try:
+                # 计算匹配度，不保存到数据库
+                match_result = MatchService.calculate(cadre.id, position.id, save_to_db=False)
+                score = match_result.final_score or 0
+
+                # 更新最高分
+                if score > best_score:
+                    best_score = score
+                    best_position_id = position.id
+            except Exception:
+                # 单个岗位计算失败不影响其他岗位
+                continue
+
+        # 更新当前岗位匹配结果中的最高匹配信息
+        result.best_match_position_id = best_position_id
+        result.best_match_score = best_score if best_position_id else None
+
+        return result
+
+    @staticmethod
+    def mark_cadres_for_rematch(cadre_ids, reason: str) -> int:
+        """
+        标记需要重新计算当前岗位匹配度的干部（不提交事务）
+
+        批量导入后一次性写入标记，由 rematch_pending_cadres 统一重算，避免逐个干部触发计算。
+
+        Args:
+            cadre_ids: 干部ID集合
+            reason: 标记原因
+
+        Returns:
+            标记的干部数
+        """
+        cadre_ids = {cid for cid in cadre_ids if cid}
+        if not cadre_ids:
+            return 0
+
+        MatchPendingCadre.query.filter(
+            MatchPendingCadre.cadre_id.in_(cadre_ids)
+        ).delete(synchronize_session=False)
+        now = datetime.now()
+        db.session.execute(insert(MatchPendingCadre), [
+            {'cadre_id': cadre_id, 'reason': reason, 'mark_time': now} for cadre_id in cadre_ids
+        ])
+        return len(cadre_ids)
+
+    @staticmethod
+    def get_pending_rematch_count() -> int:
+        """获取待重新匹配的干部数量"""
+        return db.session.query(func.count(MatchPendingCadre.cadre_id)).scalar() or 0
+
+    @staticmethod
+    def rematch_pending_cadres() -> Dict:
+        """
+        重新计算已标记干部的当前岗位匹配度
+
+        只处理有岗位的在职干部，其余干部的标记直接清除；计算完成后统一重算受影响岗位的风险和部门统计。
+        每个干部先算出新结果，再在同一个事务内删除旧的当前岗位匹配结果、写入新结果并清除标记，
+        计算失败的干部保留旧结果和标记，下次重算时再处理。
+
+        Returns:
+            {'processed': 处理数, 'failed': 失败数}
+        """
+        from app.services.position_risk_service import PositionRiskService
+        from app.services.department_stat_service import DepartmentStatService
+
+        pending_ids = [row[0] for row in db.session.query(MatchPendingCadre.cadre_id).all()]
+        if not pending_ids:
+            return {'processed': 0, 'failed': 0}
+
+        cadres = CadreBasicInfo.query.filter(
+            CadreBasicInfo.id.in_(pending_ids),
+            CadreBasicInfo.status == 1,
+            CadreBasicInfo.position_id.isnot(None)
+        ).all()
+
+        all_positions = PositionInfo.query.filter_by(status=1).all()
+        loader.add(PositionInfo, all_positions)
+        loader.add(CadreBasicInfo, cadres)
+        processed = 0
+        failed = 0
+        for cadre in cadres:
+            try:
+                result = MatchService._build_current_position_result(cadre, all_positions)
+
+                # 旧结果的删除与新结果的写入在同一事务内，失败时旧结果保留
+                old_result_ids = [row[0] for row in db.session.query(MatchResult.id).filter(
+                    MatchResult.cadre_id == cadre.id,
+                    MatchResult.position_id == cadre.position_id
+                ).all()]
+                if old_result_ids:
+                    MatchReport.query.filter(
+                        MatchReport.match_result_id.in_(old_result_ids)
+                    ).delete(synchronize_session=False)
+                    MatchResult.query.filter(
+                        MatchResult.id.in_(old_result_ids)
+                    ).delete(synchronize_session=False)
+                db.session.add(result)
+                MatchPendingCadre.query.filter_by(cadre_id=cadre.id).delete(synchronize_session=False)
+                db.session.commit()
+                processed += 1
+            except Exception:
+                db.session.rollback()
+                failed += 1
+
+        # 不需要计算的干部（已离职或无岗位）直接清除标记
+        skipped_ids = set(pending_ids) - {cadre.id for cadre in cadres}
+        if skipped_ids:
+            MatchPendingCadre.query.filter(
+                MatchPendingCadre.cadre_id.in_(skipped_ids)
+            ).delete(synchronize_session=False)
+        PositionRiskService.refresh_for_cadres([cadre.id for cadre in cadres])
+        DepartmentStatService.refresh_for_cadres([cadre.id for cadre in cadres])
+        db.session.commit()
+
+        return {'processed': processed, 'failed': failed}
+
     @staticmethod
     def get_match_statistics() -> Dict:
         """
@@ -1116,7 +1354,7 @@ class MatchService:
     @staticmethod
     def get_position_risk() -> List[Dict]:
         """
-        获取关键岗位风险数据（优化版本 - 消除 N+1 查询）
+        获取关键岗位风险数据（读取预计算的 position_risk 表）
 
         风险因子：
         - 匹配度低：人岗匹配度 < 70
@@ -1130,186 +1368,13 @@ class MatchService:
         - 中风险：2个风险因子
         - 低风险：<= 1个风险因子
 
+        风险数据在任职者、匹配结果、培训记录或部门人数变化时按岗位重算，见 PositionRiskService。
+
         Returns:
             岗位风险数据列表
         """
-        from sqlalchemy import and_
-        from app.models.cadre import CadreDynamicInfo
-
-        today = datetime.now().date()
-        three_years_ago = today.replace(year=today.year - 3)
-
-        # 1. 一次性获取所有岗位
-        positions = db.session.query(PositionInfo.id, PositionInfo.position_code, PositionInfo.position_name).filter(
-            PositionInfo.status == 1
-        ).all()
-
-        position_ids = [p.id for p in positions]
-
-        # 2. 一次性获取所有岗位的任职者
-        incumbents = db.session.query(
-            CadreBasicInfo.id,
-            CadreBasicInfo.name,
-            CadreBasicInfo.birth_date,
-            CadreBasicInfo.entry_date,
-            CadreBasicInfo.department_id,
-            CadreBasicInfo.position_id
-        ).filter(
-            and_(
-                CadreBasicInfo.position_id.in_(position_ids),
-                CadreBasicInfo.status == 1
-            )
-        ).all()
-
-        # 构建任职者字典 {position_id: incumbent}
-        incumbent_dict = {inc.position_id: inc for inc in incumbents}
-        cadre_ids = [inc.id for inc in incumbents]
-
-        # 3. 一次性获取所有匹配结果
-        match_results = db.session.query(
-            MatchResult.cadre_id,
-            MatchResult.position_id,
-            MatchResult.final_score
-        ).filter(
-            and_(
-                MatchResult.cadre_id.in_(cadre_ids),
-                MatchResult.position_id.in_(position_ids)
-            )
-        ).order_by(MatchResult.create_time.desc()).all()
-
-        # 构建匹配结果字典 {(cadre_id, position_id): final_score}
-        match_dict = {(m.cadre_id, m.position_id): m.final_score for m in match_results}
-
-        # 4. 一次性获取所有培训记录统计
-        training_stats = db.session.query(
-            CadreDynamicInfo.cadre_id,
-            func.count(CadreDynamicInfo.id)
-        ).filter(
-            and_(
-                CadreDynamicInfo.cadre_id.in_(cadre_ids),
-                CadreDynamicInfo.info_type == 1,  # 培训记录
-                CadreDynamicInfo.create_time >= three_years_ago
-            )
-        ).group_by(CadreDynamicInfo.cadre_id).all()
-
-        # 构建培训记录字典 {cadre_id: count}
-        training_dict = {t[0]: t[1] for t in training_stats}
-
-        # 5. 一次性获取每个部门的人数统计（用于检查后备干部）
-        if incumbents:
-            department_ids = list(set([inc.department_id for inc in incumbents if inc.department_id]))
-            dept_counts = db.session.query(
-                CadreBasicInfo.department_id,
-                func.count(CadreBasicInfo.id)
-            ).filter(
-                and_(
-                    CadreBasicInfo.department_id.in_(department_ids),
-                    CadreBasicInfo.status == 1
-                )
-            ).group_by(CadreBasicInfo.department_id).all()
-
-            # 构建部门人数字典 {department_id: count}
-            dept_count_dict = {d[0]: d[1] for d in dept_counts}
-        else:
-            dept_count_dict = {}
-
-        # 6. 组装结果
-        risk_results = []
-
-        for position in positions:
-            incumbent = incumbent_dict.get(position.id)
-
-            # 初始化风险因子
-            risks = {
-                'low_match': False,
-                'age_risk': False,
-                'single_point': False,
-                'no_training': False,
-                'long_term': False
-            }
-
-            if incumbent:
-                # 1. 检查匹配度 < 70
-                match_score = match_dict.get((incumbent.id, position.id))
-                if match_score is not None and match_score < 70:
-                    risks['low_match'] = True
-
-                # 2. 检查年龄 > 55
-                if incumbent.birth_date:
-                    age = today.year - incumbent.birth_date.year - (
-                        (today.month, today.day) < (incumbent.birth_date.month, incumbent.birth_date.day)
-                    )
-                    if age > 55:
-                        risks['age_risk'] = True
-
-                # 3. 检查单点任职（部门人数 <= 1）
-                dept_count = dept_count_dict.get(incumbent.department_id, 0)
-                if dept_count <= 1:
-                    risks['single_point'] = True
-
-                # 4. 检查培养缺失（3年无培养记录）
-                training_count = training_dict.get(incumbent.id, 0)
-                if training_count == 0:
-                    risks['no_training'] = True
-
-                # 5. 检查任期过长 > 6年
-                if incumbent.entry_date:
-                    entry_years = today.year - incumbent.entry_date.year - (
-                        (today.month, today.day) < (incumbent.entry_date.month, incumbent.entry_date.day)
-                    )
-                    if entry_years > 6:
-                        risks['long_term'] = True
-            else:
-                # 岗位空缺，算作单点任职风险
-                risks['single_point'] = True
-
-            # 计算风险数量
-            risk_count = sum(1 for v in risks.values() if v)
-
-            # 确定风险等级
-            if risk_count >= 3:
-                risk_level = 'high'
-            elif risk_count >= 2:
-                risk_level = 'medium'
-            else:
-                risk_level = 'low'
-
-            # 构建结果
-            result = {
-                'position_id': position.id,
-                'position_code': position.position_code,
-                'position_name': position.position_name,
-                'incumbent': None,
-                'risks': risks,
-                'risk_count': risk_count,
-                'risk_level': risk_level
-            }
-
-            # 添加任职者信息
-            if incumbent:
-                age = None
-                if incumbent.birth_date:
-                    age = today.year - incumbent.birth_date.year - (
-                        (today.month, today.day) < (incumbent.birth_date.month, incumbent.birth_date.day)
-                    )
-
-                result['incumbent'] = {
-                    'id': incumbent.id,
-                    'name': incumbent.name,
-                    'age': age
-                }
-
-                # 添加匹配度分数
-                if match_score is not None:
-                    result['incumbent']['match_score'] = match_score
-
-            risk_results.append(result)
-
-        # 按风险等级和数量排序
-        risk_order = {'high': 0, 'medium': 1, 'low': 2}
-        risk_results.sort(key=lambda x: (risk_order[x['risk_level']], -x['risk_count']))
-
-        return risk_results
+        from app.services.position_risk_service import PositionRiskService
+        return PositionRiskService.get_position_risk_list()
 
     @staticmethod
     def get_quality_portrait() -> List[Dict]:
@@ -1329,7 +1394,7 @@ class MatchService:
         from app.models.cadre import CadreDynamicInfo
 
         today = datetime.now().date()
-        three_years_ago = today.replace(year=today.year - 3)
+        three_years_ago = years_ago(today, 3)
 
         # 1. 一次性获取所有在职干部（包含部门和岗位信息）
         cadres = db.session.query(
@@ -1446,54 +1511,282 @@ class MatchService:
 
         return quality_results
 
+    # 质量画像可排序字段
+    QUALITY_PORTRAIT_SORT_FIELDS = ('match_score', 'performance_score', 'core_project_count', 'quality_type', 'id')
+
+    @staticmethod
+    def _build_quality_portrait_query(
+        department: str = None,
+        management_level: str = None,
+        min_score: float = None,
+        max_score: float = None,
+        quality_type: str = None
+    ):
+        """
+        构建干部质量画像查询（绩效、匹配度、项目数和质量类型均在 SQL 中计算）
+
+        分类规则与 get_quality_portrait 一致，匹配度取干部最新一条匹配结果。
+
+        Returns:
+            (query, sort_columns)，sort_columns 为排序字段名到 SQL 表达式的映射
+        """
+        from sqlalchemy import and_, case
+        from app.models.cadre import CadreDynamicInfo
+
+        today = datetime.now().date()
+        three_years_ago = years_ago(today, 3)
+
+        # 近3年A/S绩效次数
+        performance_sub = db.session.query(
+            CadreDynamicInfo.cadre_id.label('cadre_id'),
+            func.count(CadreDynamicInfo.id).label('performance_count')
+        ).filter(
+            CadreDynamicInfo.info_type == 3,  # 绩效数据
+            CadreDynamicInfo.assessment_grade.in_(['A', 'S']),
+            CadreDynamicInfo.create_time >= three_years_ago
+        ).group_by(CadreDynamicInfo.cadre_id).subquery()
+
+        # 核心项目数
+        project_sub = db.session.query(
+            CadreDynamicInfo.cadre_id.label('cadre_id'),
+            func.count(CadreDynamicInfo.id).label('project_count')
+        ).filter(
+            CadreDynamicInfo.info_type == 2,  # 项目经历
+            CadreDynamicInfo.is_core_project == True
+        ).group_by(CadreDynamicInfo.cadre_id).subquery()
+
+        # 每个干部最新的匹配结果（自增ID与创建时间同序）
+        latest_match_sub = db.session.query(
+            MatchResult.cadre_id.label('cadre_id'),
+            func.max(MatchResult.id).label('match_id')
+        ).group_by(MatchResult.cadre_id).subquery()
+
+        performance_col = func.coalesce(performance_sub.c.performance_count, 0)
+        match_score_col = func.coalesce(MatchResult.final_score, 0)
+        project_col = func.coalesce(project_sub.c.project_count, 0)
+
+        quality_type_col = case(
+            (and_(performance_col >= 2, match_score_col >= 80), 'star'),
+            (and_(performance_col >= 2, match_score_col >= 60), 'potential'),
+            (and_(performance_col >= 1, match_score_col >= 80), 'potential'),
+            (and_(performance_col >= 1, match_score_col >= 60), 'stable'),
+            else_='adjust'
+        )
+        quality_order_col = case(
+            (quality_type_col == 'star', 0),
+            (quality_type_col == 'potential', 1),
+            (quality_type_col == 'stable', 2),
+            else_=3
+        )
+
+        query = db.session.query(
+            CadreBasicInfo.id,
+            CadreBasicInfo.name,
+            CadreBasicInfo.employee_no,
+            CadreBasicInfo.management_level,
+            Department.name.label('department_name'),
+            PositionInfo.position_name,
+            match_score_col.label('match_score'),
+            performance_col.label('performance_score'),
+            project_col.label('core_project_count'),
+            quality_type_col.label('quality_type')
+        ).outerjoin(
+            performance_sub, performance_sub.c.cadre_id == CadreBasicInfo.id
+        ).outerjoin(
+            project_sub, project_sub.c.cadre_id == CadreBasicInfo.id
+        ).outerjoin(
+            latest_match_sub, latest_match_sub.c.cadre_id == CadreBasicInfo.id
+        ).outerjoin(
+            MatchResult, MatchResult.id == latest_match_sub.c.match_id
+        ).outerjoin(
+            Department, CadreBasicInfo.department_id == Department.id
+        ).outerjoin(
+            PositionInfo, CadreBasicInfo.position_id == PositionInfo.id
+        ).filter(
+            CadreBasicInfo.status == 1
+        )
+
+        # 部门筛选（包含子部门）
+        if department:
+            from app.services.department_service import DepartmentService
+            try:
+                dept_id = int(department)
+                query = query.filter(DepartmentService.subtree_filter(CadreBasicInfo.department_id, dept_id))
+            except (ValueError, TypeError):
+                pass
+        if management_level:
+            query = query.filter(CadreBasicInfo.management_level == management_level)
+        if min_score is not None:
+            query = query.filter(match_score_col >= min_score)
+        if max_score is not None:
+            query = query.filter(match_score_col <= max_score)
+        if quality_type:
+            query = query.filter(quality_type_col == quality_type)
+
+        sort_columns = {
+            'match_score': match_score_col,
+            'performance_score': performance_col,
+            'core_project_count': project_col,
+            'quality_type': quality_order_col,
+            'id': CadreBasicInfo.id
+        }
+
+        return query, sort_columns
+
+    @staticmethod
+    def _quality_portrait_row_to_dict(row) -> Dict:
+        """质量画像查询行转换为字典（字段与 get_quality_portrait 一致）"""
+        return {
+            'id': row.id,
+            'name': row.name,
+            'employee_no': row.employee_no,
+            'department': row.department_name or '未分配',
+            'position': row.position_name or '未分配',
+            'match_score': row.match_score,
+            'performance_score': row.performance_score,
+            'core_project_count': row.core_project_count,
+            'quality_type': row.quality_type
+        }
+
+    @staticmethod
+    def get_quality_portrait_page(
+        page_size: int = 20,
+        cursor: str = None,
+        sort_by: str = 'match_score',
+        order: str = 'desc',
+        department: str = None,
+        management_level: str = None,
+        min_score: float = None,
+        max_score: float = None,
+        quality_type: str = None
+    ) -> Dict:
+        """
+        分页获取干部质量画像（游标分页，支持排序和筛选）
+
+        Args:
+            page_size: 每页数量
+            cursor: 上一页返回的游标，为空表示第一页
+            sort_by: 排序字段（match_score/performance_score/core_project_count/quality_type/id）
+            order: 排序方向（asc/desc）
+            department: 部门ID筛选（包含子部门）
+            management_level: 管理层级筛选
+            min_score: 最低匹配度
+            max_score: 最高匹配度
+            quality_type: 质量类型筛选（star/potential/stable/adjust）
+
+        Returns:
+            游标分页结果，仅第一页返回总数
+        """
+        from app.utils.helpers import build_keyset_query, exact_float_column
+
+        if sort_by not in MatchService.QUALITY_PORTRAIT_SORT_FIELDS:
+            raise ValueError(f'不支持的排序字段：{sort_by}')
+        if order not in ('asc', 'desc'):
+            raise ValueError(f'不支持的排序方向：{order}')
+
+        query, sort_columns = MatchService._build_quality_portrait_query(
+            department, management_level, min_score, max_score, quality_type
+        )
+
+        # 总数只在第一页计算，翻页时不重复统计
+        total = query.order_by(None).count() if not cursor else None
+
+        sort_column = sort_columns[sort_by]
+        if sort_by == 'quality_type':
+            quality_order = {'star': 0, 'potential': 1, 'stable': 2, 'adjust': 3}
+            cursor_key = lambda row: [quality_order[row.quality_type], row.id]
+        elif sort_by == 'match_score':
+            # 匹配分为浮点列，游标中保存双精度精确值，同分记录在页边界不会遗漏或重复
+            query = query.add_columns(
+                func.coalesce(exact_float_column(MatchResult.final_score), 0).label('match_score_cursor')
+            )
+            cursor_key = lambda row: [row.match_score_cursor, row.id]
+        else:
+            cursor_key = lambda row: [getattr(row, sort_by), row.id]
+
+        rows, next_cursor = build_keyset_query(
+            query, sort_column, CadreBasicInfo.id, page_size,
+            cursor=cursor, descending=(order == 'desc'), cursor_key=cursor_key
+        )
+
+        return {
+            'items': [MatchService._quality_portrait_row_to_dict(row) for row in rows],
+            'next_cursor': next_cursor,
+            'page_size': page_size,
+            'total': total
+        }
+
+    @staticmethod
+    def iter_quality_portrait(
+        department: str = None,
+        management_level: str = None,
+        min_score: float = None,
+        max_score: float = None,
+        quality_type: str = None,
+        batch_size: int = 500
+    ):
+        """
+        逐行迭代干部质量画像（用于流式导出，按批次从数据库读取）
+
+        Yields:
+            质量画像字典
+        """
+        query, _ = MatchService._build_quality_portrait_query(
+            department, management_level, min_score, max_score, quality_type
+        )
+        for row in query.order_by(CadreBasicInfo.id.asc()).yield_per(batch_size):
+            yield MatchService._quality_portrait_row_to_dict(row)
+
     @staticmethod
     def get_source_and_flow_statistics() -> Dict:
         """
-        获取干部来源与流动情况统计数据（优化版本 - 消除 N+1 查询）
+        获取干部来源与流动情况统计数据（基于预计算的流动事实表）
 
         判断逻辑：
         - 外部引进：直接任职当前岗位，没有内部任岗记录（职务变更记录）
         - 内部培养：有任岗记录，从其他岗位调动到当前岗位
 
+        来源类型和流动年份由 cadre_flow_fact 表维护，这里只做分组计数。
+
         Returns:
             包含来源占比和流动趋势的字典
         """
-        from sqlalchemy import and_
-        from app.models.cadre import CadreDynamicInfo
+        from app.models.cadre import CadreFlowFact
 
         current_year = datetime.now().year
+        source_type_col, flow_year_col = MatchService._flow_fact_columns()
 
-        # 1. 一次性获取所有在职干部的基本信息
-        cadres = db.session.query(
-            CadreBasicInfo.id,
+        # 1. 按管理层级和来源类型分组计数
+        level_stats = db.session.query(
             CadreBasicInfo.management_level,
-            CadreBasicInfo.entry_date
+            source_type_col.label('source_type'),
+            func.count(CadreBasicInfo.id)
+        ).outerjoin(
+            CadreFlowFact, CadreFlowFact.cadre_id == CadreBasicInfo.id
         ).filter(
             CadreBasicInfo.status == 1
+        ).group_by(
+            CadreBasicInfo.management_level,
+            source_type_col
         ).all()
 
-        cadre_ids = [c.id for c in cadres]
-
-        # 2. 一次性获取所有干部的职务变更记录
-        appointment_records = db.session.query(
-            CadreDynamicInfo.cadre_id,
-            CadreDynamicInfo.term_start_date,
-            CadreDynamicInfo.create_time
+        # 2. 按流动年份和来源类型分组计数（最近5年）
+        year_stats = db.session.query(
+            flow_year_col.label('flow_year'),
+            source_type_col.label('source_type'),
+            func.count(CadreBasicInfo.id)
+        ).outerjoin(
+            CadreFlowFact, CadreFlowFact.cadre_id == CadreBasicInfo.id
         ).filter(
-            and_(
-                CadreDynamicInfo.cadre_id.in_(cadre_ids),
-                CadreDynamicInfo.info_type == 5  # 职务变更
-            )
-        ).order_by(CadreDynamicInfo.create_time.asc()).all()
-
-        # 3. 构建干部的职务变更记录字典 {cadre_id: [records]}
-        appointment_dict = {}
-        for record in appointment_records:
-            if record.cadre_id not in appointment_dict:
-                appointment_dict[record.cadre_id] = []
-            appointment_dict[record.cadre_id].append(record)
+            CadreBasicInfo.status == 1,
+            flow_year_col >= current_year - 5,
+            flow_year_col <= current_year
+        ).group_by(
+            flow_year_col,
+            source_type_col
+        ).all()
 
-        # 4. 初始化统计数据
+        # 3. 初始化统计数据
         internal_count = 0  # 内部培养
         external_count = 0  # 外部引进
 
@@ -1513,38 +1806,20 @@ class MatchService:
             '基层': {'internal': 0, 'external': 0}
         }
 
-        # 5. 遍历干部统计数据
-        for cadre in cadres:
-            records = appointment_dict.get(cadre.id, [])
-
-            # 判断来源：如果有多次职务变更记录，说明是从其他岗位调来的（内部培养）
-            is_internal = len(records) > 1
-
-            # 统计来源
-            if is_internal:
-                internal_count += 1
-                if cadre.management_level in source_by_level:
-                    source_by_level[cadre.management_level]['internal'] += 1
+        # 4. 汇总来源统计
+        for management_level, source_type, count in level_stats:
+            if source_type == 'internal':
+                internal_count += count
             else:
-                external_count += 1
-                if cadre.management_level in source_by_level:
-                    source_by_level[cadre.management_level]['external'] += 1
-
-            # 统计流动趋势
-            flow_year = None
-            if is_internal and records:
-                # 内部培养：使用首次职务变更的年份
-                if records[0].term_start_date:
-                    flow_year = records[0].term_start_date.year
-            elif cadre.entry_date:
-                # 外部引进：使用入职年份
-                flow_year = cadre.entry_date.year
-
-            if flow_year and flow_year in flow_by_year:
-                if is_internal:
-                    flow_by_year[flow_year]['internal'] += 1
-                else:
-                    flow_by_year[flow_year]['external'] += 1
+                external_count += count
+            if management_level in source_by_level:
+                source_by_level[management_level][source_type] += count
+
+        # 5. 汇总流动趋势
+        for flow_year, source_type, count in year_stats:
+            flow_year = int(flow_year) if flow_year is not None else None
+            if flow_year in flow_by_year:
+                flow_by_year[flow_year][source_type] += count
 
         # 6. 计算总数和占比
         total_count = internal_count + external_count
@@ -1619,10 +1894,27 @@ class MatchService:
             'total': total_count or 0
         }
 
+    @staticmethod
+    def _flow_fact_columns():
+        """
+        来源类型、流动年份列（需与 cadre_flow_fact 外连接）
+
+        没有流动事实记录的干部按外部引进处理、流动年份取入职年份，与无职务变更记录时的推导结果一致，
+        来源统计和流动干部详情使用同一口径。只在外连接没有匹配到记录时回退，已有记录的流动年份为空时保持为空
+        （如没有任期开始日期的内部培养干部，不计入任何年份）。
+        """
+        from app.models.cadre import CadreFlowFact
+        from app.utils.constants import FLOW_SOURCE_EXTERNAL
+
+        no_fact = CadreFlowFact.cadre_id.is_(None)
+        source_type_col = case((no_fact, FLOW_SOURCE_EXTERNAL), else_=CadreFlowFact.source_type)
+        flow_year_col = case((no_fact, extract('year', CadreBasicInfo.entry_date)), else_=CadreFlowFact.flow_year)
+        return source_type_col, flow_year_col
+
     @staticmethod
     def get_flow_cadres_details(year: int = None, source_type: str = None) -> Dict:
         """
-        获取流动干部详情列表
+        获取流动干部详情列表（基于预计算的流动事实表）
 
         Args:
             year: 年份筛选（近5年）
@@ -1631,84 +1923,67 @@ class MatchService:
         Returns:
             包含流动干部详情列表的字典
         """
-        from sqlalchemy import and_
-        from app.models.cadre import CadreDynamicInfo
-        from app.models.position import PositionInfo
+        from app.models.cadre import CadreFlowFact
 
-        # 获取所有在职干部
-        cadres = db.session.query(CadreBasicInfo).filter(
-            CadreBasicInfo.status == 1
-        ).all()
-
-        # 流动干部详情列表
-        flow_cadres = []
         current_year = datetime.now().year
+        today = datetime.now().date()
+        source_type_col, flow_year_col = MatchService._flow_fact_columns()
 
-        for cadre in cadres:
-            # 查询干部的职务变更记录
-            appointment_records = db.session.query(CadreDynamicInfo).filter(
-                and_(
-                    CadreDynamicInfo.cadre_id == cadre.id,
-                    CadreDynamicInfo.info_type == 5  # 职务变更
-                )
-            ).order_by(CadreDynamicInfo.create_time.asc()).all()
-
-            # 判断来源和流动年份
-            is_internal = False
-            flow_year = None
-
-            if appointment_records and len(appointment_records) > 1:
-                # 有多次职务变更记录，说明是从其他岗位调来的
-                is_internal = True
-                if appointment_records[0].term_start_date:
-                    flow_year = appointment_records[0].term_start_date.year
-            elif cadre.entry_date:
-                # 外部引进：使用入职年份
-                flow_year = cadre.entry_date.year
-
-            # 获取当前岗位信息
-            position = None
-            if cadre.position_id:
-                position = db.session.query(PositionInfo).filter(
-                    PositionInfo.id == cadre.position_id
-                ).first()
+        # 一次查询获取干部、流动事实、岗位和部门信息，只统计近5年的数据
+        query = db.session.query(
+            CadreBasicInfo.id,
+            CadreBasicInfo.name,
+            CadreBasicInfo.gender,
+            CadreBasicInfo.birth_date,
+            CadreBasicInfo.management_level,
+            CadreBasicInfo.entry_date,
+            source_type_col.label('source_type'),
+            flow_year_col.label('flow_year'),
+            PositionInfo.position_name,
+            Department.name.label('department_name')
+        ).outerjoin(
+            CadreFlowFact, CadreFlowFact.cadre_id == CadreBasicInfo.id
+        ).outerjoin(
+            PositionInfo, CadreBasicInfo.position_id == PositionInfo.id
+        ).outerjoin(
+            Department, CadreBasicInfo.department_id == Department.id
+        ).filter(
+            CadreBasicInfo.status == 1,
+            flow_year_col >= current_year - 5
+        )
+
+        # 按年份和来源类型筛选
+        if year:
+            query = query.filter(flow_year_col == year)
+        if source_type:
+            query = query.filter(source_type_col == source_type)
 
+        # 按年份倒序排序
+        rows = query.order_by(flow_year_col.desc(), CadreBasicInfo.id.asc()).all()
+
+        flow_cadres = []
+        for row in rows:
             # 计算年龄
             age = None
-            if cadre.birth_date:
-                today = datetime.now().date()
-                birth_date = cadre.birth_date
-                age = today.year - birth_date.year - (
-                    (today.month, today.day) < (birth_date.month, birth_date.day)
+            if row.birth_date:
+                age = today.year - row.birth_date.year - (
+                    (today.month, today.day) < (row.birth_date.month, row.birth_date.day)
                 )
 
-            # 构建干部详情
-            cadre_info = {
-                'id': cadre.id,
-                'name': cadre.name,
-                'gender': cadre.gender,
+            is_internal = row.source_type == 'internal'
+            flow_cadres.append({
+                'id': row.id,
+                'name': row.name,
+                'gender': row.gender,
                 'age': age,
-                'management_level': cadre.management_level,
-                'position': position.position_name if position else None,
-                'department': cadre.department.name if cadre.department else None,
-                'source_type': 'internal' if is_internal else 'external',
+                'management_level': row.management_level,
+                'position': row.position_name,
+                'department': row.department_name,
+                'source_type': row.source_type,
                 'source_type_name': '内部培养' if is_internal else '外部引进',
-                'flow_year': flow_year,
-                'entry_date': cadre.entry_date.isoformat() if cadre.entry_date else None,
-            }
-
-            # 按年份和来源类型筛选
-            if year and flow_year != year:
-                continue
-            if source_type and cadre_info['source_type'] != source_type:
-                continue
-
-            # 只统计近5年的数据
-            if flow_year and flow_year >= current_year - 5:
-                flow_cadres.append(cadre_info)
-
-        # 按年份倒序排序
-        flow_cadres.sort(key=lambda x: (x['flow_year'] or 0), reverse=True)
+                'flow_year': int(row.flow_year) if row.flow_year is not None else None,
+                'entry_date': row.entry_date.isoformat() if row.entry_date else None,
+            })
 
         return {
             'total': len(flow_cadres),
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+from typing import List, Dict, Optional, Iterable, Set
+from datetime import datetime, date
+from sqlalchemy import func
+from app.models.cadre import CadreBasicInfo, CadreDynamicInfo
+from app.models.position import PositionInfo, PositionRisk
+from app.models.match import MatchResult
+from app.utils.constants import INFO_TYPE_TRAINING
+from app.utils.helpers import years_ago
+from app import db
+
+
+class PositionRiskService:
+    """岗位风险预计算服务类"""
+
+    @staticmethod
+    def evaluate_risks(risk: PositionRisk, today: date) -> None:
+        """
+        根据风险输入数据计算风险因子和风险等级（纯内存计算，不查询数据库）
+
+        风险因子：
+        - 匹配度低：人岗匹配度 < 70
+        - 年龄风险：任职者年龄 > 55
+        - 单点任职：无后备干部（部门人数 <= 1）或岗位空缺
+        - 培养缺失：3年无培养记录
+        - 任期过长：任期 > 6年
+
+        风险等级：
+        - 高风险：>= 3个风险因子
+        - 中风险：2个风险因子
+        - 低风险：<= 1个风险因子
+        """
+        three_years_ago = years_ago(today, 3)
+
+        risk.low_match = False
+        risk.age_risk = False
+        risk.single_point = False
+        risk.no_training = False
+        risk.long_term = False
+
+        if risk.incumbent_id:
+            if risk.match_score is not None and risk.match_score < 70:
+                risk.low_match = True
+
+            if risk.birth_date:
+                age = today.year - risk.birth_date.year - (
+                    (today.month, today.day) < (risk.birth_date.month, risk.birth_date.day)
+                )
+                if age > 55:
+                    risk.age_risk = True
+
+            if (risk.department_headcount or 0) <= 1:
+                risk.single_point = True
+
+            if not risk.last_training_time or risk.last_training_time.date() < three_years_ago:
+                risk.no_training = True
+
+            if risk.entry_date:
+                entry_years = today.year - risk.entry_date.year - (
+                    (today.month, today.day) < (risk.entry_date.month, risk.entry_date.day)
+                )
+                if entry_years > 6:
+                    risk.long_term = True
+        else:
+            # 岗位空缺，算作单点任职风险
+            risk.single_point = True
+
+        risk.risk_count = sum(1 for v in (
+            risk.low_match, risk.age_risk, risk.single_point, risk.no_training, risk.long_term
+        ) if v)
+
+        if risk.risk_count >= 3:
+            risk.risk_level = 'high'
+        elif risk.risk_count >= 2:
+            risk.risk_level = 'medium'
+        else:
+            risk.risk_level = 'low'
+
+        risk.calc_date = today
+
+    @staticmethod
+    def refresh_positions(position_ids: Iterable[int]) -> int:
+        """
+        重新计算指定岗位的风险数据（不提交事务，由调用方统一提交）
+
+        停用或已删除的岗位会移除其风险记录。
+
+        Args:
+            position_ids: 岗位ID集合
+
+        Returns:
+            重新计算的岗位数量
+        """
+        position_ids = {pid for pid in position_ids if pid}
+        if not position_ids:
+            return 0
+
+        today = datetime.now().date()
+
+        active_ids = {p.id for p in db.session.query(PositionInfo.id).filter(
+            PositionInfo.id.in_(position_ids),
+            PositionInfo.status == 1
+        ).all()}
+
+        # 移除停用岗位的风险记录
+        inactive_ids = position_ids - active_ids
+        if inactive_ids:
+            PositionRisk.query.filter(
+                PositionRisk.position_id.in_(inactive_ids)
+            ).delete(synchronize_session=False)
+
+        if not active_ids:
+            return 0
+
+        inputs = PositionRiskService._load_inputs(active_ids)
+
+        # 写入风险记录
+        existing = {r.position_id: r for r in PositionRisk.query.filter(
+            PositionRisk.position_id.in_(active_ids)
+        ).all()}
+
+        for position_id in active_ids:
+            risk = existing.get(position_id)
+            if not risk:
+                risk = PositionRisk(position_id=position_id)
+                db.session.add(risk)
+            for key, value in inputs[position_id].items():
+                setattr(risk, key, value)
+            PositionRiskService.evaluate_risks(risk, today)
+
+        return len(active_ids)
+
+    @staticmethod
+    def _load_inputs(position_ids: Set[int]) -> Dict[int, Dict]:
+        """
+        查询岗位风险的输入数据（任职者、最新匹配得分、最近培训时间、部门在职人数）
+
+        Returns:
+            {岗位ID: 风险输入字段}
+        """
+        # 1. 任职者（同一岗位多人任职时取ID最大的干部）
+        incumbents = db.session.query(
+            CadreBasicInfo.id,
+            CadreBasicInfo.name,
+            CadreBasicInfo.birth_date,
+            CadreBasicInfo.entry_date,
+            CadreBasicInfo.department_id,
+            CadreBasicInfo.position_id
+        ).filter(
+            CadreBasicInfo.position_id.in_(position_ids),
+            CadreBasicInfo.status == 1
+        ).order_by(CadreBasicInfo.id.asc()).all()
+        incumbent_dict = {inc.position_id: inc for inc in incumbents}
+        cadre_ids = [inc.id for inc in incumbent_dict.values()]
+
+        match_dict = {}
+        training_dict = {}
+        dept_count_dict = {}
+        if cadre_ids:
+            # 2. 任职者当前岗位最新的匹配结果（数据库内取最大ID，不在 Python 中去重）
+            latest_ids = db.session.query(
+                func.max(MatchResult.id)
+            ).filter(
+                MatchResult.cadre_id.in_(cadre_ids),
+                MatchResult.position_id.in_(position_ids)
+            ).group_by(MatchResult.cadre_id, MatchResult.position_id)
+            match_dict = {(m.cadre_id, m.position_id): m.final_score for m in db.session.query(
+                MatchResult.cadre_id,
+                MatchResult.position_id,
+                MatchResult.final_score
+            ).filter(MatchResult.id.in_(latest_ids)).all()}
+
+            # 3. 最近一次培训记录时间
+            training_dict = {t[0]: t[1] for t in db.session.query(
+                CadreDynamicInfo.cadre_id,
+                func.max(CadreDynamicInfo.create_time)
+            ).filter(
+                CadreDynamicInfo.cadre_id.in_(cadre_ids),
+                CadreDynamicInfo.info_type == INFO_TYPE_TRAINING
+            ).group_by(CadreDynamicInfo.cadre_id).all()}
+
+            # 4. 任职者所在部门的在职人数
+            department_ids = {inc.department_id for inc in incumbent_dict.values() if inc.department_id}
+            if department_ids:
+                dept_count_dict = {d[0]: d[1] for d in db.session.query(
+                    CadreBasicInfo.department_id,
+                    func.count(CadreBasicInfo.id)
+                ).filter(
+                    CadreBasicInfo.department_id.in_(department_ids),
+                    CadreBasicInfo.status == 1
+                ).group_by(CadreBasicInfo.department_id).all()}
+
+        inputs = {}
+        for position_id in position_ids:
+            incumbent = incumbent_dict.get(position_id)
+            if incumbent:
+                inputs[position_id] = {
+                    'incumbent_id': incumbent.id,
+                    'incumbent_name': incumbent.name,
+                    'birth_date': incumbent.birth_date,
+                    'entry_date': incumbent.entry_date,
+                    'department_id': incumbent.department_id,
+                    'department_headcount': dept_count_dict.get(incumbent.department_id, 0),
+                    'match_score': match_dict.get((incumbent.id, position_id)),
+                    'last_training_time': training_dict.get(incumbent.id)
+                }
+            else:
+                inputs[position_id] = {
+                    'incumbent_id': None,
+                    'incumbent_name': None,
+                    'birth_date': None,
+                    'entry_date': None,
+                    'department_id': None,
+                    'department_headcount': 0,
+                    'match_score': None,
+                    'last_training_time': None
+                }
+        return inputs
+
+    @staticmethod
+    def refresh_all() -> int:
+        """全量重新计算所有启用岗位的风险数据（不提交事务）"""
+        # 清理停用岗位遗留的风险记录
+        PositionRisk.query.filter(
+            ~PositionRisk.position_id.in_(db.session.query(PositionInfo.id).filter(PositionInfo.status == 1))
+        ).delete(synchronize_session=False)
+
+        position_ids = [p.id for p in db.session.query(PositionInfo.id).filter(PositionInfo.status == 1).all()]
+        return PositionRiskService.refresh_positions(position_ids)
+
+    @staticmethod
+    def get_affected_positions(cadre_ids: Iterable[int] = (), department_ids: Iterable[int] = ()) -> Set[int]:
+        """
+        获取受干部或部门人数变化影响的岗位ID
+
+        Args:
+            cadre_ids: 发生变化的干部ID
+            department_ids: 人数发生变化的部门ID
+
+        Returns:
+            岗位ID集合（干部担任的岗位，以及这些部门中在职任职者的岗位）
+        """
+        cadre_ids = {cid for cid in cadre_ids if cid}
+        department_ids = {did for did in department_ids if did}
+
+        position_ids = set()
+        if cadre_ids:
+            position_ids.update(p[0] for p in db.session.query(CadreBasicInfo.position_id).filter(
+                CadreBasicInfo.id.in_(cadre_ids),
+                CadreBasicInfo.position_id.isnot(None)
+            ).all())
+        if department_ids:
+            position_ids.update(p[0] for p in db.session.query(CadreBasicInfo.position_id).filter(
+                CadreBasicInfo.department_id.in_(department_ids),
+                CadreBasicInfo.status == 1,
+                CadreBasicInfo.position_id.isnot(None)
+            ).distinct().all())
+
+        return position_ids
+
+    @staticmethod
+    def refresh_for_cadres(cadre_ids: Iterable[int]) -> int:
+        """干部的匹配结果或培训记录变化后，重算其担任岗位的风险（不提交事务）"""
+        return PositionRiskService.refresh_positions(
+            PositionRiskService.get_affected_positions(cadre_ids=cadre_ids)
+        )
+
+    @staticmethod
+    def snapshot_cadre(cadre: CadreBasicInfo) -> Dict:
+        """记录干部变更前与岗位风险相关的字段，供 refresh_after_cadre_change 使用"""
+        return {
+            'position_id': cadre.position_id,
+            'department_id': cadre.department_id,
+            'status': cadre.status
+        }
+
+    @staticmethod
+    def refresh_after_cadre_change(cadre: Optional[CadreBasicInfo], before: Optional[Dict] = None) -> int:
+        """
+        干部新增、修改或删除后重算受影响岗位的风险（不提交事务）
+
+        受影响的岗位包括：干部变更前后担任的岗位，以及变更前后所在部门中其他任职者的岗位（部门人数变化）。
+
+        Args:
+            cadre: 变更后的干部对象（删除时为 None）
+            before: 变更前的快照
+        """
+        db.session.flush()
+
+        position_ids = set()
+        department_ids = set()
+        for state in (before, PositionRiskService.snapshot_cadre(cadre) if cadre else None):
+            if state:
+                position_ids.add(state['position_id'])
+                department_ids.add(state['department_id'])
+
+        position_ids.update(PositionRiskService.get_affected_positions(department_ids=department_ids))
+        return PositionRiskService.refresh_positions(position_ids)
+
+    @staticmethod
+    def _transient_copy(risk: PositionRisk) -> PositionRisk:
+        """复制风险记录（不加入会话），用于只读场景下按日期重新判定风险因子"""
+        return PositionRisk(**{column.key: getattr(risk, column.key) for column in PositionRisk.__table__.columns})
+
+    @staticmethod
+    def rebuild_all() -> int:
+        """全量重建岗位风险表（用于初次部署回填或数据修复）"""
+        total = PositionRiskService.refresh_all()
+        db.session.commit()
+        return total
+
+    @staticmethod
+    def get_position_risk_list() -> List[Dict]:
+        """
+        读取岗位风险数据
+
+        只读不写：缺少风险记录的岗位（如部署后尚未执行 POST /api/match/position-risk/rebuild）在内存中临时计算；
+        计算日期早于今天的记录只根据已存储的输入数据在内存中重新判定风险因子，不再查询任职者、匹配结果等关联表。
+        并发的首次读取不会重复插入风险记录。
+
+        Returns:
+            岗位风险数据列表
+        """
+        today = datetime.now().date()
+
+        rows = db.session.query(PositionInfo, PositionRisk).outerjoin(
+            PositionRisk, PositionRisk.position_id == PositionInfo.id
+        ).filter(
+            PositionInfo.status == 1
+        ).order_by(PositionInfo.id.asc()).all()
+
+        # 缺少风险记录的岗位临时计算（不写入数据库）
+        missing_ids = {position.id for position, risk in rows if risk is None}
+        if missing_ids:
+            inputs = PositionRiskService._load_inputs(missing_ids)
+            rows = [
+                (position, risk if risk is not None else PositionRisk(position_id=position.id, **inputs[position.id]))
+                for position, risk in rows
+            ]
+
+        # 按日期重新判定年龄、任期和培训窗口（在副本上判定，不修改会话中的记录）
+        evaluated = []
+        for position, risk in rows:
+            if risk.calc_date != today:
+                if risk.position_id not in missing_ids:
+                    risk = PositionRiskService._transient_copy(risk)
+                PositionRiskService.evaluate_risks(risk, today)
+            evaluated.append((position, risk))
+        rows = evaluated
+
+        risk_results = []
+        for position, risk in rows:
+            result = {
+                'position_id': position.id,
+                'position_code': position.position_code,
+                'position_name': position.position_name,
+                'incumbent': None,
+                'risks': {
+                    'low_match': risk.low_match,
+                    'age_risk': risk.age_risk,
+                    'single_point': risk.single_point,
+                    'no_training': risk.no_training,
+                    'long_term': risk.long_term
+                },
+                'risk_count': risk.risk_count,
+                'risk_level': risk.risk_level
+            }
+
+            if risk.incumbent_id:
+                age = None
+                if risk.birth_date:
+                    age = today.year - risk.birth_date.year - (
+                        (today.month, today.day) < (risk.birth_date.month, risk.birth_date.day)
+                    )
+                result['incumbent'] = {
+                    'id': risk.incumbent_id,
+                    'name': risk.incumbent_name,
+                    'age': age
+                }
+                if risk.match_score is not None:
+                    result['incumbent']['match_score'] = risk.match_score
+
+            risk_results.append(result)
+
+        # 按风险等级和数量排序
+        risk_order = {'high': 0, 'medium': 1, 'low': 2}
+        risk_results.sort(key=lambda x: (risk_order[x['risk_level']], -x['risk_count']))
+
+        return risk_results
@@ -1,7 +1,11 @@
-from typing import List, Dict, Optional
-from app.models.position import PositionInfo, PositionAbilityWeight, PositionRequirement
-from app.models.major import Major
-from app.models.certificate import Certificate
+import json
+from typing import List, Dict, Optional, Set, Iterable
+from sqlalchemy import select, delete
+from sqlalchemy.orm import selectinload
+from app.models.position import PositionInfo, PositionAbilityWeight, PositionRequirement, PositionRequirementValue
+from app.utils.constants import ID_LIST_INDICATOR_TYPES
+from app.services.position_risk_service import PositionRiskService
+from app.services.taxonomy_service import TaxonomyService
 from app import db
 
 
@@ -29,15 +33,7 @@ class PositionService:
         Returns:
             分页结果
         """
-        query = PositionInfo.query
-
-        # 筛选条件
-        if position_name:
-            query = query.filter(PositionInfo.position_name.like(f'%{position_name}%'))
-        if position_level:
-            query = query.filter(PositionInfo.position_level == position_level)
-        if status is not None:
-            query = query.filter(PositionInfo.status == status)
+        query = PositionService._filter_position_query(position_name, position_level, status)
 
         # 总数
         total = query.count()
@@ -52,6 +48,58 @@ class PositionService:
             'page_size': page_size
         }
 
+    @staticmethod
+    def get_position_page(
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        position_name: Optional[str] = None,
+        position_level: Optional[str] = None,
+        status: Optional[int] = None
+    ) -> Dict:
+        """
+        游标分页获取岗位列表（按ID升序）
+
+        Args:
+            page_size: 每页数量
+            cursor: 上一页返回的游标，首页为空
+            其余参数同 get_position_list
+
+        Returns:
+            {'items': [...], 'next_cursor': str|None, 'total': int}
+        """
+        from app.utils.helpers import build_cursor_pagination_query
+
+        query = PositionService._filter_position_query(position_name, position_level, status)
+        items, next_cursor, total = build_cursor_pagination_query(
+            query, PositionInfo.id, PositionInfo.id, page_size, cursor=cursor,
+            cursor_key=lambda item: [item.id, item.id]
+        )
+
+        return {
+            'items': [item.to_dict() for item in items],
+            'next_cursor': next_cursor,
+            'total': total
+        }
+
+    @staticmethod
+    def _filter_position_query(
+        position_name: Optional[str] = None,
+        position_level: Optional[str] = None,
+        status: Optional[int] = None
+    ):
+        """构造带筛选条件的岗位查询"""
+        query = PositionInfo.query
+
+        if position_name:
+            from app.services.search_service import SearchService
+            query = SearchService.filter_position_name(query, position_name)
+        if position_level:
+            query = query.filter(PositionInfo.position_level == position_level)
+        if status is not None:
+            query = query.filter(PositionInfo.status == status)
+
+        return query
+
     @staticmethod
     def get_position_by_id(position_id: int) -> Optional[PositionInfo]:
         """根据ID获取岗位"""
@@ -70,6 +118,11 @@ class PositionService:
         """
         position = PositionInfo(**data)
         db.session.add(position)
+        db.session.flush()
+
+        # 新岗位初始为空缺状态
+        PositionRiskService.refresh_positions({position.id})
+
         db.session.commit()
         db.session.refresh(position)
         return position
@@ -94,6 +147,11 @@ class PositionService:
             if hasattr(position, key):
                 setattr(position, key, value)
 
+        # 停用/启用会移除或补算岗位风险
+        if 'status' in data:
+            db.session.flush()
+            PositionRiskService.refresh_positions({position_id})
+
         db.session.commit()
         db.session.refresh(position)
         return position
@@ -167,6 +225,11 @@ class PositionService:
             status=1
         ).order_by(PositionRequirement.sort_order).all()
 
+        return PositionService._group_requirements(requirements)
+
+    @staticmethod
+    def _group_requirements(requirements: List[PositionRequirement]) -> Dict:
+        """把岗位要求按硬性要求和加分项分组（需已按排序号排列）"""
         mandatory = [r for r in requirements if r.requirement_type == 'mandatory']
         bonus = [r for r in requirements if r.requirement_type == 'bonus']
 
@@ -175,6 +238,87 @@ class PositionService:
             'bonus': [r.to_dict() for r in bonus]
         }
 
+    @staticmethod
+    def parse_requirement_ids(compare_value) -> Set[int]:
+        """
+        解析专业、证书要求的比较值（JSON 格式的ID列表）
+
+        Returns:
+            ID集合，无法解析时为空集
+        """
+        if not compare_value:
+            return set()
+        try:
+            values = json.loads(compare_value) if isinstance(compare_value, str) else compare_value
+        except (TypeError, ValueError):
+            return set()
+        if not isinstance(values, list):
+            values = [values]
+        ids = set()
+        for value in values:
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    @staticmethod
+    def get_requirement_references(indicator_type: str, value_ids: Iterable[int],
+                                   requirement_type: Optional[str] = None) -> List[Dict]:
+        """
+        按专业或证书反查岗位（按比较值明细表的 (指标类型, ID) 索引一次联表查询）
+
+        Args:
+            indicator_type: 指标类型（major/certificate）
+            value_ids: 专业或证书ID集合
+            requirement_type: 要求分类筛选（mandatory/bonus），为空时不限
+
+        Returns:
+            要求中包含这些ID的岗位列表 [{'id', 'position_code', 'position_name', 'requirement_types'}]，按岗位ID排序
+        """
+        value_ids = set(value_ids)
+        if not value_ids:
+            return []
+
+        query = db.session.query(
+            PositionInfo.id,
+            PositionInfo.position_code,
+            PositionInfo.position_name,
+            PositionRequirement.requirement_type
+        ).join(
+            PositionRequirement, PositionRequirement.position_id == PositionInfo.id
+        ).join(
+            PositionRequirementValue, PositionRequirementValue.requirement_id == PositionRequirement.id
+        ).filter(
+            PositionRequirementValue.indicator_type == indicator_type,
+            PositionRequirementValue.value_id.in_(value_ids)
+        )
+        if requirement_type:
+            query = query.filter(PositionRequirement.requirement_type == requirement_type)
+
+        positions = {}
+        for row in query.distinct().all():
+            position = positions.setdefault(row.id, {
+                'id': row.id,
+                'position_code': row.position_code,
+                'position_name': row.position_name,
+                'requirement_types': []
+            })
+            position['requirement_types'].append(row.requirement_type)
+        for position in positions.values():
+            position['requirement_types'].sort()
+        return [positions[pid] for pid in sorted(positions)]
+
+    @staticmethod
+    def _build_requirement_values(indicator_type: str, compare_value) -> List[PositionRequirementValue]:
+        """根据比较值生成专业、证书要求的ID明细（其他指标类型没有明细）"""
+        if indicator_type not in ID_LIST_INDICATOR_TYPES:
+            return []
+        return [
+            PositionRequirementValue(value_id=value_id, indicator_type=indicator_type)
+            for value_id in sorted(PositionService.parse_requirement_ids(compare_value))
+        ]
+
     @staticmethod
     def update_position_requirements(position_id: int, requirements: List[Dict]) -> bool:
         """
@@ -187,10 +331,15 @@ class PositionService:
         Returns:
             是否更新成功
         """
-        # 删除原有要求
+        # 删除原有要求及其比较值明细
+        db.session.execute(delete(PositionRequirementValue).where(
+            PositionRequirementValue.requirement_id.in_(
+                select(PositionRequirement.id).where(PositionRequirement.position_id == position_id)
+            )
+        ))
         PositionRequirement.query.filter_by(position_id=position_id).delete()
 
-        # 添加新要求
+        # 添加新要求，专业、证书要求同时写入比较值明细
         for idx, req_data in enumerate(requirements):
             req = PositionRequirement(
                 position_id=position_id,
@@ -202,6 +351,7 @@ class PositionService:
                 sort_order=idx + 1,
                 status=1
             )
+            req.value_items = PositionService._build_requirement_values(req.indicator_type, req.compare_value)
             db.session.add(req)
 
         db.session.commit()
@@ -213,31 +363,38 @@ class PositionService:
         return PositionInfo.query.filter_by(status=1).all()
 
     @staticmethod
-    def get_major_list() -> List[Dict]:
-        """获取专业列表（用于下拉选择）"""
-        majors = Major.query.filter_by(status=1).order_by(Major.sort_order).all()
-        # 返回扁平列表，包含层级信息
+    def get_all_positions_with_config() -> List[Dict]:
+        """
+        获取所有启用的岗位及其能力权重和岗位要求
+
+        能力权重、岗位要求各用一条 IN 查询批量加载（selectinload），不随岗位数量逐个查询。
+
+        Returns:
+            岗位字典列表，含 ability_weights 和按硬性要求/加分项分组的 requirements
+        """
+        positions = PositionInfo.query.options(
+            selectinload(PositionInfo.ability_weights),
+            selectinload(PositionInfo.requirements)
+        ).filter_by(status=1).all()
+
         result = []
-        for major in majors:
-            result.append({
-                'id': major.id,
-                'name': major.name,
-                'parent_id': major.parent_id,
-                'level': 1 if major.parent_id is None else 2
-            })
+        for position in positions:
+            position_dict = position.to_dict()
+            position_dict['ability_weights'] = [w.to_dict() for w in position.ability_weights]
+            requirements = sorted(
+                (r for r in position.requirements if r.status == 1),
+                key=lambda r: (r.sort_order or 0, r.id)
+            )
+            position_dict['requirements'] = PositionService._group_requirements(requirements)
+            result.append(position_dict)
         return result
 
+    @staticmethod
+    def get_major_list() -> List[Dict]:
+        """获取专业列表（用于下拉选择，扁平列表含层级信息，读取共享的专业分类缓存）"""
+        return TaxonomyService.get_major_taxonomy().options
+
     @staticmethod
     def get_certificate_list() -> List[Dict]:
-        """获取证书列表（用于下拉选择）"""
-        certificates = Certificate.query.filter_by(status=1).order_by(Certificate.sort_order).all()
-        # 返回扁平列表，包含层级信息
-        result = []
-        for cert in certificates:
-            result.append({
-                'id': cert.id,
-                'name': cert.name,
-                'parent_id': cert.parent_id,
-                'level': 1 if cert.parent_id is None else 2
-            })
-        return result
+        """获取证书列表（用于下拉选择，扁平列表含层级信息，读取共享的证书分类缓存）"""
+        return TaxonomyService.get_certificate_taxonomy().options
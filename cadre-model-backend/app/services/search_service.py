@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+干部与岗位搜索服务
+
+基于 n-gram（单字 + 双字）索引检索中文姓名、工号、部门和岗位名称：
+- MySQL：使用 ngram 分词的 FULLTEXT 索引（见 migrations/add_search_fulltext_index.sql）
+- 其他数据库（SQLite/测试环境）：进程内倒排索引，干部、部门、岗位的数据版本变化后重建
+
+检索结果按匹配字段（姓名 > 工号 > 岗位 > 部门）和匹配方式（完全匹配 > 前缀匹配 > 包含）排序。
+MySQL 下每类候选结果先在数据库内按同样的匹配方式排序再截取，常见双字命中大量记录时完全匹配、前缀匹配不会被截掉。
+单字关键词无法命中 ngram 索引，退化为 LIKE '%关键词%' 扫描（干部、岗位数量有限，按需接受）。
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from sqlalchemy import case, func
+from sqlalchemy.dialects.mysql import match as mysql_match
+from app.models.cadre import CadreBasicInfo
+from app.models.department import Department
+from app.models.position import PositionInfo
+from app import db
+
+# MySQL ngram_token_size 默认值，短于该长度的关键词无法命中 FULLTEXT 索引
+NGRAM_TOKEN_SIZE = 2
+
+# 每类候选结果的最大数量（排序前）
+SEARCH_CANDIDATE_LIMIT = 500
+
+# 字段优先级（越小越靠前）
+CADRE_FIELD_PRIORITY = {'name': 0, 'employee_no': 1, 'position': 2, 'department': 3}
+POSITION_FIELD_PRIORITY = {'position_name': 0, 'position_code': 1}
+
+# 编码类字段只做前缀匹配（MySQL 下走普通索引）
+PREFIX_ONLY_FIELDS = {'employee_no', 'position_code'}
+
+
+def _ngrams(text: str) -> Set[str]:
+    """切分单字和双字"""
+    text = text.lower()
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _match_rank(value: Optional[str], keyword: str) -> Optional[int]:
+    """匹配方式：0-完全匹配，1-前缀匹配，2-包含，None-不匹配"""
+    if not value:
+        return None
+    value = value.lower()
+    if value == keyword:
+        return 0
+    if value.startswith(keyword):
+        return 1
+    if keyword in value:
+        return 2
+    return None
+
+
+def _rank_documents(docs: List[Dict], keyword: str, field_priority: Dict[str, int], limit: int) -> List[Dict]:
+    """按 (匹配方式, 字段优先级, 字段长度, id) 排序并标注命中字段"""
+    keyword = keyword.lower()
+    ranked = []
+    for doc in docs:
+        best = None
+        for field, priority in field_priority.items():
+            rank = _match_rank(doc.get(field), keyword)
+            if rank is None or (rank == 2 and field in PREFIX_ONLY_FIELDS):
+                continue
+            sort_key = (rank, priority, len(doc[field]), doc['id'])
+            if best is None or sort_key < best[0]:
+                best = (sort_key, field)
+        if best is not None:
+            ranked.append((best[0], dict(doc, matched_field=best[1])))
+
+    ranked.sort(key=lambda item: item[0])
+    return [doc for _, doc in ranked[:limit]]
+
+
+class NgramIndex:
+    """进程内 n-gram 倒排索引"""
+
+    def __init__(self, field_priority: Dict[str, int]):
+        self.field_priority = field_priority
+        self.docs = {}
+        self.postings = defaultdict(set)
+
+    def add(self, doc: Dict) -> None:
+        self.docs[doc['id']] = doc
+        for field in self.field_priority:
+            value = doc.get(field)
+            if value:
+                for gram in _ngrams(value):
+                    self.postings[(field, gram)].add(doc['id'])
+
+    def match_ids(self, keyword: str, fields=None) -> Set[int]:
+        """返回指定字段包含关键词的文档ID"""
+        keyword = keyword.lower()
+        grams = {keyword} if len(keyword) == 1 else {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+        result = set()
+        for field in fields or self.field_priority:
+            candidates = None
+            for gram in grams:
+                posting = self.postings.get((field, gram), set())
+                candidates = posting if candidates is None else candidates & posting
+                if not candidates:
+                    break
+            # 双字全部命中不代表连续出现，需再校验一次
+            result.update(
+                doc_id for doc_id in candidates or ()
+                if keyword in (self.docs[doc_id].get(field) or '').lower()
+            )
+        return result
+
+    def search(self, keyword: str, limit: int) -> List[Dict]:
+        docs = [self.docs[doc_id] for doc_id in self.match_ids(keyword)]
+        return _rank_documents(docs, keyword, self.field_priority, limit)
+
+
+class SearchService:
+    """干部与岗位搜索服务类"""
+
+    _indexes = {}
+    _index_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_keyword(keyword: Optional[str]) -> str:
+        """去除首尾空白"""
+        return (keyword or '').strip()
+
+    @staticmethod
+    def use_fulltext() -> bool:
+        """当前数据库是否使用 MySQL ngram FULLTEXT 索引"""
+        return db.session.get_bind().dialect.name == 'mysql'
+
+    @staticmethod
+    def search_cadres(keyword: str, limit: int = 20) -> List[Dict]:
+        """
+        按姓名、工号、部门、岗位搜索干部
+
+        Args:
+            keyword: 关键词
+            limit: 返回数量
+
+        Returns:
+            排序后的干部列表，matched_field 为命中字段
+        """
+        keyword = SearchService.normalize_keyword(keyword)
+        if not keyword:
+            return []
+
+        if not SearchService.use_fulltext():
+            return SearchService._get_index('cadre').search(keyword, limit)
+
+        query = SearchService._cadre_document_query()
+        department_ids = [row.id for row in db.session.query(Department.id).filter(
+            SearchService._text_condition(Department.name, keyword)
+        ).order_by(*SearchService._rank_order(Department.name, keyword), Department.id).limit(
+            SEARCH_CANDIDATE_LIMIT
+        ).all()]
+        position_ids = [row.id for row in db.session.query(PositionInfo.id).filter(
+            SearchService._text_condition(PositionInfo.position_name, keyword)
+        ).order_by(*SearchService._rank_order(PositionInfo.position_name, keyword), PositionInfo.id).limit(
+            SEARCH_CANDIDATE_LIMIT
+        ).all()]
+
+        # 每类候选按该类命中字段的匹配方式排序后截取
+        candidate_queries = [
+            query.filter(SearchService._text_condition(CadreBasicInfo.name, keyword)).order_by(
+                *SearchService._rank_order(CadreBasicInfo.name, keyword)
+            ),
+            # 工号使用唯一索引做前缀匹配
+            query.filter(CadreBasicInfo.employee_no.like(f'{keyword}%')).order_by(
+                *SearchService._rank_order(CadreBasicInfo.employee_no, keyword)
+            )
+        ]
+        if department_ids:
+            candidate_queries.append(query.filter(CadreBasicInfo.department_id.in_(department_ids)).order_by(
+                *SearchService._rank_order(Department.name, keyword)
+            ))
+        if position_ids:
+            candidate_queries.append(query.filter(CadreBasicInfo.position_id.in_(position_ids)).order_by(
+                *SearchService._rank_order(PositionInfo.position_name, keyword)
+            ))
+
+        docs = {}
+        for candidate_query in candidate_queries:
+            for row in candidate_query.order_by(CadreBasicInfo.id).limit(SEARCH_CANDIDATE_LIMIT).all():
+                docs[row.id] = SearchService._cadre_row_to_document(row)
+
+        return _rank_documents(list(docs.values()), keyword, CADRE_FIELD_PRIORITY, limit)
+
+    @staticmethod
+    def search_positions(keyword: str, limit: int = 20) -> List[Dict]:
+        """
+        按岗位名称、岗位编码搜索岗位
+
+        Args:
+            keyword: 关键词
+            limit: 返回数量
+
+        Returns:
+            排序后的岗位列表，matched_field 为命中字段
+        """
+        keyword = SearchService.normalize_keyword(keyword)
+        if not keyword:
+            return []
+
+        if not SearchService.use_fulltext():
+            return SearchService._get_index('position').search(keyword, limit)
+
+        # 按 (匹配方式, 字段优先级) 排序后截取：名称完全匹配 > 编码完全匹配 > 名称前缀 > 编码前缀 > 名称包含
+        rows = SearchService._position_document_query().filter(db.or_(
+            SearchService._text_condition(PositionInfo.position_name, keyword),
+            PositionInfo.position_code.like(f'{keyword}%')
+        )).order_by(
+            case(
+                (PositionInfo.position_name == keyword, 0),
+                (PositionInfo.position_code == keyword, 1),
+                (PositionInfo.position_name.like(f'{keyword}%'), 2),
+                (PositionInfo.position_code.like(f'{keyword}%'), 3),
+                else_=4
+            ),
+            func.char_length(PositionInfo.position_name),
+            PositionInfo.id
+        ).limit(SEARCH_CANDIDATE_LIMIT).all()
+
+        docs = [SearchService._position_row_to_document(row) for row in rows]
+        return _rank_documents(docs, keyword, POSITION_FIELD_PRIORITY, limit)
+
+    @staticmethod
+    def filter_cadre_name(query, name: str):
+        """为干部查询添加姓名包含筛选（替代 LIKE '%name%' 全表扫描）"""
+        keyword = SearchService.normalize_keyword(name)
+        if not keyword:
+            return query
+        if SearchService.use_fulltext():
+            return query.filter(SearchService._text_condition(CadreBasicInfo.name, keyword))
+        ids = SearchService._get_index('cadre').match_ids(keyword, fields=['name'])
+        return query.filter(CadreBasicInfo.id.in_(ids))
+
+    @staticmethod
+    def filter_position_name(query, position_name: str):
+        """为岗位查询添加岗位名称包含筛选（替代 LIKE '%name%' 全表扫描）"""
+        keyword = SearchService.normalize_keyword(position_name)
+        if not keyword:
+            return query
+        if SearchService.use_fulltext():
+            return query.filter(SearchService._text_condition(PositionInfo.position_name, keyword))
+        ids = SearchService._get_index('position').match_ids(keyword, fields=['position_name'])
+        return query.filter(PositionInfo.id.in_(ids))
+
+    @staticmethod
+    def _text_condition(column, keyword: str):
+        """
+        字段包含关键词的条件（MySQL）
+
+        关键词不短于 ngram 长度时先用 FULLTEXT 短语检索缩小范围，再用 LIKE 保证连续包含；
+        单字关键词无法命中 ngram 索引，直接使用 LIKE。
+        """
+        contains = column.like(f'%{keyword}%')
+        if len(keyword) < NGRAM_TOKEN_SIZE:
+            return contains
+        # 关键词作为布尔模式短语检索，去掉其中的双引号避免破坏短语
+        phrase = keyword.replace('"', '')
+        return db.and_(mysql_match(column, against=f'"{phrase}"').in_boolean_mode(), contains)
+
+    @staticmethod
+    def _rank_order(column, keyword: str) -> tuple:
+        """候选结果在数据库内的排序（与 _rank_documents 一致：完全匹配 > 前缀匹配 > 包含，再按字段长度）"""
+        return (
+            case((column == keyword, 0), (column.like(f'{keyword}%'), 1), else_=2),
+            func.char_length(column)
+        )
+
+    @staticmethod
+    def _cadre_document_query():
+        return db.session.query(
+            CadreBasicInfo.id,
+            CadreBasicInfo.name,
+            CadreBasicInfo.employee_no,
+            CadreBasicInfo.status,
+            CadreBasicInfo.department_id,
+            CadreBasicInfo.position_id,
+            Department.name.label('department_name'),
+            PositionInfo.position_name
+        ).outerjoin(
+            Department, CadreBasicInfo.department_id == Department.id
+        ).outerjoin(
+            PositionInfo, CadreBasicInfo.position_id == PositionInfo.id
+        )
+
+    @staticmethod
+    def _cadre_row_to_document(row) -> Dict:
+        return {
+            'id': row.id,
+            'name': row.name,
+            'employee_no': row.employee_no,
+            'status': row.status,
+            'department_id': row.department_id,
+            'department': row.department_name,
+            'position_id': row.position_id,
+            'position': row.position_name
+        }
+
+    @staticmethod
+    def _position_document_query():
+        return db.session.query(
+            PositionInfo.id,
+            PositionInfo.position_code,
+            PositionInfo.position_name,
+            PositionInfo.status
+        )
+
+    @staticmethod
+    def _position_row_to_document(row) -> Dict:
+        return {
+            'id': row.id,
+            'position_code': row.position_code,
+            'position_name': row.position_name,
+            'status': row.status
+        }
+
+    @staticmethod
+    def _get_index(kind: str) -> NgramIndex:
+        """获取进程内索引，索引依赖的数据版本变化后重建（动态信息、匹配结果等其他写入不触发重建）"""
+        from app.utils.cache import (
+            get_data_versions, DATA_VERSION_CADRE, DATA_VERSION_DEPARTMENT, DATA_VERSION_POSITION_CONFIG
+        )
+
+        if kind == 'cadre':
+            # 干部文档包含所在部门名称和岗位名称
+            version = get_data_versions(DATA_VERSION_CADRE, DATA_VERSION_DEPARTMENT, DATA_VERSION_POSITION_CONFIG)
+        else:
+            version = get_data_versions(DATA_VERSION_POSITION_CONFIG)
+        entry = SearchService._indexes.get(kind)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with SearchService._index_lock:
+            entry = SearchService._indexes.get(kind)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            if kind == 'cadre':
+                index = NgramIndex(CADRE_FIELD_PRIORITY)
+                for row in SearchService._cadre_document_query().all():
+                    index.add(SearchService._cadre_row_to_document(row))
+            else:
+                index = NgramIndex(POSITION_FIELD_PRIORITY)
+                for row in SearchService._position_document_query().all():
+                    index.add(SearchService._position_row_to_document(row))
+
+            SearchService._indexes[kind] = (version, index)
+            return index
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import threading
+from typing import List, Dict, Optional, FrozenSet
+from app.models.major import Major
+from app.models.certificate import Certificate
+
+
+class TaxonomyTree:
+    """
+    专业/证书分类内存树（只读）
+
+    一次查询整张分类表后构建：id -> 节点字典、父节点 -> 子节点邻接表、每个节点的子树ID集合，
+    以及启用节点的两层树、扁平列表和下拉选项。由 TaxonomyService 按各自的数据版本在进程内共享。
+    """
+
+    def __init__(self, items: List):
+        self.nodes = {item.id: item.to_dict() for item in items}
+
+        # 父节点 -> 子节点ID（按排序号）
+        ordered = sorted(items, key=lambda item: (item.sort_order or 0, item.id))
+        self.children = {}
+        for item in ordered:
+            self.children.setdefault(item.parent_id, []).append(item.id)
+
+        # 启用节点的扁平列表与下拉选项（含层级：1-第一层类型，2-第二层名称）
+        enabled = [item for item in ordered if item.status == 1]
+        self.enabled_list = [self.nodes[item.id] for item in enabled]
+        self.options = [
+            {
+                'id': item.id,
+                'name': item.name,
+                'parent_id': item.parent_id,
+                'level': 1 if item.parent_id is None else 2
+            }
+            for item in enabled
+        ]
+        self.tree = self._build_tree({item.id for item in enabled})
+
+    def _build_tree(self, enabled_ids) -> List[Dict]:
+        """启用节点的两层树（停用的第一层节点下的子节点不出现在树中）"""
+        tree_fields = ('id', 'name', 'parent_id', 'sort_order', 'status', 'description')
+
+        def build_node(node_id, children):
+            node = {field: self.nodes[node_id][field] for field in tree_fields}
+            node['children'] = children
+            return node
+
+        return [
+            build_node(root_id, [
+                # 固定两层，第二层节点下不再有子节点
+                build_node(child_id, []) for child_id in self.children.get(root_id, []) if child_id in enabled_ids
+            ])
+            for root_id in self.children.get(None, []) if root_id in enabled_ids
+        ]
+
+    def get_name(self, node_id: int) -> Optional[str]:
+        """节点名称，节点不存在时为 None"""
+        node = self.nodes.get(node_id)
+        return node['name'] if node else None
+
+    def subtree_ids(self, node_id: int) -> FrozenSet[int]:
+        """节点及其所有子节点ID，节点不存在时为空集"""
+        if node_id not in self.nodes:
+            return frozenset()
+        result = set()
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            if current not in result:
+                result.add(current)
+                stack.extend(self.children.get(current, []))
+        return frozenset(result)
+
+
+class TaxonomyService:
+    """专业、证书分类共享缓存服务类"""
+
+    # 进程内共享的分类树：表名 -> (数据版本, TaxonomyTree)
+    _trees = {}
+    _trees_lock = threading.Lock()
+
+    @staticmethod
+    def _get_tree(model, version_name: str) -> TaxonomyTree:
+        """
+        获取分类内存树（按数据版本缓存，分类新增、修改、删除后自动重建）
+
+        只用于读取；写入分类的事务内请直接查询数据库，避免缓存未提交的数据。
+        """
+        from app.utils.cache import get_data_version
+
+        key = model.__tablename__
+        version = get_data_version(version_name)
+        entry = TaxonomyService._trees.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with TaxonomyService._trees_lock:
+            entry = TaxonomyService._trees.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            tree = TaxonomyTree(model.query.all())
+            TaxonomyService._trees[key] = (version, tree)
+            return tree
+
+    @staticmethod
+    def get_major_taxonomy() -> TaxonomyTree:
+        """获取专业分类内存树"""
+        from app.utils.cache import DATA_VERSION_MAJOR
+        return TaxonomyService._get_tree(Major, DATA_VERSION_MAJOR)
+
+    @staticmethod
+    def get_certificate_taxonomy() -> TaxonomyTree:
+        """获取证书分类内存树"""
+        from app.utils.cache import DATA_VERSION_CERTIFICATE
+        return TaxonomyService._get_tree(Certificate, DATA_VERSION_CERTIFICATE)
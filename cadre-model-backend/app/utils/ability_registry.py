@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+能力维度整数编号表
+
+按 ABILITY_DIMENSIONS 的定义顺序为能力维度分配从 0 开始的连续编号，
+评分计算按维度编号索引的数组汇总各维度分数，基础得分和得分详情共用同一份汇总结果。
+数据库中出现未定义的维度时，在首次遇到时追加编号。
+"""
+import threading
+from typing import Iterable
+from app.utils.ability_constants import ABILITY_DIMENSIONS
+
+
+class AbilityRegistry:
+    """能力维度编号表"""
+
+    def __init__(self, dimensions: Iterable[str]):
+        self._lock = threading.Lock()
+        self.dimension_names = []
+        self._dimension_ids = {}
+
+        for dimension in dimensions:
+            self.dimension_id(dimension)
+
+    @property
+    def dimension_count(self) -> int:
+        """已编号的维度数量（按维度编号索引的数组长度）"""
+        return len(self.dimension_names)
+
+    def dimension_id(self, name: str) -> int:
+        """维度编号，未定义的维度追加编号"""
+        dimension_id = self._dimension_ids.get(name)
+        if dimension_id is None:
+            with self._lock:
+                dimension_id = self._dimension_ids.get(name)
+                if dimension_id is None:
+                    dimension_id = len(self.dimension_names)
+                    self.dimension_names.append(name)
+                    self._dimension_ids[name] = dimension_id
+        return dimension_id
+
+    def dimension_name(self, dimension_id: int) -> str:
+        """维度编号对应的名称"""
+        return self.dimension_names[dimension_id]
+
+
+# 进程内共享的能力维度编号表
+ABILITY_REGISTRY = AbilityRegistry(ABILITY_DIMENSIONS)
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+数据版本与响应缓存
+
+业务数据（干部、岗位、动态信息、匹配结果等）写入时递增数据库中的全局数据版本号，
+各进程内的响应缓存以该版本号校验是否失效，多进程部署时同样有效。
+部门、专业、证书等变化较少的数据另有独立的版本号，只在对应表写入时递增，其缓存不受其他业务数据写入影响。
+干部基本信息另有独立的版本号，进程内搜索索引只随干部、部门、岗位的写入重建。
+
+写入事务内只记录需要递增的版本名称，事务提交后再用独立连接递增（INSERT ... ON DUPLICATE KEY UPDATE），
+版本行的行锁不会持有到业务事务结束，各写入事务之间不会因版本行互相等待。
+提交与递增之间的短暂窗口内读到的仍是旧版本号，缓存会在递增后失效；进程若恰好在两者之间退出，
+对应缓存要到下一次写入才失效。
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 全局数据版本名称
+DATA_VERSION_GLOBAL = 'global'
+
+# 部门数据版本名称（部门、部门层级闭包表写入时递增）
+DATA_VERSION_DEPARTMENT = 'department'
+
+# 专业、证书分类数据版本名称（对应分类表写入时递增）
+DATA_VERSION_MAJOR = 'major'
+DATA_VERSION_CERTIFICATE = 'certificate'
+
+# 岗位配置数据版本名称（岗位、能力权重、岗位要求写入时递增）
+DATA_VERSION_POSITION_CONFIG = 'position_config'
+
+# 干部基本信息数据版本名称（干部基本信息表写入时递增，进程内搜索索引以此校验）
+DATA_VERSION_CADRE = 'cadre'
+
+# 所有数据版本名称（迁移脚本中预置对应的版本行）
+DATA_VERSION_NAMES = (
+    DATA_VERSION_GLOBAL, DATA_VERSION_DEPARTMENT, DATA_VERSION_MAJOR,
+    DATA_VERSION_CERTIFICATE, DATA_VERSION_POSITION_CONFIG, DATA_VERSION_CADRE
+)
+
+# Session.info 中记录当前事务待递增数据版本名称的键
+_PENDING_VERSIONS_KEY = 'data_versions_pending'
+
+# 每个进程最多缓存的响应数量
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+# 每个进程最多缓存的查询总数数量
+COUNT_CACHE_MAX_ENTRIES = 512
+
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
+_events_registered = False
+
+
+def _tracked_tables():
+    """写入后需要递增数据版本的业务表"""
+    from app.models.cadre import CadreBasicInfo, CadreDynamicInfo, CadreTrait, CadreAbilityScore, CadreFlowFact
+    from app.models.position import PositionInfo, PositionAbilityWeight, PositionRequirement, PositionRisk
+    from app.models.match import MatchResult
+    from app.models.department import Department, DepartmentStat
+    from app.models.ai_analysis import AIAnalysis
+    return {
+        model.__table__.name for model in (
+            CadreBasicInfo, CadreDynamicInfo, CadreTrait, CadreAbilityScore,
+            PositionInfo, PositionAbilityWeight, PositionRequirement,
+            MatchResult, Department,
+            # 干部档案聚合接口包含 AI 分析结果
+            AIAnalysis,
+            # 缓存接口读取的预计算表（流动统计、岗位风险、部门统计），重建后同样需要失效
+            CadreFlowFact, PositionRisk, DepartmentStat
+        )
+    }
+
+
+def _scoped_tables():
+    """独立数据版本名称 -> 写入后需要递增该版本的表"""
+    from app.models.department import Department, DepartmentClosure
+    from app.models.major import Major
+    from app.models.certificate import Certificate
+    from app.models.position import PositionInfo, PositionAbilityWeight, PositionRequirement
+    from app.models.cadre import CadreBasicInfo
+    return {
+        DATA_VERSION_CADRE: {CadreBasicInfo.__table__.name},
+        DATA_VERSION_DEPARTMENT: {Department.__table__.name, DepartmentClosure.__table__.name},
+        DATA_VERSION_MAJOR: {Major.__table__.name},
+        DATA_VERSION_CERTIFICATE: {Certificate.__table__.name},
+        DATA_VERSION_POSITION_CONFIG: {
+            PositionInfo.__table__.name, PositionAbilityWeight.__table__.name, PositionRequirement.__table__.name
+        }
+    }
+
+
+def _versions_for_tables(table_names):
+    """写入的表对应需要递增的数据版本名称"""
+    names = set()
+    if table_names & _tracked_tables():
+        names.add(DATA_VERSION_GLOBAL)
+    for name, tables in _scoped_tables().items():
+        if table_names & tables:
+            names.add(name)
+    return names
+
+
+def get_data_version(name=DATA_VERSION_GLOBAL):
+    """读取数据版本号（不存在时为 0）"""
+    from app import db
+    from app.models.system import DataVersion
+    version = db.session.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar()
+    return version or 0
+
+
+def get_data_versions(*names):
+    """一次查询读取多个数据版本号，按参数顺序返回元组（不存在时为 0）"""
+    from app import db
+    from app.models.system import DataVersion
+    versions = dict(db.session.execute(
+        select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names))
+    ).all())
+    return tuple(versions.get(name) or 0 for name in names)
+
+
+def bump_data_version(connection, name=DATA_VERSION_GLOBAL):
+    """递增数据版本号（版本行不存在时插入，单条语句完成，并发首次写入不会主键冲突）"""
+    from app.models.system import DataVersion
+    table = DataVersion.__table__
+    now = datetime.now()
+    dialect = connection.dialect.name
+
+    if dialect == 'mysql':
+        statement = mysql_insert(table).values(name=name, version=1, update_time=now)
+        connection.execute(statement.on_duplicate_key_update(version=table.c.version + 1, update_time=now))
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(table).values(name=name, version=1, update_time=now)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={'version': table.c.version + 1, 'update_time': now}
+        ))
+    else:
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1, update_time=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1, update_time=now))
+
+
+def _mark_versions(session, names):
+    """记录当前事务提交后需要递增的数据版本名称"""
+    if names:
+        session.info.setdefault(_PENDING_VERSIONS_KEY, set()).update(names)
+
+
+def mark_data_version_changed(*names):
+    """
+    标记当前事务修改了缓存依赖的数据，提交后递增对应数据版本（默认全局版本）
+
+    Session 事件已能识别 ORM 写入和按表执行的 INSERT/UPDATE/DELETE；
+    bulk_insert_mappings 等不经过 Session 事件的写入需要调用方显式标记。
+    """
+    from app import db
+    _mark_versions(db.session, set(names) or {DATA_VERSION_GLOBAL})
+
+
+def _statement_table_name(orm_execute_state):
+    """批量写入语句的目标表名（ORM 实体语句取映射表，按 Table 执行的语句取语句目标表）"""
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        return mapper.persist_selectable.name
+    table = getattr(orm_execute_state.statement, 'table', None)
+    return getattr(table, 'name', None)
+
+
+def register_data_version_events():
+    """注册 Session 事件：业务表发生写入时记录待递增的数据版本，事务提交后再递增"""
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+
+    @event.listens_for(Session, 'after_flush')
+    def _mark_on_flush(session, flush_context):
+        table_names = {getattr(obj, '__tablename__', None) for obj in session.new}
+        table_names.update(getattr(obj, '__tablename__', None) for obj in session.deleted)
+        table_names.update(getattr(obj, '__tablename__', None) for obj in session.dirty if session.is_modified(obj))
+        _mark_versions(session, _versions_for_tables(table_names))
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _mark_on_bulk_execute(orm_execute_state):
+        # Query.update()/Query.delete() 及 session.execute(insert(...), [...]) 等批量语句不经过 flush
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+            return
+        table_name = _statement_table_name(orm_execute_state)
+        if table_name:
+            _mark_versions(orm_execute_state.session, _versions_for_tables({table_name}))
+
+    @event.listens_for(Session, 'after_commit')
+    def _bump_after_commit(session):
+        names = session.info.pop(_PENDING_VERSIONS_KEY, None)
+        if not names:
+            return
+        # 业务事务已提交，在独立连接上递增；失败只影响缓存失效时机，不能让已成功的提交报错
+        try:
+            with session.get_bind().begin() as connection:
+                for name in sorted(names):
+                    bump_data_version(connection, name)
+        except Exception:
+            logger.exception('递增数据版本失败: %s', sorted(names))
+
+    @event.listens_for(Session, 'after_transaction_end')
+    def _reset_after_transaction(session, transaction):
+        # 回滚或未提交就关闭的事务丢弃待递增的版本（提交时已在 after_commit 中取出）
+        if transaction.parent is None:
+            session.info.pop(_PENDING_VERSIONS_KEY, None)
+
+
+def get_cached_response(key):
+    """获取缓存的响应条目"""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is not None:
+            _response_cache.move_to_end(key)
+        return entry
+
+
+def set_cached_response(key, entry):
+    """写入响应缓存（超过容量时淘汰最久未使用的条目）"""
+    with _response_cache_lock:
+        _response_cache[key] = entry
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def clear_response_cache():
+    """清空当前进程的响应缓存"""
+    with _response_cache_lock:
+        _response_cache.clear()
+    with _count_cache_lock:
+        _count_cache.clear()
+
+
+def cached_query_count(query):
+    """
+    获取查询的总数，按 (SQL, 参数) 缓存，数据版本变化后失效
+
+    游标分页翻页时筛选条件不变，总数只在数据变化后重新统计一次。
+    """
+    compiled = query.statement.compile()
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    version = get_data_version()
+
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+        if entry is not None and entry[0] == version:
+            _count_cache.move_to_end(key)
+            return entry[1]
+
+    total = query.count()
+
+    with _count_cache_lock:
+        _count_cache[key] = (version, total)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.popitem(last=False)
+    return total
@@ -16,6 +16,11 @@ TRAIT_TYPE_DECISION = 'decision'  # 决策偏向
 REQUIREMENT_TYPE_MANDATORY = 'mandatory'  # 硬性要求
 REQUIREMENT_TYPE_SUGGESTED = 'suggested'  # 建议要求
 
+# 比较值为ID列表（JSON格式）的岗位要求指标类型
+INDICATOR_TYPE_MAJOR = 'major'  # 专业
+INDICATOR_TYPE_CERTIFICATE = 'certificate'  # 证书
+ID_LIST_INDICATOR_TYPES = [INDICATOR_TYPE_MAJOR, INDICATOR_TYPE_CERTIFICATE]
+
 # 匹配等级
 MATCH_LEVEL_EXCELLENT = 'excellent'  # 优质匹配
 MATCH_LEVEL_QUALIFIED = 'qualified'  # 合格匹配
@@ -26,6 +31,31 @@ CADRE_STATUS_ACTIVE = 1  # 在职
 CADRE_STATUS_RESIGNED = 2  # 离职
 CADRE_STATUS_RETIRED = 3  # 退休
 
+# 部门统计范围
+DEPARTMENT_STAT_SCOPE_SELF = 'self'  # 本部门直属干部
+DEPARTMENT_STAT_SCOPE_SUBTREE = 'subtree'  # 本部门及所有子部门干部
+
+# 干部序列化方案
+CADRE_PROFILE_LIST = 'list'  # 列表：仅列表展示字段，部门/岗位只含ID和名称
+CADRE_PROFILE_DETAIL = 'detail'  # 详情：完整字段，含部门/岗位完整信息
+CADRE_PROFILES = [CADRE_PROFILE_LIST, CADRE_PROFILE_DETAIL]
+
+# 干部档案聚合接口分区
+CADRE_SECTION_BASIC = 'basic'  # 基本信息
+CADRE_SECTION_TRAITS = 'traits'  # 特质
+CADRE_SECTION_ABILITIES = 'abilities'  # 能力评分
+CADRE_SECTION_DYNAMIC_INFO = 'dynamic_info'  # 动态信息
+CADRE_SECTION_AI_ANALYSIS = 'ai_analysis'  # 最新AI分析结果
+CADRE_SECTION_MATCH_RESULT = 'match_result'  # 当前岗位匹配结果
+CADRE_SECTIONS = [
+    CADRE_SECTION_BASIC, CADRE_SECTION_TRAITS, CADRE_SECTION_ABILITIES,
+    CADRE_SECTION_DYNAMIC_INFO, CADRE_SECTION_AI_ANALYSIS, CADRE_SECTION_MATCH_RESULT
+]
+
+# 干部来源类型
+FLOW_SOURCE_INTERNAL = 'internal'  # 内部培养
+FLOW_SOURCE_EXTERNAL = 'external'  # 外部引进
+
 # 岗位层级
 POSITION_LEVEL_JUNIOR = '1'  # 基层
 POSITION_LEVEL_MIDDLE = '2'  # 中层
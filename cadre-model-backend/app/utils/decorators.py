@@ -111,3 +111,55 @@ def log_operation(module, operation_type):
             return response
         return decorated_function
     return decorator
+
+
+def cached_response(f=None, version_name=None):
+    """
+    响应缓存装饰器（按接口和查询参数缓存，以数据版本号校验）
+
+    只缓存 200 响应，返回强 ETag；请求头 If-None-Match 与当前 ETag 一致时返回 304。
+    缓存键包含当天日期，年龄、任期等随日期变化的统计结果每天自动失效。
+
+    默认使用全局数据版本号；只依赖部门等独立版本数据的接口可传入 version_name，
+    如 @cached_response(version_name=DATA_VERSION_DEPARTMENT)，其他业务数据写入时缓存不失效。
+    """
+    if f is None:
+        return functools.partial(cached_response, version_name=version_name)
+
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        import hashlib
+        from datetime import date
+        from flask import make_response
+        from app.utils.cache import get_data_version, get_cached_response, set_cached_response, DATA_VERSION_GLOBAL
+
+        version = get_data_version(version_name or DATA_VERSION_GLOBAL)
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True))),
+            date.today().isoformat()
+        )
+
+        entry = get_cached_response(key)
+        if entry is None or entry['version'] != version:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            entry = {
+                'version': version,
+                'etag': hashlib.sha1(body).hexdigest(),
+                'body': body,
+                'mimetype': response.mimetype
+            }
+            set_cached_response(key, entry)
+
+        if request.if_none_match.contains(entry['etag']):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(entry['body'], status=200, mimetype=entry['mimetype'])
+        response.set_etag(entry['etag'])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return decorated_function
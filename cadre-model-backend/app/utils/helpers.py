@@ -1,4 +1,9 @@
-from flask import jsonify
+import base64
+import json
+from datetime import date
+from urllib.parse import quote
+from flask import jsonify, Response, stream_with_context
+from sqlalchemy import and_, or_, literal_column
 
 
 def success_response(data=None, message='操作成功', code=200):
@@ -34,8 +39,192 @@ def paginate_response(items, total, page, page_size, message='查询成功'):
     }, message)
 
 
+def export_response(chunks, filename, extension):
+    """
+    表格导出流式响应
+
+    Args:
+        chunks: 文件内容字节块迭代器
+        filename: 不含扩展名的文件名（可包含中文）
+        extension: 导出格式（xlsx/csv）
+    """
+    from app.utils.spreadsheet import EXPORT_MIMETYPES
+
+    full_name = f'{filename}.{extension}'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[extension],
+        headers={
+            'Content-Disposition': f"attachment; filename=export.{extension}; filename*=UTF-8''{quote(full_name)}"
+        }
+    )
+
+
+def years_ago(day: date, years: int) -> date:
+    """N 年前的同一天（2 月 29 日在非闰年取 2 月 28 日）"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
 def build_pagination_query(query, page, page_size):
     """构建分页查询"""
     total = query.count()
     items = query.offset((page - 1) * page_size).limit(page_size).all()
     return items, total
+
+
+def build_cursor_pagination_query(query, sort_column, id_column, page_size, cursor=None,
+                                  descending=False, cursor_key=None, count_query=None, nullable=False):
+    """
+    构建游标分页查询（build_pagination_query 的游标模式）
+
+    Args:
+        count_query: 统计总数使用的查询（查询包含联表投影时传入不含联表的查询），默认使用 query
+        其余参数同 build_keyset_query
+
+    Returns:
+        (items, next_cursor, total)，total 按数据版本缓存，翻页时不重复统计
+    """
+    from app.utils.cache import cached_query_count
+
+    total = cached_query_count(count_query if count_query is not None else query)
+    if cursor_key is None:
+        sort_key = sort_column.key
+        id_key = id_column.key
+        cursor_key = lambda item: [getattr(item, sort_key), getattr(item, id_key)]
+    items, next_cursor = build_keyset_query(
+        query, sort_column, id_column, page_size,
+        cursor=cursor, descending=descending, cursor_key=cursor_key, nullable=nullable
+    )
+    return items, next_cursor, total
+
+
+def encode_cursor(values):
+    """将游标值列表编码为不透明的字符串"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解码游标字符串，返回游标值列表"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError):
+        raise ValueError('无效的分页游标')
+    if not isinstance(values, list):
+        raise ValueError('无效的分页游标')
+    return values
+
+
+def exact_float_column(column):
+    """
+    浮点列的精确值表达式（加 0E0 转为双精度），作为游标值单独查询
+
+    MySQL FLOAT 为单精度，驱动读到的是按单精度缩短后的十进制值（如 85.37），
+    与列值做相等比较时列值按双精度展开（85.3700027...），两者不相等，同分记录在页边界会被跳过或重复；
+    游标中保存双精度展开后的值，定位条件仍直接比较原始列，可以使用列上的索引。
+    """
+    return column + literal_column('0E0')
+
+
+def _coerce_cursor_value(sort_column, value):
+    """游标中的日期时间以字符串保存，按排序列类型还原"""
+    from datetime import date, datetime
+
+    if isinstance(value, str):
+        try:
+            python_type = sort_column.type.python_type
+        except (AttributeError, NotImplementedError):
+            return value
+        try:
+            if python_type is datetime:
+                return datetime.fromisoformat(value)
+            if python_type is date:
+                return date.fromisoformat(value)
+        except ValueError:
+            raise ValueError('无效的分页游标')
+    return value
+
+
+def build_keyset_query(query, sort_column, id_column, page_size, cursor=None, descending=False, cursor_key=None,
+                       nullable=False):
+    """
+    构建游标（seek）分页查询
+
+    按 (排序键, id) 定位上一页最后一条记录之后的数据，避免 OFFSET 深翻页扫描。
+    排序列可能为空时传入 nullable=True：先按排序键分页非空记录，取完后再按 id 分页空值记录
+    （不论升降序空值都排在最后，游标中的排序值为 None），两段查询的条件和排序都可以使用索引。
+
+    Args:
+        query: 已添加筛选条件的查询
+        sort_column: 排序列（SQL 表达式）
+        id_column: 唯一ID列，作为排序键相同时的次序
+        page_size: 每页数量
+        cursor: 上一页返回的游标
+        descending: 是否降序
+        cursor_key: 从结果行提取 [排序值, id] 的函数
+        nullable: 排序列是否可能为空
+
+    Returns:
+        (items, next_cursor)，没有下一页时 next_cursor 为 None
+    """
+    last_value = last_id = None
+    values = decode_cursor(cursor)
+    if values is not None:
+        if len(values) != 2:
+            raise ValueError('无效的分页游标')
+        last_value, last_id = values
+        last_value = _coerce_cursor_value(sort_column, last_value)
+        if last_value is None and not nullable:
+            raise ValueError('无效的分页游标')
+
+    def after_id():
+        return id_column < last_id if descending else id_column > last_id
+
+    def order_by_id(q):
+        return q.order_by(id_column.desc() if descending else id_column.asc())
+
+    # 多取一条判断是否还有下一页
+    limit = page_size + 1
+    items = []
+
+    # 非空记录：游标停在空值区间时已取完
+    if values is None or last_value is not None:
+        value_query = query.filter(sort_column.isnot(None)) if nullable else query
+        if values is not None:
+            after_value = sort_column < last_value if descending else sort_column > last_value
+            value_query = value_query.filter(or_(after_value, and_(sort_column == last_value, after_id())))
+        value_query = value_query.order_by(sort_column.desc() if descending else sort_column.asc())
+        items = order_by_id(value_query).limit(limit).all()
+
+    # 空值记录：接在非空记录之后按 id 分页
+    if nullable and len(items) < limit:
+        null_query = query.filter(sort_column.is_(None))
+        if last_value is None and last_id is not None:
+            null_query = null_query.filter(after_id())
+        items += order_by_id(null_query).limit(limit - len(items)).all()
+
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor(cursor_key(items[-1]))
+
+    return items, next_cursor
+
+
+def cursor_response(items, next_cursor, page_size, total=None, message='查询成功'):
+    """游标分页响应"""
+    return success_response({
+        'items': items,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'page_size': page_size,
+        'total': total
+    }, message)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+请求级实体加载缓存
+
+同一请求内按主键重复读取的实体（干部、岗位等）只查询一次：结果缓存在 flask.g 上，
+请求结束时随应用上下文一起丢弃，不会跨请求复用。
+批量处理前可以先 prime 登记将要用到的主键，首次 load 时把同一模型已登记的主键合并为一次 IN 查询。
+
+缓存的是当前会话中的 ORM 对象，已删除、已脱离会话或提交后已过期的对象会在下次 load 时重新查询
+（与同一模型的其他待查主键合并为一次 IN 查询），读取到的仍是最新数据。
+"""
+from typing import Dict, Iterable, Optional
+from flask import g, has_app_context
+from sqlalchemy import inspect
+
+# flask.g 上保存加载器的属性名
+_LOADER_ATTR = '_request_loader'
+
+
+class RequestLoader:
+    """按模型、主键缓存实体并合并批量查询的加载器"""
+
+    def __init__(self):
+        # 模型 -> {主键: 实体}
+        self._cache = {}
+        # 模型 -> 已登记、尚未查询的主键
+        self._pending = {}
+
+    def prime(self, model, ids: Iterable[int]) -> None:
+        """登记将要加载的主键，在该模型下一次 load 时一并查询"""
+        cached = self._cache.get(model, {})
+        pending = self._pending.setdefault(model, set())
+        pending.update(pk for pk in ids if pk is not None and not (pk in cached and self._is_usable(cached[pk])))
+
+    def add(self, model, entities: Iterable) -> None:
+        """登记已经查询出的实体，之后按主键 load 时直接复用"""
+        cached = self._cache.setdefault(model, {})
+        pk_key = inspect(model).primary_key[0].key
+        for entity in entities:
+            cached[getattr(entity, pk_key)] = entity
+
+    def load(self, model, pk: int):
+        """按主键加载实体，不存在时返回 None"""
+        if pk is None:
+            return None
+        return self.load_many(model, [pk]).get(pk)
+
+    def load_many(self, model, ids: Iterable[int]) -> Dict[int, object]:
+        """
+        按主键批量加载实体
+
+        Returns:
+            {主键: 实体}，不存在的主键不出现在结果中
+        """
+        ids = [pk for pk in ids if pk is not None]
+        cached = self._cache.setdefault(model, {})
+
+        missing = {pk for pk in ids if pk not in cached or not self._is_usable(cached[pk])}
+        if missing:
+            for pk in missing:
+                cached.pop(pk, None)
+            missing |= self._pending.pop(model, set())
+            self._fetch(model, missing, cached)
+
+        return {pk: cached[pk] for pk in ids if pk in cached}
+
+    def forget(self, model, ids: Optional[Iterable[int]] = None) -> None:
+        """丢弃模型的缓存（ids 为空时丢弃该模型全部缓存）"""
+        if ids is None:
+            self._cache.pop(model, None)
+            self._pending.pop(model, None)
+            return
+        cached = self._cache.get(model, {})
+        for pk in ids:
+            cached.pop(pk, None)
+
+    @staticmethod
+    def _is_usable(entity) -> bool:
+        """缓存的实体是否仍可直接使用（列属性已过期的实体需要重新查询刷新）"""
+        state = inspect(entity)
+        if state.detached or state.deleted or state.was_deleted:
+            return False
+        return state.expired_attributes.isdisjoint(state.mapper.column_attrs.keys())
+
+    @staticmethod
+    def _fetch(model, ids, cached: Dict) -> None:
+        """一次 IN 查询加载主键（不存在的主键不缓存，之后新增的实体仍能加载到）"""
+        from app import db
+
+        pk_column = inspect(model).primary_key[0]
+        for entity in db.session.query(model).filter(pk_column.in_(ids)).all():
+            cached[getattr(entity, pk_column.key)] = entity
+
+
+def get_loader() -> RequestLoader:
+    """获取当前请求的加载器（没有应用上下文时返回一次性的加载器，不做缓存共享）"""
+    if not has_app_context():
+        return RequestLoader()
+    loader = getattr(g, _LOADER_ATTR, None)
+    if loader is None:
+        loader = RequestLoader()
+        setattr(g, _LOADER_ATTR, loader)
+    return loader
+
+
+def load(model, pk: int):
+    """按主键加载实体（请求内缓存），不存在时返回 None"""
+    return get_loader().load(model, pk)
+
+
+def load_many(model, ids: Iterable[int]) -> Dict[int, object]:
+    """按主键批量加载实体（请求内缓存），返回 {主键: 实体}"""
+    return get_loader().load_many(model, ids)
+
+
+def prime(model, ids: Iterable[int]) -> None:
+    """登记将要加载的主键，首次加载该模型时合并为一次查询"""
+    get_loader().prime(model, ids)
+
+
+def add(model, entities: Iterable) -> None:
+    """登记已经查询出的实体，同一请求内按主键加载时直接复用"""
+    get_loader().add(model, entities)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+表格文件逐行读写工具
+
+读取：xlsx 使用 openpyxl 只读模式流式读取，csv 使用标准库逐行读取，均不会把整个文件加载到内存。
+第一行为表头，表头通过 header_map 映射为字段名，未映射的列忽略。
+
+写出：csv 按批次编码后逐块输出；xlsx 使用 openpyxl 只写模式写入临时文件，完成后分块输出。
+"""
+import io
+import re
+import csv
+import tempfile
+from datetime import datetime, date
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+_DATE_PATTERN = re.compile(r'^(\d{4})[-/.年](\d{1,2})[-/.月](\d{1,2})日?$')
+
+
+def get_file_extension(filename: str) -> str:
+    """获取小写的文件扩展名"""
+    return filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+
+
+def _normalize_header(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def _normalize_cell(value):
+    """统一单元格值：去除空白，空字符串视为 None，日期转为 ISO 字符串，整数值浮点转为整数"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def normalize_date_text(value):
+    """把 2020/1/2、2020.1.2、2020年1月2日 等日期文本转换为 ISO 格式，无法识别时原样返回"""
+    if isinstance(value, str):
+        matched = _DATE_PATTERN.match(value)
+        if matched:
+            year, month, day = matched.groups()
+            return f'{int(year):04d}-{int(month):02d}-{int(day):02d}'
+    return value
+
+
+def _iter_raw_rows(file, extension: str) -> Iterator[Tuple]:
+    if extension == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    elif extension == 'csv':
+        stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            for row in csv.reader(stream):
+                yield row
+        finally:
+            stream.detach()
+    elif extension == 'xls':
+        raise ValueError('不支持 xls 格式，请另存为 xlsx 或 csv 后导入')
+    else:
+        raise ValueError(f'不支持的文件格式: {extension}')
+
+
+def iter_spreadsheet_rows(file, filename: str, header_map: Dict[str, str]) -> Iterator[Tuple[int, Dict]]:
+    """
+    逐行读取表格文件
+
+    Args:
+        file: 二进制文件对象（需支持 seek，上传文件的 stream 即可）
+        filename: 文件名，用于判断格式
+        header_map: 表头到字段名的映射（字段名本身也可直接作为表头）
+
+    Yields:
+        (行号, {字段名: 值})，行号与表格中显示的一致（表头为第 1 行），空行跳过
+
+    Raises:
+        ValueError: 文件格式不支持或表头中没有可识别的列
+    """
+    rows = _iter_raw_rows(file, get_file_extension(filename))
+    header = next(rows, None)
+    if header is None:
+        raise ValueError('文件为空')
+
+    lookup = dict(header_map)
+    lookup.update({field: field for field in header_map.values()})
+    columns = [(index, lookup[_normalize_header(name)]) for index, name in enumerate(header)
+               if _normalize_header(name) in lookup]
+    if not columns:
+        raise ValueError('未识别到有效的表头，请使用导入模板')
+
+    for row_number, row in enumerate(rows, start=2):
+        record = {}
+        for index, field in columns:
+            value = _normalize_cell(row[index]) if index < len(row) else None
+            if value is not None:
+                record[field] = value
+        if record:
+            yield row_number, record
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """按固定大小分批"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# 导出列定义：(表头, 字段名或取值函数)
+ExportColumn = Tuple[str, Union[str, Callable[[Dict], object]]]
+
+EXPORT_FORMATS = ('xlsx', 'csv')
+
+EXPORT_MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    # Werkzeug 会为 text/* 类型自动追加 charset=utf-8
+    'csv': 'text/csv'
+}
+
+# csv 每批输出的行数、xlsx 临时文件每次读取的字节数
+EXPORT_CSV_BATCH_ROWS = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_value(record: Dict, getter):
+    value = getter(record) if callable(getter) else record.get(getter)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _iter_export_rows(columns: Sequence[ExportColumn], records: Iterable[Dict]) -> Iterator[List]:
+    for record in records:
+        yield [_export_value(record, getter) for _, getter in columns]
+
+
+def _iter_csv_chunks(columns: Sequence[ExportColumn], records: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in columns])
+    # 带 BOM，Excel 打开时能正确识别中文
+    yield buffer.getvalue().encode('utf-8-sig')
+
+    for rows in chunked(_iter_export_rows(columns, records), EXPORT_CSV_BATCH_ROWS):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _iter_xlsx_chunks(columns: Sequence[ExportColumn], records: Iterable[Dict], sheet_title: str) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append([header for header, _ in columns])
+    for row in _iter_export_rows(columns, records):
+        sheet.append(row)
+
+    # xlsx 是 zip 包，只能在全部写完后输出；只写模式下行数据缓存在临时文件中，内存占用不随行数增长
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(EXPORT_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_spreadsheet_export(columns: Sequence[ExportColumn], records: Iterable[Dict], extension: str,
+                            sheet_title: str = 'Sheet1') -> Iterator[bytes]:
+    """
+    把记录流式写出为表格文件
+
+    Args:
+        columns: 导出列定义，(表头, 字段名或取值函数)
+        records: 记录迭代器（建议使用 yield_per 查询，避免一次性加载）
+        extension: 导出格式（xlsx/csv）
+        sheet_title: xlsx 工作表名称
+
+    Yields:
+        文件内容字节块
+
+    Raises:
+        ValueError: 导出格式不支持
+    """
+    if extension == 'csv':
+        return _iter_csv_chunks(columns, records)
+    if extension == 'xlsx':
+        return _iter_xlsx_chunks(columns, records, sheet_title)
+    raise ValueError(f'不支持的导出格式: {extension}')
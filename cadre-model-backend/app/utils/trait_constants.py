@@ -78,20 +78,18 @@ def get_trait_values(trait_type: str) -> list:
     """根据特质类型获取对应的特质值列表"""
     return list(TRAITS_CONFIG.get(trait_type, {}).get('values', {}).keys())
 
+# (特质类型, 特质值) -> 特质值描述，特质类型同时支持英文键和中文名称，模块加载时构建一次
+TRAIT_VALUE_DESCRIPTION_MAP = {
+    (trait_type, value): description
+    for key, config in TRAITS_CONFIG.items()
+    for trait_type in (key, config['name'])
+    for value, description in config['values'].items()
+}
+
 # 获取特质值的描述
 def get_trait_value_description(trait_type: str, trait_value: str) -> str:
-    """获取特质值的描述"""
-    # 首先尝试直接用 trait_type 作为键查找（英文代码）
-    result = TRAITS_CONFIG.get(trait_type, {}).get('values', {}).get(trait_value, '')
-    if result:
-        return result
-
-    # 如果找不到，尝试将中文类型名转换为英文键
-    for key, config in TRAITS_CONFIG.items():
-        if config['name'] == trait_type:
-            return config.get('values', {}).get(trait_value, '')
-
-    return ''
+    """获取特质值的描述（特质类型可以是英文键或中文名称）"""
+    return TRAIT_VALUE_DESCRIPTION_MAP.get((trait_type, trait_value), '')
 
 # 获取特质值的显示文本（包含描述）
 def get_trait_value_display(trait_type: str, trait_value: str) -> str:
@@ -39,6 +39,15 @@ class Config:
     MATCH_LEVEL_EXCELLENT = 80  # 优质匹配阈值
     MATCH_LEVEL_QUALIFIED = 60  # 合格匹配阈值
 
+    # 大屏 SSE 推送配置
+    DASHBOARD_PUSH_POLL_INTERVAL = 2  # 数据版本轮询间隔（秒）
+    DASHBOARD_PUSH_HEARTBEAT_INTERVAL = 15  # 心跳间隔（秒）
+    # 单个连接最长保持时间（秒），超时后客户端自动重连；每个连接在此期间占用一个工作线程，部署时按大屏数量预留线程
+    DASHBOARD_PUSH_MAX_DURATION = 300
+    # 每个 worker 进程同时保持的推送连接上限，超出时返回 503 由客户端稍后重连，避免长连接占满工作线程
+    DASHBOARD_PUSH_MAX_CONNECTIONS = 20
+    DASHBOARD_SNAPSHOT_DIR = os.path.join(BASE_DIR, 'data', 'dashboard')  # 多进程共享的大屏快照目录
+
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
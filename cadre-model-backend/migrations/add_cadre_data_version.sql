@@ -0,0 +1,15 @@
+-- ============================================
+-- 数据版本表 - 预置干部基本信息数据版本行
+-- 执行日期: 2026-10-19
+-- 说明: 干部基本信息表写入时递增 cadre 版本号，进程内搜索索引按干部、部门、岗位配置版本校验，
+--       动态信息、匹配结果等其他业务数据写入不再触发索引重建（需先执行 add_data_version_table.sql）
+-- ============================================
+
+USE cadre_model;
+
+-- 应用首次写入干部基本信息时也会补齐缺少的版本行
+INSERT IGNORE INTO data_version (name, version, update_time) VALUES
+    ('cadre', 1, NOW());
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DELETE FROM data_version WHERE name = 'cadre';
@@ -0,0 +1,26 @@
+-- ============================================
+-- 干部流动事实表 - 新建 cadre_flow_fact 表
+-- 执行日期: 2026-10-19
+-- 说明: 预计算干部来源类型（内部培养/外部引进）和流动年份，
+--       供来源与流动统计、流动干部详情直接按索引查询
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS cadre_flow_fact (
+    cadre_id INT NOT NULL COMMENT '干部ID',
+    source_type VARCHAR(20) NOT NULL COMMENT '来源类型：internal-内部培养，external-外部引进',
+    flow_year INT NULL COMMENT '流动年份：内部培养取首次职务变更任期开始年份，外部引进取入职年份',
+    first_appointment_date DATE NULL COMMENT '首次职务变更任期开始日期',
+    appointment_count INT NOT NULL DEFAULT 0 COMMENT '职务变更记录数',
+    update_time DATETIME NULL COMMENT '更新时间',
+    PRIMARY KEY (cadre_id),
+    INDEX idx_flow_year_source (flow_year, source_type),
+    INDEX idx_source_type (source_type),
+    CONSTRAINT fk_cadre_flow_fact_cadre FOREIGN KEY (cadre_id) REFERENCES cadre_basic_info (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='干部流动事实表-预计算干部来源类型和流动年份，随职务变更记录维护';
+
+-- 建表后调用接口回填历史数据：POST /api/match/flow-facts/rebuild
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE cadre_flow_fact;
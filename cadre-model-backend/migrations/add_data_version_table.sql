@@ -0,0 +1,27 @@
+-- ============================================
+-- 数据版本表 - 新建 data_version 表
+-- 执行日期: 2026-10-19
+-- 说明: 记录业务数据的全局版本号，写入干部、岗位、动态信息、匹配结果时递增，
+--       大屏与统计接口的响应缓存和 ETag 以此校验
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(50) NOT NULL COMMENT '版本名称',
+    version BIGINT NOT NULL DEFAULT 0 COMMENT '版本号',
+    update_time DATETIME NULL COMMENT '更新时间',
+    PRIMARY KEY (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='数据版本表-记录业务数据的全局版本号，写入干部、岗位、动态信息、匹配结果时递增，用于校验响应缓存';
+
+-- 预置所有数据版本行：global-全局，department-部门，major-专业分类，certificate-证书分类，position_config-岗位配置
+-- 应用在事务提交后以 INSERT ... ON DUPLICATE KEY UPDATE 递增版本号，缺少的版本行也会在首次写入时补齐
+INSERT IGNORE INTO data_version (name, version, update_time) VALUES
+    ('global', 1, NOW()),
+    ('department', 1, NOW()),
+    ('major', 1, NOW()),
+    ('certificate', 1, NOW()),
+    ('position_config', 1, NOW());
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE data_version;
@@ -0,0 +1,32 @@
+-- ============================================
+-- 部门层级闭包表 - 新建 department_closure 表
+-- 执行日期: 2026-10-19
+-- 说明: 存储每个部门与其所有祖先部门（含自身）的关系，
+--       部门子树筛选改为一次索引联表查询，随部门新增、调整上级、删除维护
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS department_closure (
+    ancestor_id INT NOT NULL COMMENT '祖先部门ID',
+    descendant_id INT NOT NULL COMMENT '后代部门ID',
+    depth INT NOT NULL COMMENT '层级距离：0-自身，1-直接子部门，依此类推',
+    PRIMARY KEY (ancestor_id, descendant_id),
+    INDEX idx_descendant_depth (descendant_id, depth),
+    CONSTRAINT fk_department_closure_ancestor FOREIGN KEY (ancestor_id) REFERENCES department (id) ON DELETE CASCADE,
+    CONSTRAINT fk_department_closure_descendant FOREIGN KEY (descendant_id) REFERENCES department (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='部门层级闭包表-存储每个部门与其所有祖先部门的关系，用于子树和祖先查询';
+
+-- 回填历史数据（也可调用接口：POST /api/departments/closure/rebuild）
+INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM department
+    UNION ALL
+    SELECT tree.ancestor_id, d.id, tree.depth + 1
+    FROM tree
+    JOIN department d ON d.parent_id = tree.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM tree;
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE department_closure;
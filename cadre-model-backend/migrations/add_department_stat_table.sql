@@ -0,0 +1,30 @@
+-- ============================================
+-- 部门统计汇总表 - 新建 department_stat 表
+-- 执行日期: 2026-10-19
+-- 说明: 按（干部状态, 管理层级）存储每个部门直属（self）和含子部门（subtree）的人数、
+--       当前岗位匹配得分合计及匹配等级人数，随干部变更、匹配结果变化和部门调整增量维护
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS department_stat (
+    department_id INT NOT NULL COMMENT '部门ID',
+    scope VARCHAR(10) NOT NULL COMMENT '统计范围：self-本部门直属，subtree-含所有子部门',
+    status INT NOT NULL COMMENT '干部状态：1-在职，2-离职，3-退休',
+    management_level VARCHAR(20) NOT NULL DEFAULT '' COMMENT '管理层级（未填写为空字符串）',
+    headcount INT NOT NULL DEFAULT 0 COMMENT '干部人数',
+    matched_count INT NOT NULL DEFAULT 0 COMMENT '有当前岗位匹配结果的人数',
+    score_sum DOUBLE NOT NULL DEFAULT 0 COMMENT '当前岗位匹配得分合计',
+    excellent_count INT NOT NULL DEFAULT 0 COMMENT '优质匹配人数',
+    qualified_count INT NOT NULL DEFAULT 0 COMMENT '合格匹配人数',
+    unqualified_count INT NOT NULL DEFAULT 0 COMMENT '不合格匹配人数',
+    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (department_id, scope, status, management_level),
+    CONSTRAINT fk_department_stat_department FOREIGN KEY (department_id) REFERENCES department (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='部门统计汇总表-按干部状态和管理层级汇总部门（含子部门）人数及当前岗位匹配情况';
+
+-- 回填历史数据请调用接口：POST /api/departments/stats/rebuild
+-- （依赖 department_closure 表，需先执行 add_department_closure_table.sql）
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE department_stat;
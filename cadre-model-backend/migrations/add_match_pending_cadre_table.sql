@@ -0,0 +1,20 @@
+-- ============================================
+-- 待重新匹配干部表 - 新建 match_pending_cadre 表
+-- 执行日期: 2026-10-19
+-- 说明: 批量导入能力评分、特质、动态信息后一次性标记受影响的干部，
+--       由 POST /api/match/rematch-pending 统一重算当前岗位匹配度
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS match_pending_cadre (
+    cadre_id INT NOT NULL COMMENT '干部ID',
+    reason VARCHAR(50) NULL COMMENT '标记原因：abilities-能力评分，traits-特质，dynamic_infos-动态信息',
+    mark_time DATETIME NULL COMMENT '标记时间',
+    PRIMARY KEY (cadre_id),
+    INDEX idx_mark_time (mark_time),
+    CONSTRAINT fk_match_pending_cadre_cadre FOREIGN KEY (cadre_id) REFERENCES cadre_basic_info (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='待重新匹配干部表-批量导入能力评分、特质、动态信息后标记需要重算当前岗位匹配度的干部';
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE match_pending_cadre;
@@ -0,0 +1,14 @@
+-- ============================================
+-- 匹配结果表 - 添加岗位+得分联合索引
+-- 执行日期: 2026-10-19
+-- 说明: 按岗位筛选的匹配结果游标分页按 (final_score, id) 降序定位，
+--       联合索引使筛选和排序都走索引（InnoDB 二级索引隐含主键 id）
+-- ============================================
+
+USE cadre_model;
+
+ALTER TABLE match_result
+ADD INDEX idx_position_score (position_id, final_score);
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- ALTER TABLE match_result DROP INDEX idx_position_score;
@@ -0,0 +1,13 @@
+-- ============================================
+-- 岗位要求配置表 - 添加指标类型索引
+-- 执行日期: 2026-10-19
+-- 说明: 删除专业、证书前按指标类型一次索引查询引用了这些ID的岗位要求
+-- ============================================
+
+USE cadre_model;
+
+ALTER TABLE position_requirement
+ADD INDEX idx_indicator_type (indicator_type);
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- ALTER TABLE position_requirement DROP INDEX idx_indicator_type;
@@ -0,0 +1,32 @@
+-- ============================================
+-- 岗位要求比较值明细表 - 新建 position_requirement_value 表
+-- 执行日期: 2026-10-19
+-- 说明: 把专业、证书要求 compare_value 中 JSON 格式的ID列表拆分为逐条记录，
+--       按 (指标类型, ID) 建索引，按专业或证书反查岗位时无需解析全部要求；
+--       保存岗位要求时同步维护
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS position_requirement_value (
+    requirement_id INT NOT NULL COMMENT '岗位要求ID',
+    value_id INT NOT NULL COMMENT '专业或证书ID',
+    indicator_type VARCHAR(50) NOT NULL COMMENT '指标类型：major-专业，certificate-证书',
+    PRIMARY KEY (requirement_id, value_id),
+    INDEX idx_indicator_value (indicator_type, value_id),
+    CONSTRAINT fk_position_requirement_value_requirement FOREIGN KEY (requirement_id) REFERENCES position_requirement (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='岗位要求比较值明细表-把专业、证书要求中JSON格式的ID列表拆分为逐条记录，用于按专业或证书反查岗位';
+
+-- 回填历史数据（MySQL 8.0 JSON_TABLE）
+INSERT IGNORE INTO position_requirement_value (requirement_id, value_id, indicator_type)
+SELECT r.id, j.value_id, r.indicator_type
+FROM position_requirement r
+JOIN JSON_TABLE(
+    IF(JSON_VALID(r.compare_value), r.compare_value, '[]'),
+    '$[*]' COLUMNS (value_id INT PATH '$' NULL ON ERROR)
+) j
+WHERE r.indicator_type IN ('major', 'certificate')
+  AND j.value_id IS NOT NULL;
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE position_requirement_value;
@@ -0,0 +1,40 @@
+-- ============================================
+-- 岗位风险表 - 新建 position_risk 表
+-- 执行日期: 2026-10-19
+-- 说明: 预计算每个岗位的风险因子及其输入数据（任职者、最新匹配得分、
+--       最近培训时间、部门在职人数），在相关数据变化时按岗位重算
+-- ============================================
+
+USE cadre_model;
+
+CREATE TABLE IF NOT EXISTS position_risk (
+    position_id INT NOT NULL COMMENT '岗位ID',
+    incumbent_id INT NULL COMMENT '任职者干部ID（空缺为NULL）',
+    incumbent_name VARCHAR(100) NULL COMMENT '任职者姓名',
+    birth_date DATE NULL COMMENT '任职者出生日期',
+    entry_date DATE NULL COMMENT '任职者入职日期',
+    department_id INT NULL COMMENT '任职者部门ID',
+    department_headcount INT NULL DEFAULT 0 COMMENT '任职者部门在职人数',
+    match_score FLOAT NULL COMMENT '任职者当前岗位最新匹配得分',
+    last_training_time DATETIME NULL COMMENT '任职者最近一次培训记录时间',
+    low_match TINYINT(1) NULL DEFAULT 0 COMMENT '匹配度低：匹配度 < 70',
+    age_risk TINYINT(1) NULL DEFAULT 0 COMMENT '年龄风险：年龄 > 55',
+    single_point TINYINT(1) NULL DEFAULT 0 COMMENT '单点任职：部门人数 <= 1 或岗位空缺',
+    no_training TINYINT(1) NULL DEFAULT 0 COMMENT '培养缺失：3年无培养记录',
+    long_term TINYINT(1) NULL DEFAULT 0 COMMENT '任期过长：任期 > 6年',
+    risk_count INT NULL DEFAULT 0 COMMENT '风险因子数量',
+    risk_level VARCHAR(20) NULL COMMENT '风险等级：high-高，medium-中，low-低',
+    calc_date DATE NULL COMMENT '风险因子计算日期（年龄、任期、培训窗口随日期变化）',
+    update_time DATETIME NULL COMMENT '更新时间',
+    PRIMARY KEY (position_id),
+    INDEX idx_risk_level_count (risk_level, risk_count),
+    INDEX idx_incumbent (incumbent_id),
+    INDEX idx_department (department_id),
+    CONSTRAINT fk_position_risk_position FOREIGN KEY (position_id) REFERENCES position_info (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='岗位风险表-预计算岗位风险因子及其输入数据，在任职者、匹配结果、培训记录或部门人数变化时重算';
+
+-- 回填历史数据请调用接口：POST /api/match/position-risk/rebuild
+-- （回填前 /api/match/position-risk 对缺少记录的岗位临时计算，不写入数据库）
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- DROP TABLE position_risk;
@@ -0,0 +1,22 @@
+-- ============================================
+-- 搜索索引 - 添加 ngram 全文索引
+-- 执行日期: 2026-10-19
+-- 说明: 干部姓名、部门名称、岗位名称添加 ngram 分词（默认 ngram_token_size=2）的
+--       FULLTEXT 索引，替代 LIKE '%关键词%' 全表扫描；工号前缀匹配使用已有唯一索引
+-- ============================================
+
+USE cadre_model;
+
+ALTER TABLE cadre_basic_info
+ADD FULLTEXT INDEX ft_cadre_name (name) WITH PARSER ngram;
+
+ALTER TABLE department
+ADD FULLTEXT INDEX ft_department_name (name) WITH PARSER ngram;
+
+ALTER TABLE position_info
+ADD FULLTEXT INDEX ft_position_name (position_name) WITH PARSER ngram;
+
+-- 回滚脚本（如需回滚，请执行以下语句）
+-- ALTER TABLE cadre_basic_info DROP INDEX ft_cadre_name;
+-- ALTER TABLE department DROP INDEX ft_department_name;
+-- ALTER TABLE position_info DROP INDEX ft_position_name;
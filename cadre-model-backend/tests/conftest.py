@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""测试公共夹具：每个测试使用独立的内存数据库和空的进程内缓存"""
+import jwt
+import pytest
+from app import create_app, db
+from app.utils.cache import clear_response_cache
+from app.services.department_service import DepartmentService
+from app.services.search_service import SearchService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        # 进程内缓存按数据版本校验，新建的数据库版本号从 0 开始，需清空上一个测试留下的缓存
+        clear_response_cache()
+        DepartmentService._graph = None
+        SearchService._indexes = {}
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    token = jwt.encode(
+        {'user_id': 1, 'username': 'admin', 'is_admin': 1},
+        app.config['JWT_SECRET_KEY'],
+        algorithm='HS256'
+    )
+    return {'Authorization': f'Bearer {token}'}
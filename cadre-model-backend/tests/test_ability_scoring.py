@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""能力基础得分：按维度编号汇总的计算结果与按维度名称分组的原实现一致"""
+from collections import defaultdict
+from types import SimpleNamespace
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo, CadreAbilityScore
+from app.models.position import PositionInfo, PositionAbilityWeight
+from app.services.match_service import MatchService
+
+
+def _reference(cadre_scores, position_weights):
+    """原实现：以维度名称为键分组，详情字典按维度名称覆盖"""
+    dimension_scores = defaultdict(list)
+    for score in cadre_scores:
+        dimension_scores[score.ability_dimension].append(score.score)
+
+    base_score = 0.0
+    details = {}
+    for weight in position_weights:
+        scores = dimension_scores.get(weight.ability_dimension, [])
+        if len(scores) == 0:
+            continue
+        percentage_score = (sum(scores) / (len(scores) * 5)) * 100
+        base_score += percentage_score * (weight.weight / 100)
+        details[weight.ability_dimension] = {
+            'ability_dimension': weight.ability_dimension,
+            'weight': weight.weight,
+            'scores': scores,
+            'total_score': sum(scores),
+            'max_score': len(scores) * 5,
+            'percentage_score': round(percentage_score, 2),
+            'weighted_contribution': round(percentage_score * (weight.weight / 100), 2)
+        }
+    return round(base_score, 2), list(details.values())
+
+
+def _scores(*items):
+    return [SimpleNamespace(ability_dimension=dimension, ability_tag=tag, score=score)
+            for dimension, tag, score in items]
+
+
+def _weights(*items):
+    return [SimpleNamespace(ability_dimension=dimension, weight=weight) for dimension, weight in items]
+
+
+CASES = {
+    'defined_dimensions': (
+        _scores(('领导力', '战略思维', 4), ('领导力', '团队建设', 3.5), ('执行力', '任务完成率', 5)),
+        _weights(('执行力', 40), ('领导力', 60)),
+    ),
+    'duplicate_weight_rows': (
+        _scores(('领导力', '战略思维', 4), ('执行力', '任务完成率', 2)),
+        _weights(('领导力', 30), ('执行力', 20), ('领导力', 50)),
+    ),
+    'undefined_dimensions': (
+        _scores(('新增维度', '标签A', 3), ('领导力', '战略思维', 5)),
+        _weights(('领导力', 50), ('新增维度', 30), ('未评分维度', 20)),
+    ),
+    'no_scores': (
+        [],
+        _weights(('领导力', 100)),
+    ),
+}
+
+
+@pytest.mark.parametrize('cadre_scores, position_weights', CASES.values(), ids=CASES.keys())
+def test_vectors_match_reference(cadre_scores, position_weights):
+    dimension_scores = MatchService._aggregate_dimension_scores(cadre_scores)
+    weight_vector = MatchService._build_weight_vector(position_weights)
+
+    assert all(isinstance(dimension_id, int) for dimension_id, _ in weight_vector)
+    assert (
+        MatchService._calculate_base_score(dimension_scores, weight_vector),
+        MatchService._build_base_score_details(dimension_scores, weight_vector)
+    ) == _reference(cadre_scores, position_weights)
+
+
+def test_duplicate_dimension_keeps_first_position_and_last_weight():
+    cadre_scores, position_weights = CASES['duplicate_weight_rows']
+    details = MatchService._build_base_score_details(
+        MatchService._aggregate_dimension_scores(cadre_scores),
+        MatchService._build_weight_vector(position_weights)
+    )
+
+    assert [(item['ability_dimension'], item['weight']) for item in details] == [('领导力', 50), ('执行力', 20)]
+
+
+def test_calculate_matches_reference(app):
+    position = PositionInfo(position_code='P1', position_name='岗位1', status=1)
+    cadre = CadreBasicInfo(employee_no='E001', name='张三', status=1)
+    db.session.add_all([position, cadre])
+    db.session.flush()
+    cadre_scores, position_weights = CASES['undefined_dimensions']
+    db.session.add_all(CadreAbilityScore(cadre_id=cadre.id, ability_dimension=item.ability_dimension,
+                                         ability_tag=item.ability_tag, score=item.score) for item in cadre_scores)
+    db.session.add_all(PositionAbilityWeight(position_id=position.id, ability_dimension=item.ability_dimension,
+                                             weight=item.weight) for item in position_weights)
+    db.session.commit()
+
+    result = MatchService.calculate(cadre.id, position.id, save_to_db=False)
+    base_score, details = _reference(
+        MatchService._get_cadre_ability_scores(cadre.id), MatchService._get_position_weights(position.id)
+    )
+
+    assert result.base_score == base_score
+    detail = result.to_dict()['match_detail']
+    assert detail['base_score'] == base_score
+    assert detail['base_score_details'] == details
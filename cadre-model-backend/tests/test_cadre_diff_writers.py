@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""干部能力评分和特质的比对写入：只写入有变化的记录，并返回发生变化的维度或特质类型"""
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo, CadreAbilityScore, CadreTrait
+from app.services.cadre_service import CadreService
+from app.utils.trait_constants import TRAIT_VALUE_DESCRIPTION_MAP
+
+
+@pytest.fixture
+def cadre_id(app):
+    cadre = CadreBasicInfo(employee_no='E001', name='张三')
+    db.session.add(cadre)
+    db.session.commit()
+    return cadre.id
+
+
+def _abilities(cadre_id):
+    return {row.ability_tag: row for row in CadreAbilityScore.query.filter_by(cadre_id=cadre_id).all()}
+
+
+def _traits(cadre_id):
+    return {row.trait_type: row for row in CadreTrait.query.filter_by(cadre_id=cadre_id).all()}
+
+
+ABILITIES = [
+    {'ability_dimension': '领导力', 'ability_tag': '战略思维', 'score': 4},
+    {'ability_dimension': '领导力', 'ability_tag': '团队建设', 'score': 3},
+    {'ability_dimension': '执行力', 'ability_tag': '任务完成率', 'score': 5},
+]
+
+
+def test_ability_insert_returns_all_dimensions(cadre_id):
+    changed = CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'admin')
+
+    assert changed == ['执行力', '领导力']
+    rows = _abilities(cadre_id)
+    assert set(rows) == {'战略思维', '团队建设', '任务完成率'}
+    assert rows['战略思维'].assessor == 'admin'
+    assert rows['战略思维'].assessment_date is not None
+
+
+def test_ability_unchanged_submission_writes_nothing(cadre_id):
+    CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'admin')
+    before = {tag: (row.id, row.update_time) for tag, row in _abilities(cadre_id).items()}
+
+    assert CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'other') == []
+    db.session.expire_all()
+    assert {tag: (row.id, row.update_time) for tag, row in _abilities(cadre_id).items()} == before
+
+
+def test_ability_diff_updates_in_place_and_deletes_dropped_tags(cadre_id):
+    CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'admin')
+    before = _abilities(cadre_id)
+    kept_id, changed_id = before['战略思维'].id, before['团队建设'].id
+
+    changed = CadreService.update_cadre_abilities(cadre_id, [
+        {'ability_dimension': '领导力', 'ability_tag': '战略思维', 'score': 4},
+        {'ability_dimension': '领导力', 'ability_tag': '团队建设', 'score': 5},
+    ], 'admin')
+
+    # 只有团队建设评分变化、任务完成率被删除
+    assert changed == ['执行力', '领导力']
+    db.session.expire_all()
+    rows = _abilities(cadre_id)
+    assert set(rows) == {'战略思维', '团队建设'}
+    assert rows['战略思维'].id == kept_id
+    assert rows['团队建设'].id == changed_id
+    assert rows['团队建设'].score == 5
+
+
+def test_ability_comment_only_change_keeps_dimensions_clean(cadre_id):
+    CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'admin')
+
+    changed = CadreService.update_cadre_abilities(
+        cadre_id, [dict(ABILITIES[0], comment='表现突出')] + ABILITIES[1:], 'admin'
+    )
+
+    # 评估意见不影响评分，不需要重算匹配
+    assert changed == []
+    db.session.expire_all()
+    assert _abilities(cadre_id)['战略思维'].comment == '表现突出'
+
+
+def test_ability_dimension_move_reports_both_dimensions(cadre_id):
+    CadreService.update_cadre_abilities(cadre_id, ABILITIES, 'admin')
+
+    changed = CadreService.update_cadre_abilities(
+        cadre_id, [dict(ABILITIES[0], ability_dimension='执行力')] + ABILITIES[1:], 'admin'
+    )
+
+    assert changed == ['执行力', '领导力']
+
+
+def test_trait_insert_fills_description_from_map(cadre_id):
+    changed = CadreService.update_cadre_traits(cadre_id, [
+        {'trait_type': '性格特质', 'trait_value': '沉稳型'},
+        {'trait_type': 'personality', 'trait_value': '积极型'},
+    ], 'admin')
+
+    assert sorted(changed) == ['personality', '性格特质']
+    rows = _traits(cadre_id)
+    assert rows['性格特质'].trait_desc == TRAIT_VALUE_DESCRIPTION_MAP[('性格特质', '沉稳型')]
+    assert rows['personality'].trait_desc == TRAIT_VALUE_DESCRIPTION_MAP[('personality', '积极型')]
+
+
+def test_trait_diff_only_touches_changed_types(cadre_id):
+    CadreService.update_cadre_traits(cadre_id, [
+        {'trait_type': '性格特质', 'trait_value': '沉稳型'},
+        {'trait_type': '管理风格', 'trait_value': '其他', 'trait_desc': '自定义'},
+    ], 'admin')
+    before = {trait_type: (row.id, row.update_time) for trait_type, row in _traits(cadre_id).items()}
+
+    assert CadreService.update_cadre_traits(cadre_id, [
+        {'trait_type': '性格特质', 'trait_value': '沉稳型'},
+        {'trait_type': '管理风格', 'trait_value': '其他', 'trait_desc': '自定义'},
+    ], 'admin') == []
+
+    changed = CadreService.update_cadre_traits(cadre_id, [
+        {'trait_type': '性格特质', 'trait_value': '坚韧型'},
+    ], 'admin')
+
+    assert sorted(changed) == ['性格特质', '管理风格']
+    db.session.expire_all()
+    rows = _traits(cadre_id)
+    assert set(rows) == {'性格特质'}
+    assert rows['性格特质'].id == before['性格特质'][0]
+    assert rows['性格特质'].trait_value == '坚韧型'
+
+
+def test_trait_batch_rejects_missing_cadre(cadre_id):
+    with pytest.raises(ValueError):
+        CadreService.batch_update_cadre_traits({
+            cadre_id: [{'trait_type': '性格特质', 'trait_value': '沉稳型'}],
+            cadre_id + 100: [{'trait_type': '性格特质', 'trait_value': '沉稳型'}],
+        })
+    db.session.rollback()
+    assert _traits(cadre_id) == {}
+
+
+def test_trait_batch_endpoint(client, auth_headers, cadre_id):
+    other = CadreBasicInfo(employee_no='E002', name='李四')
+    db.session.add(other)
+    db.session.commit()
+    CadreService.update_cadre_traits(other.id, [{'trait_type': '性格特质', 'trait_value': '沉稳型'}])
+
+    response = client.put('/api/cadres/traits/batch', json={'items': [
+        {'cadre_id': cadre_id, 'traits': [{'trait_type': '性格特质', 'trait_value': '细致型'}]},
+        {'cadre_id': other.id, 'traits': [{'trait_type': '性格特质', 'trait_value': '沉稳型'}]},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['changed'] == [{'cadre_id': cadre_id, 'changed_types': ['性格特质']}]
+
+
+def test_trait_batch_endpoint_validates_payload(client, auth_headers, cadre_id):
+    response = client.put('/api/cadres/traits/batch', json={'items': [
+        {'cadre_id': cadre_id, 'traits': [{'trait_type': '未知类型', 'trait_value': 'x'}]},
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""大屏推送：快照替换不回退、快照文件只清理旧版本、推送连接数上限和会话释放"""
+import os
+import pytest
+from app import db
+from app.services.dashboard_push_service import DashboardHub, DashboardPushService
+
+
+@pytest.fixture
+def push_config(app, tmp_path):
+    app.config.update(
+        DASHBOARD_PUSH_POLL_INTERVAL=0,
+        DASHBOARD_PUSH_MAX_DURATION=0,
+        DASHBOARD_PUSH_MAX_CONNECTIONS=1,
+        DASHBOARD_SNAPSHOT_DIR=str(tmp_path)
+    )
+    yield app.config
+    DashboardPushService._connection_count = 0
+
+
+def test_hub_keeps_newer_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr(DashboardHub, '_load_or_compute',
+                        staticmethod(lambda version, day, snapshot_dir: {'match_statistics': {'v': version}}))
+    hub = DashboardHub()
+
+    newer = hub.get_snapshot(5, str(tmp_path))
+    # 较慢的旧版本计算完成后不覆盖已替换的新版本，但仍把自己的结果返回给调用方
+    older = hub.get_snapshot(4, str(tmp_path))
+
+    assert older.version == 4
+    assert hub._snapshot is newer
+    assert hub.get_snapshot(5, str(tmp_path)) is newer
+
+
+def test_cleanup_removes_only_older_snapshot_files(tmp_path):
+    names = ['dashboard_2026-10-18_v9.json', 'dashboard_2026-10-19_v3.json', 'dashboard_2026-10-19_v4.json',
+             'dashboard_2026-10-19_v5.json', 'dashboard.lock']
+    for name in names:
+        (tmp_path / name).write_text('{}')
+
+    DashboardHub._cleanup_snapshot_files(str(tmp_path), '2026-10-19', 4)
+
+    assert sorted(os.listdir(tmp_path)) == ['dashboard.lock', 'dashboard_2026-10-19_v4.json',
+                                           'dashboard_2026-10-19_v5.json']
+
+
+def test_stream_releases_session_between_polls(push_config):
+    stream = DashboardPushService.stream(0, 15, 0, push_config['DASHBOARD_SNAPSHOT_DIR'])
+
+    assert next(stream).startswith('retry:')
+    assert not db.session.registry.has()
+    assert next(stream).startswith('event: snapshot')
+    stream.close()
+
+
+def test_stream_rejects_connections_over_limit(client, auth_headers, push_config):
+    first = client.get('/api/match/dashboard-stream', headers=auth_headers, buffered=False)
+    assert first.status_code == 200
+
+    rejected = client.get('/api/match/dashboard-stream', headers=auth_headers)
+    assert rejected.status_code == 503
+
+    # 连接关闭后归还名额
+    first.close()
+    second = client.get('/api/match/dashboard-stream', headers=auth_headers)
+    assert second.status_code == 200
+    assert 'event: snapshot' in second.get_data(as_text=True)
+    second.close()
+    assert DashboardPushService._connection_count == 0
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""数据版本：写入提交后递增对应版本，缓存接口按版本失效，其他版本的缓存不受影响"""
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo
+from app.models.major import Major
+from app.models.certificate import Certificate
+from app.models.match import MatchResult
+from app.models.position import PositionInfo
+from app.services.cadre_flow_service import CadreFlowService
+from app.services.department_service import DepartmentService
+from app.utils.cache import (
+    get_data_version, get_data_versions, mark_data_version_changed, DATA_VERSION_NAMES, DATA_VERSION_GLOBAL,
+    DATA_VERSION_DEPARTMENT, DATA_VERSION_MAJOR, DATA_VERSION_CERTIFICATE, DATA_VERSION_POSITION_CONFIG,
+    DATA_VERSION_CADRE
+)
+
+
+def _versions():
+    return {name: get_data_version(name) for name in DATA_VERSION_NAMES}
+
+
+def _bumped(before):
+    after = _versions()
+    return {name for name in DATA_VERSION_NAMES if after[name] != before[name]}
+
+
+@pytest.mark.parametrize('make_row, expected', [
+    (lambda: CadreBasicInfo(employee_no='E001', name='张三'), {DATA_VERSION_GLOBAL, DATA_VERSION_CADRE}),
+    (lambda: Major(name='计算机'), {DATA_VERSION_MAJOR}),
+    (lambda: Certificate(name='注册会计师'), {DATA_VERSION_CERTIFICATE}),
+    (lambda: PositionInfo(position_code='P1', position_name='岗位1'), {DATA_VERSION_GLOBAL, DATA_VERSION_POSITION_CONFIG}),
+])
+def test_commit_bumps_only_matching_versions(app, make_row, expected):
+    before = _versions()
+    db.session.add(make_row())
+    db.session.commit()
+    assert _bumped(before) == expected
+
+
+def test_department_write_bumps_department_and_global(app):
+    before = _versions()
+    DepartmentService.create_department({'name': 'root'})
+    assert _bumped(before) == {DATA_VERSION_GLOBAL, DATA_VERSION_DEPARTMENT}
+
+
+def test_version_is_bumped_only_after_commit(app):
+    before = _versions()
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三'))
+    db.session.flush()
+    assert _bumped(before) == set()
+    db.session.commit()
+    assert _bumped(before) == {DATA_VERSION_GLOBAL, DATA_VERSION_CADRE}
+
+
+def test_rollback_discards_pending_versions(app):
+    before = _versions()
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三'))
+    db.session.flush()
+    db.session.rollback()
+
+    # 回滚后的下一次无关提交不应带上已丢弃的版本
+    db.session.add(Major(name='计算机'))
+    db.session.commit()
+    assert _bumped(before) == {DATA_VERSION_MAJOR}
+
+
+def test_bulk_statement_bumps_version(app):
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三'))
+    db.session.commit()
+    before = _versions()
+
+    CadreBasicInfo.query.update({'name': '李四'})
+    db.session.commit()
+    assert _bumped(before) == {DATA_VERSION_GLOBAL, DATA_VERSION_CADRE}
+
+
+def test_explicit_mark_covers_bulk_insert_mappings(app):
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三'))
+    db.session.commit()
+    before = _versions()
+
+    CadreFlowService.rebuild_all()
+    assert _bumped(before) == {DATA_VERSION_GLOBAL}
+
+    before = _versions()
+    mark_data_version_changed(DATA_VERSION_MAJOR)
+    db.session.commit()
+    assert _bumped(before) == {DATA_VERSION_MAJOR}
+
+
+def test_get_data_versions_reads_in_argument_order(app):
+    db.session.add(Major(name='计算机'))
+    db.session.commit()
+    assert get_data_versions(DATA_VERSION_CERTIFICATE, DATA_VERSION_MAJOR) == (0, get_data_version(DATA_VERSION_MAJOR))
+    assert get_data_version(DATA_VERSION_MAJOR) > 0
+
+
+def _get(client, auth_headers, url, etag=None):
+    headers = dict(auth_headers)
+    if etag:
+        headers['If-None-Match'] = etag
+    return client.get(url, headers=headers)
+
+
+@pytest.mark.parametrize('url, write, unrelated_write', [
+    (
+        '/api/departments/tree',
+        lambda: DepartmentService.create_department({'name': '新部门'}),
+        lambda: db.session.add(CadreBasicInfo(employee_no='E900', name='无关')),
+    ),
+    (
+        '/api/major/tree',
+        lambda: db.session.add(Major(name='新专业')),
+        lambda: db.session.add(Certificate(name='无关证书')),
+    ),
+    (
+        '/api/certificate/tree',
+        lambda: db.session.add(Certificate(name='新证书')),
+        lambda: db.session.add(Major(name='无关专业')),
+    ),
+    (
+        '/api/positions/all',
+        lambda: db.session.add(PositionInfo(position_code='P9', position_name='新岗位')),
+        lambda: db.session.add(Major(name='无关专业')),
+    ),
+    (
+        '/api/match/statistics',
+        lambda: db.session.add(MatchResult(cadre_id=1, position_id=1, final_score=88, match_level='excellent')),
+        lambda: db.session.add(Major(name='无关专业')),
+    ),
+])
+def test_cached_endpoint_invalidation(client, auth_headers, url, write, unrelated_write):
+    db.session.add(PositionInfo(position_code='P1', position_name='岗位1'))
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三', position_id=1))
+    db.session.commit()
+
+    first = _get(client, auth_headers, url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    # 未写入时命中缓存
+    assert _get(client, auth_headers, url, etag).status_code == 304
+
+    # 其他版本的数据写入不影响本接口缓存
+    unrelated_write()
+    db.session.commit()
+    assert _get(client, auth_headers, url, etag).status_code == 304
+
+    # 本接口依赖的数据写入后内容变化，旧 ETag 不再匹配
+    write()
+    db.session.commit()
+    changed = _get(client, auth_headers, url, etag)
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_data() != first.get_data()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""部门层级闭包表：新增、调整上级、批量调整和删除后与按 parent_id 全量重建的结果一致"""
+import pytest
+from app import db
+from app.models.department import Department, DepartmentClosure
+from app.models.cadre import CadreBasicInfo
+from app.services.department_service import DepartmentService
+
+
+def _closure_rows():
+    return {
+        (row.ancestor_id, row.descendant_id, row.depth)
+        for row in DepartmentClosure.query.all()
+    }
+
+
+def _assert_closure_consistent():
+    """增量维护的闭包表应与全量重建的结果相同"""
+    maintained = _closure_rows()
+    DepartmentService.rebuild_closure()
+    assert maintained == _closure_rows()
+
+
+def _create(name, parent_id=None, status=1):
+    return DepartmentService.create_department({'name': name, 'parent_id': parent_id, 'status': status}).id
+
+
+@pytest.fixture
+def tree(app):
+    """
+    root
+    ├── a
+    │   └── a1
+    │       └── a11
+    └── b
+        └── b1
+    """
+    ids = {'root': _create('root')}
+    ids['a'] = _create('a', ids['root'])
+    ids['a1'] = _create('a1', ids['a'])
+    ids['a11'] = _create('a11', ids['a1'])
+    ids['b'] = _create('b', ids['root'])
+    ids['b1'] = _create('b1', ids['b'])
+    return ids
+
+
+def test_create_writes_closure_for_every_ancestor(tree):
+    assert (tree['root'], tree['a11'], 3) in _closure_rows()
+    assert DepartmentService._query_ancestor_ids(tree['a11']) == [tree['a1'], tree['a'], tree['root']]
+    _assert_closure_consistent()
+
+
+def test_update_parent_moves_whole_subtree(tree):
+    DepartmentService.update_department(tree['a1'], {'parent_id': tree['b1']})
+
+    assert DepartmentService._query_subtree_ids(tree['b']) == {tree['b'], tree['b1'], tree['a1'], tree['a11']}
+    assert DepartmentService._query_subtree_ids(tree['a']) == {tree['a']}
+    assert DepartmentService._query_ancestor_ids(tree['a11']) == [tree['a1'], tree['b1'], tree['b'], tree['root']]
+    _assert_closure_consistent()
+
+
+def test_update_parent_to_top_level(tree):
+    DepartmentService.update_department(tree['a1'], {'parent_id': None})
+
+    assert DepartmentService._query_ancestor_ids(tree['a11']) == [tree['a1']]
+    assert tree['a1'] not in DepartmentService._query_subtree_ids(tree['root'])
+    _assert_closure_consistent()
+
+
+def test_update_parent_rejects_own_subtree(tree):
+    with pytest.raises(ValueError):
+        DepartmentService.update_department(tree['a'], {'parent_id': tree['a11']})
+    db.session.rollback()
+    _assert_closure_consistent()
+
+
+def test_batch_move_swaps_branches(tree):
+    result = DepartmentService.move_departments([
+        {'id': tree['a1'], 'parent_id': tree['b']},
+        {'id': tree['b1'], 'parent_id': tree['a']},
+    ])
+
+    assert result == {'moved': 2}
+    assert DepartmentService._query_subtree_ids(tree['a']) == {tree['a'], tree['b1']}
+    assert DepartmentService._query_subtree_ids(tree['b']) == {tree['b'], tree['a1'], tree['a11']}
+    _assert_closure_consistent()
+
+
+def test_batch_move_rejects_combined_cycle(tree):
+    before = _closure_rows()
+    with pytest.raises(ValueError):
+        DepartmentService.move_departments([
+            {'id': tree['a'], 'parent_id': tree['b1']},
+            {'id': tree['b'], 'parent_id': tree['a11']},
+        ])
+    assert _closure_rows() == before
+
+
+def test_delete_removes_subtree_closure(tree):
+    result = DepartmentService.delete_department(tree['a'])
+
+    assert result['success']
+    remaining = {dept.id for dept in Department.query.all()}
+    assert remaining == {tree['root'], tree['b'], tree['b1']}
+    assert all(ancestor in remaining and descendant in remaining for ancestor, descendant, _ in _closure_rows())
+    _assert_closure_consistent()
+
+
+def test_delete_refused_when_subtree_has_cadres(tree):
+    db.session.add(CadreBasicInfo(employee_no='E001', name='张三', department_id=tree['a11']))
+    db.session.commit()
+
+    result = DepartmentService.delete_department(tree['a'])
+
+    assert not result['success']
+    assert result['has_cadres']
+    assert db.session.get(Department, tree['a11']) is not None
+
+
+def test_list_filter_skips_disabled_sub_departments(tree):
+    for employee_no, dept_key in (('E001', 'a'), ('E002', 'a1'), ('E003', 'a11'), ('E004', 'b1')):
+        db.session.add(CadreBasicInfo(employee_no=employee_no, name=employee_no, department_id=tree[dept_key], status=1))
+    db.session.commit()
+
+    def filtered(dept_id):
+        return {cadre.employee_no for cadre in CadreBasicInfo.query.filter(
+            DepartmentService.subtree_filter(CadreBasicInfo.department_id, dept_id)
+        ).all()}
+
+    assert filtered(tree['root']) == {'E001', 'E002', 'E003', 'E004'}
+
+    DepartmentService.update_department(tree['a1'], {'status': 0})
+
+    # 停用部门及其下级不计入上级部门的筛选，按停用部门本身筛选时仍包含
+    assert filtered(tree['root']) == {'E001', 'E004'}
+    assert filtered(tree['a1']) == {'E002', 'E003'}
+
+
+@pytest.mark.parametrize('payload', [
+    {'moves': [5]},
+    {'moves': []},
+    {'moves': 'a'},
+    {'moves': [{'parent_id': 1}]},
+    {'moves': [{'id': 'x', 'parent_id': 1}]},
+    {},
+])
+def test_move_endpoint_rejects_malformed_payload(client, auth_headers, tree, payload):
+    response = client.post('/api/departments/move', json=payload, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_move_endpoint_reports_cycle_as_bad_request(client, auth_headers, tree):
+    response = client.post('/api/departments/move', json={
+        'moves': [{'id': tree['a'], 'parent_id': tree['a11']}]
+    }, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_move_endpoint_accepts_top_level_move(client, auth_headers, tree):
+    response = client.post('/api/departments/move', json={'moves': [{'id': tree['b']}]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert db.session.get(Department, tree['b']).parent_id is None
+    _assert_closure_consistent()
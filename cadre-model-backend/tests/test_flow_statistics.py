@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""干部来源与流动统计：以流动事实表为准，只有缺少事实记录时才按入职年份回退"""
+from datetime import date, datetime
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo, CadreDynamicInfo, CadreFlowFact
+from app.services.cadre_flow_service import CadreFlowService
+from app.services.match_service import MatchService
+from app.utils.constants import INFO_TYPE_POSITION_CHANGE
+
+CURRENT_YEAR = datetime.now().year
+
+
+@pytest.fixture
+def cadres(app):
+    """
+    internal_no_date: 两次职务变更但都没有任期开始日期（内部培养，流动年份为空）
+    internal: 两次职务变更，首次任期开始于三年前（内部培养）
+    missing_fact: 没有流动事实记录，两年前入职（按外部引进、入职年份统计）
+    """
+    ids = {}
+    for key, entry_year in (('internal_no_date', CURRENT_YEAR - 1), ('internal', CURRENT_YEAR - 4),
+                            ('missing_fact', CURRENT_YEAR - 2)):
+        cadre = CadreBasicInfo(employee_no=key, name=key, status=1, management_level='中层',
+                               entry_date=date(entry_year, 3, 1))
+        db.session.add(cadre)
+        db.session.flush()
+        ids[key] = cadre.id
+
+    for term_start in (None, None):
+        db.session.add(CadreDynamicInfo(cadre_id=ids['internal_no_date'], info_type=INFO_TYPE_POSITION_CHANGE,
+                                        term_start_date=term_start))
+    for term_start in (date(CURRENT_YEAR - 3, 1, 1), date(CURRENT_YEAR - 1, 1, 1)):
+        db.session.add(CadreDynamicInfo(cadre_id=ids['internal'], info_type=INFO_TYPE_POSITION_CHANGE,
+                                        term_start_date=term_start))
+    db.session.commit()
+
+    CadreFlowService.refresh_cadres([ids['internal_no_date'], ids['internal']])
+    CadreFlowFact.query.filter(CadreFlowFact.cadre_id == ids['missing_fact']).delete()
+    db.session.commit()
+    return ids
+
+
+def _trend(statistics):
+    return {int(item['year']): item for item in statistics['flow_trend']}
+
+
+def test_internal_cadre_without_term_start_has_no_flow_year(cadres):
+    fact = db.session.get(CadreFlowFact, cadres['internal_no_date'])
+    assert fact.source_type == 'internal'
+    assert fact.flow_year is None
+
+
+def test_trend_keeps_null_flow_year_out_of_entry_year(cadres):
+    statistics = MatchService.get_source_and_flow_statistics()
+    trend = _trend(statistics)
+
+    # 来源分布包含全部在职干部
+    assert statistics['total_count'] == 3
+    assert statistics['source_distribution']['internal']['count'] == 2
+    assert statistics['source_distribution']['external']['count'] == 1
+
+    # 流动年份为空的内部培养干部不按入职年份计入
+    assert trend[CURRENT_YEAR - 1]['internal'] == 0
+    assert trend[CURRENT_YEAR - 3]['internal'] == 1
+    assert trend[CURRENT_YEAR - 2]['external'] == 1
+
+
+def test_details_agree_with_trend(cadres):
+    details = MatchService.get_flow_cadres_details()
+    by_id = {cadre['id']: cadre for cadre in details['cadres']}
+
+    assert cadres['internal_no_date'] not in by_id
+    assert by_id[cadres['internal']]['flow_year'] == CURRENT_YEAR - 3
+    assert by_id[cadres['missing_fact']]['source_type'] == 'external'
+    assert by_id[cadres['missing_fact']]['flow_year'] == CURRENT_YEAR - 2
+
+    trend_total = sum(item['internal'] + item['external']
+                      for item in MatchService.get_source_and_flow_statistics()['flow_trend'])
+    assert details['total'] == trend_total
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""游标分页：同分记录跨页、空值排序和游标校验"""
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models.cadre import CadreBasicInfo
+from app.models.position import PositionInfo
+from app.models.match import MatchResult
+from app.services.match_service import MatchService
+from app.utils.helpers import build_keyset_query, encode_cursor
+
+
+@pytest.fixture
+def match_results(app):
+    """16 条匹配结果：7 条同分、3 条同分、4 条无分数、2 条只在第三位小数不同"""
+    position = PositionInfo(position_code='P1', position_name='岗位1')
+    cadre = CadreBasicInfo(employee_no='E001', name='张三')
+    db.session.add_all([position, cadre])
+    db.session.flush()
+
+    scores = [85.37] * 7 + [90.0] * 3 + [None] * 4 + [70.125, 70.135]
+    for score in scores:
+        db.session.add(MatchResult(
+            cadre_id=cadre.id, position_id=position.id, final_score=score, match_level='qualified'
+        ))
+    db.session.commit()
+    return scores
+
+
+def _collect_pages(page_size):
+    ids, scores, cursor = [], [], None
+    while True:
+        page = MatchService.get_match_result_page(page_size=page_size, cursor=cursor)
+        ids.extend(item['id'] for item in page['items'])
+        scores.extend(item['final_score'] for item in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids, scores, page['total']
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 4, 7])
+def test_ties_are_neither_skipped_nor_repeated(match_results, page_size):
+    ids, _, total = _collect_pages(page_size)
+    assert total == len(match_results)
+    assert len(ids) == len(match_results)
+    assert len(set(ids)) == len(match_results)
+
+
+def test_scores_descend_with_nulls_last(match_results):
+    _, scores, _ = _collect_pages(3)
+    non_null = [score for score in scores if score is not None]
+    assert scores[len(non_null):] == [None] * 4
+    assert non_null == sorted(non_null, reverse=True)
+
+
+def test_cursor_order_matches_offset_order(match_results):
+    _, scores, _ = _collect_pages(2)
+    offset_scores = [item['final_score'] for item in MatchService.get_match_results(page=1, page_size=100)['items']]
+    assert scores == offset_scores
+    # 只在第三位小数不同的分数按精确值排序，不因取整变成同分
+    assert scores.index(70.135) < scores.index(70.125)
+
+
+def test_seek_uses_raw_score_column(app, match_results):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    first = MatchService.get_match_result_page(page_size=3)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        MatchService.get_match_result_page(page_size=3, cursor=first['next_cursor'])
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    page_query = [sql for sql in statements if 'LIMIT' in sql][0]
+    # 定位条件直接比较原始列，不包含 CAST/ROUND 表达式或 OR 空值条件
+    assert 'CAST' not in page_query and 'round(' not in page_query
+    assert 'ORDER BY match_result.final_score DESC, match_result.id DESC' in page_query
+    assert 'match_result.final_score IS NULL OR' not in page_query
+
+
+def test_ascending_keyset_keeps_nulls_last(match_results):
+    ids, cursor = [], None
+    while True:
+        items, cursor = build_keyset_query(
+            MatchResult.query, MatchResult.final_score, MatchResult.id, 2,
+            cursor=cursor, nullable=True,
+            cursor_key=lambda item: [item.final_score, item.id]
+        )
+        ids.extend(item.id for item in items)
+        if not cursor:
+            break
+    assert len(ids) == len(set(ids)) == len(match_results)
+    scores = dict(db.session.query(MatchResult.id, MatchResult.final_score).all())
+    assert [scores[i] for i in ids][-4:] == [None] * 4
+
+
+def test_invalid_cursor_is_rejected(match_results):
+    with pytest.raises(ValueError):
+        MatchService.get_match_result_page(page_size=2, cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        MatchService.get_match_result_page(page_size=2, cursor=encode_cursor([1]))
+
+
+def test_null_cursor_requires_nullable_column(match_results):
+    with pytest.raises(ValueError):
+        build_keyset_query(
+            MatchResult.query, MatchResult.id, MatchResult.id, 2,
+            cursor=encode_cursor([None, 1]), cursor_key=lambda item: [item.id, item.id]
+        )
+
+
+def test_match_result_endpoint_returns_cursor(client, auth_headers, match_results):
+    response = client.get('/api/match/results?page_size=5&cursor=', headers=auth_headers)
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert len(data['items']) == 5
+    assert data['has_more'] is True
+    assert data['total'] == len(match_results)
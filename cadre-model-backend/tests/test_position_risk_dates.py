@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""岗位风险日期计算：闰日当天计算“3 年前”不报错"""
+from datetime import date, datetime
+import pytest
+from app.models.position import PositionRisk
+from app.services.position_risk_service import PositionRiskService
+from app.utils.helpers import years_ago
+
+
+@pytest.mark.parametrize('day, years, expected', [
+    (date(2026, 10, 19), 3, date(2023, 10, 19)),
+    (date(2028, 2, 29), 3, date(2025, 2, 28)),
+    (date(2028, 2, 29), 4, date(2024, 2, 29)),
+])
+def test_years_ago(day, years, expected):
+    assert years_ago(day, years) == expected
+
+
+@pytest.mark.parametrize('last_training, no_training', [
+    (datetime(2025, 2, 28, 9, 0), False),
+    (datetime(2025, 2, 27, 9, 0), True),
+])
+def test_evaluate_risks_on_leap_day(last_training, no_training):
+    risk = PositionRisk(position_id=1, incumbent_id=1, match_score=80, department_headcount=3,
+                        last_training_time=last_training)
+
+    PositionRiskService.evaluate_risks(risk, date(2028, 2, 29))
+
+    assert risk.no_training is no_training
+    assert risk.calc_date == date(2028, 2, 29)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""干部档案批量导入：同一批中字段不同的行分组写入，未提供的字段使用模型默认值"""
+import io
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo, CadreDynamicInfo
+from app.services.cadre_profile_import_service import CadreProfileImportService
+
+
+@pytest.fixture
+def cadre_ids(app):
+    cadres = [CadreBasicInfo(employee_no=f'E00{i}', name=f'干部{i}', status=1) for i in (1, 2)]
+    db.session.add_all(cadres)
+    db.session.commit()
+    return [cadre.id for cadre in cadres]
+
+
+def _csv(*lines):
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+def test_dynamic_info_rows_with_different_fields_keep_defaults(cadre_ids):
+    report = CadreProfileImportService.import_dynamic_infos(_csv(
+        '工号,信息类型,培训名称,项目名称,是否核心项目',
+        'E001,培训记录,安全培训,,',
+        'E002,项目经历,,数据平台,是',
+    ), 'dynamic.csv')
+
+    assert report['imported'] == 2 and report['failed'] == 0
+    training = CadreDynamicInfo.query.filter_by(cadre_id=cadre_ids[0]).one()
+    project = CadreDynamicInfo.query.filter_by(cadre_id=cadre_ids[1]).one()
+    # 培训记录没有“是否核心项目”列，使用模型默认值而不是 NULL
+    assert training.is_core_project is False
+    assert training.create_time is not None
+    assert project.is_core_project is True
+    assert project.project_name == '数据平台'
+
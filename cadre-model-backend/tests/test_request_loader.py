@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""请求级加载缓存：prime 登记的主键合并查询，匹配结果列表序列化的查询次数不随条数增长"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models.cadre import CadreBasicInfo
+from app.models.department import Department
+from app.models.position import PositionInfo
+from app.models.match import MatchResult
+from app.services.match_service import MatchService
+from app.utils.loader import RequestLoader
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def _add_cadres(start, count):
+    """每个干部有各自的部门、岗位和一条当前岗位的匹配结果"""
+    for i in range(start, start + count):
+        department = Department(name=f'部门{i}')
+        position = PositionInfo(position_code=f'P{i}', position_name=f'岗位{i}', status=1)
+        db.session.add_all([department, position])
+        db.session.flush()
+        cadre = CadreBasicInfo(employee_no=f'E{i:03d}', name=f'干部{i}', status=1,
+                               department_id=department.id, position_id=position.id)
+        db.session.add(cadre)
+        db.session.flush()
+        db.session.add(MatchResult(cadre_id=cadre.id, position_id=position.id, final_score=60 + i,
+                                   match_level='qualified', best_match_position_id=position.id))
+    db.session.commit()
+
+
+def _serialize_in_new_request(app, fetch):
+    """在新的应用上下文中（空的加载缓存和会话）取列表并统计查询次数"""
+    with app.app_context():
+        with _count_queries() as statements:
+            items = fetch()
+        db.session.remove()
+    return items, len(statements)
+
+
+@pytest.mark.parametrize('fetch', [
+    lambda: MatchService.get_match_results(page_size=50)['items'],
+    lambda: MatchService.get_match_result_page(page_size=50)['items'],
+])
+def test_list_serialization_query_count_is_constant(app, fetch):
+    _add_cadres(0, 3)
+    small, small_count = _serialize_in_new_request(app, fetch)
+    _add_cadres(3, 9)
+    large, large_count = _serialize_in_new_request(app, fetch)
+
+    assert len(small) == 3 and len(large) == 12
+    assert small_count == large_count
+    item = large[0]
+    assert item['cadre']['department']['name'] == '部门11'
+    assert item['cadre']['position']['position_name'] == '岗位11'
+    assert item['best_match_position']['position_name'] == '岗位11'
+
+
+def test_batch_results_serialize_without_queries(app):
+    _add_cadres(0, 5)
+
+    results = MatchService.batch_calculate_current_position()
+    with _count_queries() as statements:
+        items = [result.to_dict() for result in results]
+
+    assert len(items) == 5
+    assert statements == []
+
+
+def test_prime_merges_pending_ids_into_one_query(app):
+    _add_cadres(0, 4)
+    db.session.expunge_all()
+    loader = RequestLoader()
+
+    # 不存在的主键一并登记，不会额外查询
+    with _count_queries() as statements:
+        loader.prime(CadreBasicInfo, [1, 2, 3, 4, 99])
+        first = loader.load(CadreBasicInfo, 1)
+        rest = loader.load_many(CadreBasicInfo, [2, 3, 4])
+
+    assert first.id == 1
+    assert sorted(rest) == [2, 3, 4]
+    assert len(statements) == 1
+
+
+def test_prime_refreshes_expired_entities(app):
+    _add_cadres(0, 3)
+    loader = RequestLoader()
+    loader.load_many(CadreBasicInfo, [1, 2, 3])
+    db.session.commit()
+
+    # 提交后对象已过期，登记后一次 IN 查询统一刷新，而不是逐个刷新
+    with _count_queries() as statements:
+        loader.prime(CadreBasicInfo, [1, 2, 3])
+        names = [loader.load(CadreBasicInfo, pk).name for pk in (1, 2, 3)]
+
+    assert names == ['干部0', '干部1', '干部2']
+    assert len(statements) == 1
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""进程内搜索索引：只在干部、部门、岗位数据版本变化后重建"""
+import pytest
+from app import db
+from app.models.cadre import CadreBasicInfo, CadreDynamicInfo
+from app.models.department import Department
+from app.models.match import MatchResult
+from app.models.position import PositionInfo
+from app.services.search_service import SearchService
+
+
+@pytest.fixture
+def cadre(app):
+    department = Department(name='财务部')
+    position = PositionInfo(position_code='P1', position_name='会计主管', status=1)
+    db.session.add_all([department, position])
+    db.session.flush()
+    cadre = CadreBasicInfo(employee_no='E001', name='张三', status=1,
+                           department_id=department.id, position_id=position.id)
+    db.session.add(cadre)
+    db.session.commit()
+    return cadre
+
+
+def _cadre_names(keyword):
+    return {row.name for row in SearchService.filter_cadre_name(CadreBasicInfo.query, keyword).all()}
+
+
+def test_unrelated_writes_keep_index(cadre):
+    index = SearchService._get_index('cadre')
+    position_index = SearchService._get_index('position')
+
+    db.session.add(CadreDynamicInfo(cadre_id=cadre.id, info_type=1, training_name='安全培训'))
+    db.session.add(MatchResult(cadre_id=cadre.id, position_id=cadre.position_id, final_score=80, match_level='good'))
+    db.session.commit()
+
+    assert SearchService._get_index('cadre') is index
+    assert SearchService._get_index('position') is position_index
+
+
+def test_cadre_write_rebuilds_cadre_index_only(cadre):
+    assert _cadre_names('张三') == {'张三'}
+    position_index = SearchService._get_index('position')
+
+    cadre.name = '李四'
+    db.session.commit()
+
+    assert _cadre_names('李四') == {'李四'}
+    assert _cadre_names('张三') == set()
+    assert SearchService._get_index('position') is position_index
+
+
+@pytest.mark.parametrize('rename', [
+    lambda cadre: setattr(cadre.department, 'name', '审计部'),
+    lambda cadre: setattr(cadre.position, 'position_name', '审计主管'),
+])
+def test_department_or_position_rename_rebuilds_cadre_index(cadre, rename):
+    index = SearchService._get_index('cadre')
+
+    rename(cadre)
+    db.session.commit()
+
+    assert SearchService._get_index('cadre') is not index
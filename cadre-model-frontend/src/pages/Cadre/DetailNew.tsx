@@ -24,7 +24,7 @@ import {
   DownOutlined,
 } from '@ant-design/icons';
 import apiClient from '@/utils/request';
-import { cadreApi, matchApi, aiAnalysisApi } from '@/services/api';
+import { cadreApi, aiAnalysisApi } from '@/services/api';
 import { positionApi } from '@/services/positionApi';
 import type { CadreBasicInfo, CadreDynamicInfo } from '@/types';
 import dayjs from 'dayjs';
@@ -460,52 +460,30 @@ ${JSON.stringify(cadreData, null, 2)}
     }
   };
 
-  // 获取AI分析历史结果
-  const fetchAIAnalysisResult = async () => {
-    if (!id) return;
-    try {
-      const response = await apiClient.get(`/ai-analysis/${id}`);
-      if (response.data.code === 200 && response.data.data) {
-        setAiResult(response.data.data.analysis_result);
-      }
-      // 404 或其他错误时不做任何处理，不显示错误提示
-    } catch (error) {
-      // 静默处理错误
-    }
-  };
-
-  const fetchData = async () => {
+  // 获取干部档案聚合数据（首次加载使用）
+  const fetchProfile = async () => {
     if (!id) return;
     setLoading(true);
     try {
-      const response = await cadreApi.getDetail(Number(id));
-      setData(response.data.data || null);
-      // 数据加载完成后获取匹配结果
-      const cadreData = response.data.data;
-      if (cadreData?.position?.id) {
-        fetchMatchResultByPosition(cadreData.position.id);
+      const response = await cadreApi.getProfile(Number(id));
+      const profile = response.data.data || {};
+      setData(profile.basic || null);
+      if (profile.match_result) {
+        setMatchResult(profile.match_result);
+      }
+      applyCareerData(profile.dynamic_info || []);
+      setAbilityData(profile.abilities || []);
+      applyTraitData(profile.traits || []);
+      if (profile.ai_analysis) {
+        setAiResult(profile.ai_analysis.analysis_result);
       }
     } catch (error) {
-      console.error('Failed to fetch cadre detail:', error);
+      console.error('Failed to fetch cadre profile:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  // 根据岗位ID获取匹配结果
-  const fetchMatchResultByPosition = async (positionId: number) => {
-    if (!id) return;
-    try {
-      const response = await matchApi.getResults({ cadre_id: Number(id), position_id: positionId });
-      const result = response.data.data?.items?.[0];
-      if (result) {
-        setMatchResult(result);
-      }
-    } catch (error) {
-      console.error('Failed to fetch match result:', error);
-    }
-  };
-
   useEffect(() => {
     if (hasFetchedRef.current) return;
 
@@ -516,13 +494,9 @@ ${JSON.stringify(cadreData, null, 2)}
       return;
     }
 
-    fetchData();
     if (id) {
-      fetchCareerData();
-      fetchAbilityData();
-      fetchTraitData();
+      fetchProfile(); // 一次请求获取详情、履历、能力、特质、AI分析和匹配结果
       fetchPositionList();
-      fetchAIAnalysisResult(); // 获取AI分析历史结果
     }
     // 检查是否来自匹配分析页面
     if (location.state?.fromMatch) {
@@ -549,20 +523,24 @@ ${JSON.stringify(cadreData, null, 2)}
     if (!id) return;
     try {
       const response = await apiClient.get(`/cadres/${id}/dynamic-info`);
-      setCareerData(response.data.data || []);
-
-      // 重置tab滚动位置到最左边
-      setTimeout(() => {
-        const navWrap = document.querySelector('.career-tabs .ant-tabs-nav-wrap');
-        if (navWrap) {
-          (navWrap as HTMLElement).scrollLeft = 0;
-        }
-      }, 100);
+      applyCareerData(response.data.data || []);
     } catch (error) {
       console.error('Failed to fetch career data:', error);
     }
   };
 
+  const applyCareerData = (careers: any[]) => {
+    setCareerData(careers);
+
+    // 重置tab滚动位置到最左边
+    setTimeout(() => {
+      const navWrap = document.querySelector('.career-tabs .ant-tabs-nav-wrap');
+      if (navWrap) {
+        (navWrap as HTMLElement).scrollLeft = 0;
+      }
+    }, 100);
+  };
+
   const handleCareerAdd = (infoType: number) => {
     setEditingCareer(null);
     careerForm.resetFields();
@@ -858,19 +836,21 @@ ${JSON.stringify(cadreData, null, 2)}
     if (!id) return;
     try {
       const response = await apiClient.get(`/cadres/${id}/traits`);
-      const traits = response.data.data || [];
-
-      const formData: any = {};
-      traits.forEach((item: any) => {
-        formData[item.trait_type] = item.trait_value;
-      });
-      traitForm.setFieldsValue(formData);
-      setTraitData(traits);
+      applyTraitData(response.data.data || []);
     } catch (error) {
       console.error('Failed to fetch trait data:', error);
     }
   };
 
+  const applyTraitData = (traits: any[]) => {
+    const formData: any = {};
+    traits.forEach((item: any) => {
+      formData[item.trait_type] = item.trait_value;
+    });
+    traitForm.setFieldsValue(formData);
+    setTraitData(traits);
+  };
+
   const handleTraitEdit = () => {
     setTraitModalVisible(true);
   };
@@ -130,6 +130,7 @@ const CadreGrid = () => {
         page_size: pageSize,
         name,
         department: departmentId ? String(departmentId) : undefined,
+        profile: 'list',
       });
       setData(response.data.data?.items || []);
       setTotal(response.data.data?.total || 0);
@@ -31,7 +31,7 @@ const CadreList = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
-      const response = await cadreApi.getList({ page, page_size: pageSize, name, status });
+      const response = await cadreApi.getList({ page, page_size: pageSize, name, status, profile: 'list' });
       setData(response.data.data?.items || []);
       setTotal(response.data.data?.total || 0);
     } catch (error) {
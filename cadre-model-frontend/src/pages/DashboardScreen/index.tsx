@@ -15,7 +15,7 @@ import ReactECharts from 'echarts-for-react';
 import { matchApi } from '@/services/matchApi';
 import { departmentApi } from '@/services/departmentApi';
 import { positionApi } from '@/services/positionApi';
-import { Tooltip } from 'antd';
+import { Tooltip, message } from 'antd';
 import type { MatchStatistics, PyramidStatistics, SourceAndFlowStatistics } from '@/types';
 import AIChat from '@/components/AIChat';
 import './index.css';
@@ -327,33 +327,66 @@ const DashboardScreen = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        // 使用合并的大屏数据 API 接口（优化性能）
-        const [dashboardData, deptTree, positions] = await Promise.all([
-          matchApi.getDashboardAll(),
+        const [deptTree, positions] = await Promise.all([
           departmentApi.getTree(),
           positionApi.getAll(),
         ]);
 
-        if (dashboardData.data?.data) {
-          const data = dashboardData.data.data;
-          if (data.match_statistics) setMatchStatistics(data.match_statistics);
-          if (data.age_structure) setPyramidStatistics(data.age_structure);
-          if (data.position_risk) setRiskData(data.position_risk);
-          if (data.quality_portrait) setQualityData(data.quality_portrait);
-          if (data.source_and_flow) setSourceAndFlowData(data.source_and_flow);
-        }
         if (deptTree.data?.data) setDepartmentTree(deptTree.data.data);
         if (positions.data?.data) setPositionCount(positions.data.data.length);
       } catch (error) {
         console.error('Failed to fetch data:', error);
-      } finally {
-        setLoading(false);
       }
     };
 
     fetchData();
   }, []);
 
+  // 大屏数据由服务端推送：连接后收到完整快照，之后只推送发生变化的板块
+  useEffect(() => {
+    const sectionSetters: Record<string, (updater: (prev: any) => any) => void> = {
+      match_statistics: setMatchStatistics,
+      age_structure: setPyramidStatistics,
+      position_risk: setRiskData,
+      quality_portrait: setQualityData,
+      source_and_flow: setSourceAndFlowData,
+    };
+
+    // 按主键合并列表板块的行级差异
+    const applyPatch = (rows: any[], patch: { key: string; changed: any[]; removed: any[]; order?: any[] }) => {
+      const rowMap = new Map(rows.map(row => [row[patch.key], row]));
+      patch.removed.forEach(key => rowMap.delete(key));
+      patch.changed.forEach(row => rowMap.set(row[patch.key], row));
+      const order = patch.order || rows.map(row => row[patch.key]);
+      return order.filter(key => rowMap.has(key)).map(key => rowMap.get(key));
+    };
+
+    const unsubscribe = matchApi.subscribeDashboard(({ type, sections }) => {
+      Object.entries(sections || {}).forEach(([name, section]) => {
+        const setSection = sectionSetters[name];
+        if (!setSection || section == null) return;
+        if (type === 'snapshot' || 'replace' in section) {
+          setSection(() => (type === 'snapshot' ? section : section.replace));
+        } else if ('patch' in section) {
+          setSection(prev => applyPatch(prev || [], section.patch));
+        }
+      });
+      if (type === 'snapshot') {
+        setLoading(false);
+        message.destroy('dashboard-stream');
+      }
+    }, () => {
+      // 连接失败时结束加载状态并提示，后台继续重连，重连成功后收到快照即恢复
+      setLoading(false);
+      message.error({ content: '大屏数据连接失败，正在重试', key: 'dashboard-stream', duration: 0 });
+    });
+
+    return () => {
+      unsubscribe();
+      message.destroy('dashboard-stream');
+    };
+  }, []);
+
   // 风险数据卡片
   const riskStats = {
     high: riskData.filter(d => d.risk_level === 'high').length,
@@ -94,7 +94,7 @@ const MatchAnalysis = () => {
   // 获取干部列表
   const fetchCadres = async () => {
     try {
-      const response = await cadreApi.getList({ page: 1, page_size: 1000, status: 1 });
+      const response = await cadreApi.getList({ page: 1, page_size: 1000, status: 1, profile: 'list' });
       setCadres(response.data.data?.items || []);
     } catch (error) {
       console.error('Failed to fetch cadres:', error);
@@ -10,6 +10,8 @@ export const cadreApi = {
     name?: string;
     status?: number;
     department?: string;
+    // 序列化方案：list-仅列表字段，detail-完整字段（默认）
+    profile?: 'list' | 'detail';
   }) =>
     apiClient.get<ApiResponse<PaginatedResponse<CadreBasicInfo>>>(
       '/cadres',
@@ -20,6 +22,12 @@ export const cadreApi = {
   getDetail: (id: number) =>
     apiClient.get<ApiResponse<CadreBasicInfo>>(`/cadres/${id}`),
 
+  // 获取干部档案聚合数据（基本信息、特质、能力、履历、AI分析、当前岗位匹配结果）
+  getProfile: (id: number, sections?: string[]) =>
+    apiClient.get<ApiResponse<any>>(`/cadres/${id}/profile`, {
+      params: sections ? { sections: sections.join(',') } : undefined,
+    }),
+
   // 创建干部
   create: (data: Partial<CadreBasicInfo>) =>
     apiClient.post<ApiResponse<CadreBasicInfo>>('/cadres', data),
@@ -1,6 +1,14 @@
 import apiClient from '@/utils/request';
 import type { ApiResponse, PaginatedResponse, MatchResult, MatchStatistics, PyramidStatistics, SourceAndFlowStatistics } from '@/types';
 
+// 大屏推送事件：snapshot 为完整数据，update 只包含发生变化的板块
+// 列表板块的变化为 { patch: { key, changed, removed, order? } }，其余板块为 { replace: 板块数据 }
+export interface DashboardStreamEvent {
+  type: 'snapshot' | 'update';
+  version: number;
+  sections: Record<string, any>;
+}
+
 // 匹配API
 export const matchApi = {
   // 计算单个干部与岗位的匹配度
@@ -134,4 +142,83 @@ export const matchApi = {
       quality_portrait: any[];
       source_and_flow: SourceAndFlowStatistics;
     }>>('/match/dashboard-all'),
+
+  // 订阅大屏数据推送（SSE），返回取消订阅函数
+  // EventSource 无法携带 Authorization 请求头，这里用 fetch 读取事件流；连接结束或出错后按服务端 retry 间隔重连
+  // 连接失败（含连接数已满的 503）或未收到快照就断开时调用 onError，随后仍会自动重连
+  subscribeDashboard: (onEvent: (event: DashboardStreamEvent) => void, onError?: (error: Error) => void) => {
+    const apiBaseUrl = window.config?.API_BASE_URL || import.meta.env.VITE_API_BASE_URL || '/api';
+    const controller = new AbortController();
+    let retryDelay = 3000;
+
+    const connect = async () => {
+      const token = localStorage.getItem('token');
+      const response = await fetch(`${apiBaseUrl}/match/dashboard-stream`, {
+        headers: { 'Authorization': token ? `Bearer ${token}` : '' },
+        signal: controller.signal,
+      });
+      if (response.status === 401) {
+        localStorage.removeItem('token');
+        window.location.href = '/login';
+        return;
+      }
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let receivedSnapshot = false;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // 事件之间以空行分隔，保留不完整的事件
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop() || '';
+
+        for (const block of blocks) {
+          let eventName = 'message';
+          const dataLines: string[] = [];
+          for (const line of block.split('\n')) {
+            if (line.startsWith('event: ')) eventName = line.slice(7).trim();
+            else if (line.startsWith('data: ')) dataLines.push(line.slice(6));
+            else if (line.startsWith('retry: ')) retryDelay = Number(line.slice(7)) || retryDelay;
+          }
+          if (dataLines.length === 0 || (eventName !== 'snapshot' && eventName !== 'update')) continue;
+          try {
+            onEvent({ ...JSON.parse(dataLines.join('\n')), type: eventName } as DashboardStreamEvent);
+            if (eventName === 'snapshot') receivedSnapshot = true;
+          } catch (e) {
+            console.error('Failed to parse SSE data:', e);
+          }
+        }
+      }
+
+      // 到期正常结束的连接一定先收到过快照
+      if (!receivedSnapshot) {
+        throw new Error('Dashboard stream closed before snapshot');
+      }
+    };
+
+    const run = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await connect();
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          console.error('Dashboard stream error:', error);
+          onError?.(error instanceof Error ? error : new Error(String(error)));
+        }
+        if (controller.signal.aborted) return;
+        await new Promise(resolve => setTimeout(resolve, retryDelay));
+      }
+    };
+
+    run();
+    return () => controller.abort();
+  },
 };